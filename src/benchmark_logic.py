@@ -0,0 +1,191 @@
+"""
+Logic benchmark suite for LogicEngine.
+
+Generates seeded random inventories and measures throughput and latency
+percentiles of the logic hot paths. Each benchmark runs several times and
+the median of the repeats is reported. Results can be stored as a baseline;
+later runs fail (exit code 1) when the median throughput regresses beyond
+the tolerance. p95 latency is noisier and only fails beyond a wider band.
+
+    python benchmark_logic.py                   # run and compare to baseline (if any)
+    python benchmark_logic.py --save-baseline   # run and store as new baseline
+
+benchmark_baseline.json is the committed reference run (see its "meta").
+Against a baseline from another Python version or architecture the
+comparison is report-only. Re-save it locally before relying on the
+regression check, and commit it again only when a change is meant to move
+the numbers.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.logic_engine import LogicEngine
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+
+def random_inventories(engine, count, seed, obtain_rate=0.4):
+    """Seeded random inventories over every item the engine knows."""
+    rng = random.Random(seed)
+    items = engine.items
+    return [{item: rng.random() < obtain_rate for item in items} for _ in range(count)]
+
+
+def measure(func, calls):
+    """Runs func(i) for i in range(calls), timing each call. Returns stats in microseconds."""
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for i in range(calls):
+        t0 = clock()
+        func(i)
+        latencies.append(clock() - t0)
+    total_s = (clock() - start) / 1e9
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] / 1000
+    return {
+        "ops_per_sec": calls / total_s if total_s else float("inf"),
+        "p50_us": pct(50),
+        "p95_us": pct(95),
+        "p99_us": pct(99),
+    }
+
+
+def sanity_check(engine):
+    """Smoke checks ported from the old reproduce_logic.py script."""
+    empty = engine.calculate_accessibility({})
+    full = engine.calculate_accessibility({"Bomb": True, "Hammer": True})
+    checks = {
+        "Foomy Woods accessible with empty inventory": empty.get("Foomy Woods") is True,
+        "Alunze Cave closed with empty inventory": empty.get("Alunze Cave") is False,
+        "Alunze Cave open with Bomb + Hammer": full.get("Alunze Cave") is True,
+    }
+    for name, ok in checks.items():
+        print(f"{'PASS' if ok else 'FAIL'}: {name}")
+    return all(checks.values())
+
+
+def run_benchmarks(data_loader, count, seed):
+    # Cache size 1: every distinct inventory is a cold evaluation
+    cold = LogicEngine(data_loader, cache_size=1)
+    warm = LogicEngine(data_loader)
+    inventories = random_inventories(cold, count, seed)
+    masks = [cold.inventory_mask(inv) for inv in inventories]
+    hot_set = inventories[:32] # Fits in the default LRU cache
+    locations = cold.locations
+    accessibility = [cold.calculate_accessibility(mask) for mask in masks]
+
+    results = {}
+    results["calculate_accessibility"] = measure(
+        lambda i: cold.calculate_accessibility(inventories[i]), count)
+    results["calculate_accessibility_cached"] = measure(
+        lambda i: warm.calculate_accessibility(hot_set[i % len(hot_set)]), count)
+    results["get_missing_requirements"] = measure(
+        lambda i: cold.get_missing_requirements(locations[i % len(locations)], masks[i // len(locations) % count]),
+        count * 4)
+    results["determine_color"] = measure(
+        lambda i: cold.determine_color(locations[i % len(locations)], accessibility[i % count][locations[i % len(locations)]], i % 7 == 0),
+        count * 4)
+
+    cold.reset_accessibility({})
+    toggles = random.Random(seed + 1)
+    items = cold.items
+    results["update_accessibility"] = measure(
+        lambda i: cold.update_accessibility({toggles.choice(items): toggles.random() < 0.5}), count)
+    return results
+
+
+def median_results(runs):
+    """Per benchmark and statistic, the median over repeated runs."""
+    return {
+        name: {key: statistics.median(run[name][key] for run in runs) for key in stats}
+        for name, stats in runs[0].items()
+    }
+
+
+def environment():
+    """What a baseline must share with this run to be compared strictly."""
+    return {"python": platform.python_version(), "machine": platform.machine()}
+
+
+def compare(results, baseline, tolerance, p95_tolerance):
+    """Returns a list of regression messages (empty if none)."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            continue
+        if stats["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {stats['ops_per_sec']:.0f}/s < baseline {base['ops_per_sec']:.0f}/s")
+        if stats["p95_us"] > base["p95_us"] * (1 + p95_tolerance):
+            regressions.append(
+                f"{name}: p95 {stats['p95_us']:.1f}us > baseline {base['p95_us']:.1f}us")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LogicEngine benchmark suite")
+    parser.add_argument("--inventories", type=int, default=2000, help="random inventories per benchmark")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per benchmark (the median is compared)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput regression (0.25 = 25%%)")
+    parser.add_argument("--p95-tolerance", type=float, default=1.0, help="allowed p95 regression (1.0 = 2x)")
+    args = parser.parse_args(argv)
+
+    data_loader = DataLoader()
+    if not sanity_check(LogicEngine(data_loader)):
+        return 1
+
+    results = median_results([run_benchmarks(data_loader, args.inventories, args.seed)
+                              for _ in range(max(1, args.repeats))])
+    print(f"\n{'benchmark':32} {'ops/s':>12} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for name, stats in results.items():
+        print(f"{name:32} {stats['ops_per_sec']:12.0f} {stats['p50_us']:9.1f} {stats['p95_us']:9.1f} {stats['p99_us']:9.1f}")
+
+    if args.save_baseline:
+        payload = {
+            "meta": {
+                **environment(),
+                "inventories": args.inventories,
+                "seed": args.seed,
+                "repeats": args.repeats,
+            },
+            "benchmarks": results,
+        }
+        args.baseline.write_text(json.dumps(payload, indent=4), encoding="utf-8")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    meta = baseline.get("meta", {})
+    strict = all(meta.get(key) == value for key, value in environment().items())
+    if not strict:
+        print(f"\nNote: baseline recorded on {meta.get('machine')} (Python {meta.get('python')}); report only")
+    regressions = compare(results, baseline, args.tolerance, args.p95_tolerance)
+    if regressions:
+        print("\nREGRESSIONS:" if strict else "\nSlower than baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if strict else 0
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Semantic diff of two locations_logic.json files.
+
+Both files are compiled through LogicEngine and each location's rule is
+compared as a boolean function of the items, not as text: reordered,
+duplicated or subsumed alternatives are not reported, only inventories that
+one version accepts and the other rejects.
+
+    python compare_logic.py OLD.json [NEW.json]          # NEW defaults to the bundled file
+    python compare_logic.py OLD.json NEW.json --exhaustive
+
+The default mode compares shared BDDs (LogicEngine.compile_bdd). --exhaustive
+instead evaluates every subset of the items a location's rules mention with
+LogicEngine.evaluate_batch (requires NumPy). Exit code 1 if anything differs.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from lufia_tracker.core.bdd import BDD, FALSE
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.logic_engine import LogicEngine
+from lufia_tracker.utils.constants import DATA_DIR
+
+
+def load_logic(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_set(items):
+    return "{" + ", ".join(sorted(items)) + "}"
+
+
+def diff_symbolic(old, new, locations):
+    """
+    Returns {location: (old_only, new_only, old_example, new_example)} for every
+    location whose rules differ. Counts are over the subsets of the items either
+    rule mentions; examples are smallest inventories accepted by one side only.
+    """
+    bdd = BDD()
+    old.compile_bdd(bdd)
+    new.compile_bdd(bdd)
+    n_vars = len(bdd.var_names)
+
+    differences = {}
+    for location in locations:
+        a = old.location_bdd(location)
+        b = new.location_bdd(location)
+        if a == b:
+            continue
+        support = len(set(bdd.support(a)) | set(bdd.support(b)))
+        old_only = bdd.apply_and(a, bdd.apply_not(b))
+        new_only = bdd.apply_and(b, bdd.apply_not(a))
+        differences[location] = (
+            bdd.sat_count(old_only) >> (n_vars - support),
+            bdd.sat_count(new_only) >> (n_vars - support),
+            bdd.min_model(old_only) if old_only != FALSE else None,
+            bdd.min_model(new_only) if new_only != FALSE else None,
+        )
+    return differences
+
+
+def diff_exhaustive(old, new, locations, max_items):
+    """Same result as diff_symbolic, by evaluating all 2^k inventories over each location's items."""
+    import numpy as np
+
+    old_columns = {location: i for i, location in enumerate(old.locations)}
+    new_columns = {location: i for i, location in enumerate(new.locations)}
+
+    differences = {}
+    for location in locations:
+        support = sorted(set(old.location_items(location)) | set(new.location_items(location)))
+        if len(support) > max_items:
+            raise ValueError(f"'{location}' depends on {len(support)} items (limit {max_items}), use symbolic mode")
+
+        # Row r obtains support[i] iff bit i of r is set
+        rows = np.arange(1 << len(support), dtype=np.int64)
+        subsets = (rows[:, None] >> np.arange(len(support), dtype=np.int64)) & 1
+
+        results = []
+        for engine, columns in ((old, old_columns), (new, new_columns)):
+            if location not in columns:
+                results.append(np.zeros(len(rows), dtype=bool))
+                continue
+            matrix = np.zeros((len(rows), len(engine.items)), dtype=np.float32)
+            for i, name in enumerate(support):
+                if name in engine.items:
+                    matrix[:, engine.items.index(name)] = subsets[:, i]
+            results.append(engine.evaluate_batch(matrix)[:, columns[location]])
+
+        old_only = np.flatnonzero(results[0] & ~results[1])
+        new_only = np.flatnonzero(results[1] & ~results[0])
+        if not len(old_only) and not len(new_only):
+            continue
+
+        def example(rows_found):
+            if not len(rows_found):
+                return None
+            sizes = subsets[rows_found].sum(axis=1)
+            row = rows_found[int(np.argmin(sizes))]
+            return frozenset(name for i, name in enumerate(support) if (row >> i) & 1)
+
+        differences[location] = (len(old_only), len(new_only), example(old_only), example(new_only))
+    return differences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Semantic diff of two locations_logic.json files")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path, nargs="?", default=DATA_DIR / "locations_logic.json")
+    parser.add_argument("--exhaustive", action="store_true", help="vectorized enumeration instead of BDDs")
+    parser.add_argument("--max-items", type=int, default=20, help="per-location item limit for --exhaustive")
+    args = parser.parse_args(argv)
+
+    data_loader = DataLoader()
+    old = LogicEngine(data_loader, locations_logic=load_logic(args.old))
+    new = LogicEngine(data_loader, locations_logic=load_logic(args.new))
+
+    added = sorted(set(new.locations) - set(old.locations))
+    removed = sorted(set(old.locations) - set(new.locations))
+    common = sorted(set(old.locations) & set(new.locations))
+
+    if args.exhaustive:
+        differences = diff_exhaustive(old, new, common, args.max_items)
+    else:
+        differences = diff_symbolic(old, new, common)
+
+    for location in added:
+        print(f"+ {location} (only in {args.new})")
+    for location in removed:
+        print(f"- {location} (only in {args.old})")
+    for location, (old_only, new_only, old_example, new_example) in differences.items():
+        print(f"~ {location}")
+        if old_only:
+            print(f"    only old opens it for {old_only} item subset(s), e.g. {format_set(old_example)}")
+        if new_only:
+            print(f"    only new opens it for {new_only} item subset(s), e.g. {format_set(new_example)}")
+        print(f"    old: {' OR '.join(old.get_requirements(location)) or 'always'}")
+        print(f"    new: {' OR '.join(new.get_requirements(location)) or 'always'}")
+
+    changed = len(added) + len(removed) + len(differences)
+    print(f"\n{len(common)} common locations compared, {changed} semantic difference(s).")
+    return 1 if changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,10 @@ from PyQt6.QtWidgets import QApplication
 from .gui.mobile_window import MobileMainWindow
 from .core.data_loader import DataLoader
 from .core.logic_engine import LogicEngine
-from .core.state_manager import StateManager
+from .core.state_manager import StateManager, AutoSaver, user_data_dir
+from .core.autosave import restore_autosave
+from .core.broadcast import BroadcastServer
+from .utils.constants import AUTOSAVE_FILENAME, JOURNAL_FILENAME
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -75,7 +78,33 @@ def main():
     # Core Components
     data_loader = DataLoader()
     logic_engine = LogicEngine(data_loader)
-    state_manager = StateManager(logic_engine)
+    state_manager = StateManager(logic_engine, data_loader)
+    
+    # Autosave: recover the last session, then save changes in the background
+    data_dir = user_data_dir()
+    autosave_file = data_dir / AUTOSAVE_FILENAME
+    restore_autosave(state_manager, autosave_file)
+    
+    # Journal: one line per action; resuming replays what the autosave missed
+    # and keeps the undo history across restarts
+    try:
+        state_manager.open_journal(data_dir / JOURNAL_FILENAME)
+    except Exception as e:
+        logging.error(f"Could not open journal: {e}")
+    app.aboutToQuit.connect(lambda: state_manager.journal.close())
+    
+    autosaver = AutoSaver(state_manager, autosave_file)
+    app.aboutToQuit.connect(autosaver.stop)
+    
+    # Optional spectator stream for OBS browser sources / a second monitor
+    if "--broadcast" in sys.argv:
+        broadcast = BroadcastServer(state_manager)
+        try:
+            broadcast.start()
+            app.aboutToQuit.connect(broadcast.stop)
+        except OSError as e:
+            logging.error(f"Could not start broadcast server: {e}")
+            broadcast.stop()
     
     # GUI
     window = MobileMainWindow(state_manager, data_loader, logic_engine)
@@ -0,0 +1,161 @@
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from lufia_tracker.core.save_format import atomic_write
+
+SAVE_EVENTS = ("saved", "save_failed")
+
+
+def restore_autosave(state_manager, path: Union[str, Path]) -> bool:
+    """
+    Loads the autosave, if there is one. A save that fails to load is moved
+    aside to <name>.bad (replacing an older one) before autosaving starts,
+    so the first change does not overwrite the previous progress.
+    Returns True if the session was restored.
+    """
+    path = Path(path)
+    if not path.exists():
+        return False
+    try:
+        state_manager.load_state(path)
+        return True
+    except Exception as e:
+        bad_path = path.with_name(path.name + ".bad")
+        logging.error(f"Could not restore autosave {path}: {e}; keeping it as {bad_path}")
+        try:
+            os.replace(path, bad_path)
+        except OSError as move_error:
+            logging.error(f"Could not move {path} aside: {move_error}")
+        return False
+
+
+class SaveScheduler:
+    """
+    Saves the tracker state in the background whenever it changes.
+
+    Each poll() compares the state version (an int compare, no observer
+    wiring); call it periodically (AutoSaver drives it from a QTimer). A save
+    starts once the version has been stable for `quiet_ms` (a burst of
+    clicks becomes one save) or has been dirty for `max_delay_ms`. The
+    snapshot is taken on the polling thread (plain dict copies); encoding
+    and the atomic write run on a worker thread, one save at a time.
+
+    After a failed write (disk full, read-only path) the next attempt waits
+    `retry_ms`, doubling per consecutive failure up to `max_retry_ms`; a
+    successful save resets it. Observers hear "saved" (state version
+    written) and "save_failed" (error message).
+    """
+
+    def __init__(self, state_manager, path: Union[str, Path], quiet_ms: int = 1000,
+                 max_delay_ms: int = 10000, retry_ms: int = 1000, max_retry_ms: int = 60000):
+        self.state_manager = state_manager
+        self.path = Path(path)
+        self.quiet_ms = quiet_ms
+        self.max_delay_ms = max_delay_ms
+        self.retry_ms = retry_ms
+        self.max_retry_ms = max_retry_ms
+        self._observers: Dict[str, List[Callable]] = {}
+
+        self._saved_version = state_manager.version
+        self._seen_version = self._saved_version
+        self._dirty_since: Optional[float] = None
+        self._changed_at = 0.0
+        self._failures = 0
+        self._retry_at = 0.0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._future: Optional[Future] = None
+        self._future_version = 0
+
+    def subscribe(self, event: str, callback: Callable):
+        """Calls callback(*args) on every `event` (see SAVE_EVENTS)."""
+        if event not in SAVE_EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+        self._observers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable):
+        callbacks = self._observers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, event: str, *args):
+        for callback in tuple(self._observers.get(event, ())):
+            callback(*args)
+
+    @property
+    def pending(self) -> bool:
+        """True if there are changes not yet written."""
+        return self.state_manager.version != self._saved_version
+
+    def poll(self):
+        self._collect()
+
+        version = self.state_manager.version
+        if version == self._saved_version:
+            self._dirty_since = None
+            return
+        now = time.monotonic()
+        if version != self._seen_version:
+            self._seen_version = version
+            self._changed_at = now
+            if self._dirty_since is None:
+                self._dirty_since = now
+
+        if self._future is not None:
+            return # Previous save still writing
+        if now < self._retry_at:
+            return # Backing off after a failed save
+        quiet = (now - self._changed_at) * 1000 >= self.quiet_ms
+        overdue = (now - self._dirty_since) * 1000 >= self.max_delay_ms
+        if quiet or overdue:
+            self._start_save()
+
+    def _start_save(self):
+        version = self.state_manager.version
+        snapshot = self.state_manager.snapshot()
+        self._future = self._executor.submit(self._write, snapshot)
+        self._future_version = version
+
+    def _write(self, snapshot):
+        atomic_write(self.path, self.state_manager.encode_snapshot(snapshot, self.path))
+
+    def _collect(self):
+        """Picks up the result of a finished background save (polling thread)."""
+        if self._future is None or not self._future.done():
+            return
+        future, self._future = self._future, None
+        error = future.exception()
+        if error is not None:
+            delay_ms = min(self.retry_ms * 2 ** min(self._failures, 16), self.max_retry_ms)
+            self._failures += 1
+            self._retry_at = time.monotonic() + delay_ms / 1000
+            logging.error(f"Autosave to {self.path} failed: {error} (retrying in {delay_ms / 1000:g}s)")
+            self._notify("save_failed", str(error))
+            return
+        self._failures = 0
+        self._retry_at = 0.0
+        self._saved_version = self._future_version
+        if self._saved_version == self._seen_version:
+            self._dirty_since = None
+        self._notify("saved", self._saved_version)
+
+    def flush(self):
+        """Writes any pending changes now and waits for it (e.g. on quit)."""
+        self._wait()
+        if self.pending:
+            self._start_save()
+            self._wait()
+
+    def _wait(self):
+        if self._future is not None:
+            wait([self._future])
+            self._collect()
+
+    def stop(self):
+        """Flushes and shuts the worker down."""
+        self.flush()
+        self._executor.shutdown(wait=True)
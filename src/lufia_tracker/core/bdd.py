@@ -0,0 +1,255 @@
+from typing import Dict, List, Tuple, Iterable, FrozenSet, Optional
+
+FALSE = 0
+TRUE = 1
+
+
+class BDD:
+    """
+    Shared reduced ordered binary decision diagram manager.
+    Nodes are integers; 0 and 1 are the terminals. Every function built in
+    the same manager is canonical, so two functions are equivalent iff their
+    node ids are equal. Variables are ordered by first registration.
+    """
+
+    def __init__(self):
+        # node id -> (level, low, high); terminals sit below every variable
+        self._nodes: List[Tuple[int, int, int]] = [(1 << 30, 0, 0), (1 << 30, 1, 1)]
+        self._unique: Dict[Tuple[int, int, int], int] = {}
+        self._ite_cache: Dict[Tuple[int, int, int], int] = {}
+        self._var_names: List[str] = []
+        self._var_levels: Dict[str, int] = {}
+
+    # --- Variables ---
+
+    @property
+    def var_names(self) -> Tuple[str, ...]:
+        return tuple(self._var_names)
+
+    def var(self, name: str) -> int:
+        """Returns the function 'name is true', registering the variable if new."""
+        level = self._var_levels.get(name)
+        if level is None:
+            level = len(self._var_names)
+            self._var_names.append(name)
+            self._var_levels[name] = level
+        return self._mk(level, FALSE, TRUE)
+
+    def level(self, node: int) -> int:
+        return self._nodes[node][0]
+
+    # --- Construction ---
+
+    def _mk(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self._nodes)
+            self._nodes.append(key)
+            self._unique[key] = node
+        return node
+
+    def _cofactors(self, node: int, level: int) -> Tuple[int, int]:
+        node_level, low, high = self._nodes[node]
+        if node_level != level:
+            return node, node
+        return low, high
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """If-then-else: (f AND g) OR (NOT f AND h)."""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        cached = self._ite_cache.get(key)
+        if cached is not None:
+            return cached
+
+        top = min(self._nodes[f][0], self._nodes[g][0], self._nodes[h][0])
+        f0, f1 = self._cofactors(f, top)
+        g0, g1 = self._cofactors(g, top)
+        h0, h1 = self._cofactors(h, top)
+        result = self._mk(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self._ite_cache[key] = result
+        return result
+
+    def apply_not(self, f: int) -> int:
+        return self.ite(f, FALSE, TRUE)
+
+    def apply_and(self, f: int, g: int) -> int:
+        return self.ite(f, g, FALSE)
+
+    def apply_or(self, f: int, g: int) -> int:
+        return self.ite(f, TRUE, g)
+
+    def conjoin(self, nodes: Iterable[int]) -> int:
+        result = TRUE
+        for node in nodes:
+            result = self.apply_and(result, node)
+        return result
+
+    def disjoin(self, nodes: Iterable[int]) -> int:
+        result = FALSE
+        for node in nodes:
+            result = self.apply_or(result, node)
+        return result
+
+    def at_least(self, n: int, nodes: List[int]) -> int:
+        """Threshold function: at least n of the given functions are true."""
+        memo: Dict[Tuple[int, int], int] = {}
+
+        def build(i: int, k: int) -> int:
+            if k <= 0:
+                return TRUE
+            if len(nodes) - i < k:
+                return FALSE
+            key = (i, k)
+            if key not in memo:
+                memo[key] = self.ite(nodes[i], build(i + 1, k - 1), build(i + 1, k))
+            return memo[key]
+
+        return build(0, n)
+
+    def restrict(self, f: int, assignment: Dict[str, bool]) -> int:
+        """Fixes the given variables to constants."""
+        levels = {self._var_levels[name]: value for name, value in assignment.items() if name in self._var_levels}
+        memo: Dict[int, int] = {}
+
+        def walk(node: int) -> int:
+            if node <= TRUE:
+                return node
+            if node in memo:
+                return memo[node]
+            level, low, high = self._nodes[node]
+            if level in levels:
+                result = walk(high if levels[level] else low)
+            else:
+                result = self._mk(level, walk(low), walk(high))
+            memo[node] = result
+            return result
+
+        return walk(f)
+
+    def dual(self, f: int) -> int:
+        """NOT f(NOT x). For a monotone f its minimal models are the minimal hitting sets of f's clauses."""
+        memo: Dict[int, int] = {}
+
+        def swap(node: int) -> int:
+            if node <= TRUE:
+                return node
+            if node in memo:
+                return memo[node]
+            level, low, high = self._nodes[node]
+            memo[node] = self._mk(level, swap(high), swap(low))
+            return memo[node]
+
+        return self.apply_not(swap(f))
+
+    # --- Queries ---
+
+    def size(self, f: int) -> int:
+        """Number of internal nodes reachable from f."""
+        seen = set()
+        stack = [f]
+        while stack:
+            node = stack.pop()
+            if node <= TRUE or node in seen:
+                continue
+            seen.add(node)
+            stack.extend(self._nodes[node][1:])
+        return len(seen)
+
+    def support(self, f: int) -> Tuple[str, ...]:
+        """Variables f depends on, in variable order."""
+        levels = set()
+        seen = set()
+        stack = [f]
+        while stack:
+            node = stack.pop()
+            if node <= TRUE or node in seen:
+                continue
+            seen.add(node)
+            level, low, high = self._nodes[node]
+            levels.add(level)
+            stack.extend((low, high))
+        return tuple(self._var_names[level] for level in sorted(levels))
+
+    def sat_count(self, f: int, num_vars: Optional[int] = None) -> int:
+        """Number of satisfying assignments over the first num_vars variables (default: all)."""
+        n = len(self._var_names) if num_vars is None else num_vars
+        memo: Dict[int, int] = {}
+
+        def level_of(node: int) -> int:
+            return n if node <= TRUE else self._nodes[node][0]
+
+        def count(node: int) -> int:
+            # Models over the variables at or below this node's level
+            if node <= TRUE:
+                return node
+            if node in memo:
+                return memo[node]
+            level, low, high = self._nodes[node]
+            result = (count(low) << (level_of(low) - level - 1)) + (count(high) << (level_of(high) - level - 1))
+            memo[node] = result
+            return result
+
+        return count(f) << level_of(f)
+
+    def min_model(self, f: int) -> Optional[FrozenSet[str]]:
+        """A satisfying assignment with the fewest true variables (None if unsatisfiable)."""
+        inf = float("inf")
+        memo: Dict[int, float] = {}
+
+        def cost(node: int) -> float:
+            if node <= TRUE:
+                return 0 if node == TRUE else inf
+            if node not in memo:
+                _, low, high = self._nodes[node]
+                memo[node] = min(cost(low), 1 + cost(high))
+            return memo[node]
+
+        if cost(f) == inf:
+            return None
+        chosen = []
+        node = f
+        while node > TRUE:
+            level, low, high = self._nodes[node]
+            if cost(low) <= 1 + cost(high):
+                node = low
+            else:
+                chosen.append(self._var_names[level])
+                node = high
+        return frozenset(chosen)
+
+    def minimal_models(self, f: int) -> List[FrozenSet[str]]:
+        """
+        All subset-minimal sets of true variables satisfying a monotone f
+        (for access rules: the minimal item sets that open a location).
+        """
+        memo: Dict[int, List[FrozenSet[str]]] = {}
+
+        def walk(node: int) -> List[FrozenSet[str]]:
+            if node == FALSE:
+                return []
+            if node == TRUE:
+                return [frozenset()]
+            if node in memo:
+                return memo[node]
+            level, low, high = self._nodes[node]
+            low_sets = walk(low)
+            name = self._var_names[level]
+            result = list(low_sets)
+            for s in walk(high):
+                if not any(l <= s for l in low_sets):
+                    result.append(s | {name})
+            memo[node] = result
+            return result
+
+        return sorted(walk(f), key=lambda s: (len(s), sorted(s)))
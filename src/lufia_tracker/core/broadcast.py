@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from lufia_tracker.core.tracker_state import TrackerState
+from lufia_tracker.utils.constants import BROADCAST_PORT
+
+# Message keys (compact, one JSON object per message):
+#   v     state version
+#   snap  full state {inventory, locations, characters, assignments, shop, hints, position}
+#   i     {item: obtained}             l   {location: state}
+#   c     {character: obtained}        a   {location: character or null}
+#   s+    [[location, item], ...]      s-  [[location, item], ...]
+#   s     full shop list               h   hints text
+#   p     [x, y] player position
+_DELTA_EVENTS = ("inventory_delta", "location_changed", "character_changed", "character_assigned",
+                 "character_unassigned", "shop_item_added", "shop_item_removed", "shop_items_changed",
+                 "hints_changed", "player_position_changed", "batch_committed")
+
+
+def spectator_snapshot(state: TrackerState) -> Dict[str, Any]:
+    """The part of the state spectators see, as plain JSON-ready data."""
+    return {
+        "inventory": dict(state.inventory),
+        "locations": dict(state.locations),
+        "characters": state.obtained_characters,
+        "assignments": dict(state.character_locations),
+        "shop": [[entry["location"], entry["name"]] for entry in state.shop_items],
+        "hints": state.hints_text,
+        # TrackerState's (x, y): StateManager overrides it with a QPointF
+        "position": list(TrackerState.get_player_position(state)),
+    }
+
+
+def _apply_delta(snapshot: Dict[str, Any], message: Dict[str, Any]):
+    """Folds a delta message into a spectator_snapshot() dict."""
+    snapshot["inventory"].update(message.get("i", ()))
+    snapshot["locations"].update(message.get("l", ()))
+    snapshot["characters"].update(message.get("c", ()))
+    for location, character in message.get("a", {}).items():
+        if character is None:
+            snapshot["assignments"].pop(location, None)
+        else:
+            snapshot["assignments"][location] = character
+    if "s" in message:
+        snapshot["shop"] = [list(entry) for entry in message["s"]]
+    for entry in message.get("s+", ()):
+        if entry not in snapshot["shop"]:
+            snapshot["shop"].append(list(entry))
+    for entry in message.get("s-", ()):
+        if entry in snapshot["shop"]:
+            snapshot["shop"].remove(entry)
+    if "h" in message:
+        snapshot["hints"] = message["h"]
+    if "p" in message:
+        snapshot["position"] = list(message["p"])
+
+
+class _Client:
+    __slots__ = ("queue", "sse")
+
+    def __init__(self, queue_size: int, sse: bool):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(queue_size)
+        self.sse = sse
+
+    def frame(self, payload: str) -> bytes:
+        return (f"data: {payload}\n\n" if self.sse else payload + "\n").encode("utf-8")
+
+
+class BroadcastServer:
+    """
+    Streams tracker changes to local spectators (OBS browser sources, a
+    second-monitor view) over HTTP:
+
+        GET /events     Server-Sent Events (EventSource in a browser)
+        GET /stream     newline-delimited JSON
+        GET /snapshot   the current state once
+
+    A client first receives one snapshot message, then compact deltas (see
+    the key table above). Observers on the state turn each event into a
+    delta on the thread that changed it, which only hands it to the asyncio
+    loop (call_soon_threadsafe), so the GUI thread never waits for a client.
+    The loop keeps its own copy of the spectator state, so late joiners are
+    served without touching the tracker. Batches (load, reset, undo, seek)
+    are sent as a fresh snapshot.
+
+    Every client has a bounded queue; a client that falls behind has its
+    backlog dropped and replaced by one snapshot of the current state.
+
+    start() runs the server on a background thread (GUI use); headless
+    tools on an existing loop can await serve() instead.
+    """
+
+    def __init__(self, state: TrackerState, host: str = "127.0.0.1", port: int = BROADCAST_PORT, queue_size: int = 256):
+        self.state = state
+        self.host = host
+        self.port = port
+        self.queue_size = max(1, queue_size)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._clients: List[_Client] = []
+        self._handlers: Set[asyncio.Task] = set()
+        self._snapshot = spectator_snapshot(state)
+        self._version = state.version
+        self._resyncs = 0
+
+        self._callbacks = {event: self._make_callback(event) for event in _DELTA_EVENTS}
+        for event, callback in self._callbacks.items():
+            state.subscribe(event, callback)
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    @property
+    def resync_count(self) -> int:
+        """How often a slow client's backlog was replaced by a snapshot."""
+        return self._resyncs
+
+    # --- Tracker side (thread that changes the state) ---
+
+    def _make_callback(self, event: str):
+        def callback(*args):
+            message = self._to_message(event, args)
+            loop = self._loop
+            if message is not None and loop is not None and not loop.is_closed():
+                message["v"] = self.state.version
+                loop.call_soon_threadsafe(self._publish, message)
+        return callback
+
+    def _to_message(self, event: str, args) -> Optional[Dict[str, Any]]:
+        if event == "inventory_delta":
+            return {"i": args[0]}
+        if event == "location_changed":
+            return {"l": {args[0]: args[1]}}
+        if event == "character_changed":
+            return {"c": {args[0]: args[1]}}
+        if event == "character_assigned":
+            return {"a": {args[0]: args[1]}}
+        if event == "character_unassigned":
+            return {"a": {args[0]: None}}
+        if event == "shop_item_added":
+            return {"s+": [[args[0], args[1]]]}
+        if event == "shop_item_removed":
+            return {"s-": [[args[0], args[1]]]}
+        if event == "shop_items_changed":
+            return {"s": [[entry["location"], entry["name"]] for entry in args[0]]}
+        if event == "hints_changed":
+            return {"h": args[0]}
+        if event == "player_position_changed":
+            return {"p": [args[0], args[1]]}
+        if event == "batch_committed":
+            return {"snap": spectator_snapshot(self.state)}
+        return None
+
+    # --- Loop side ---
+
+    def _publish(self, message: Dict[str, Any]):
+        if "snap" in message:
+            self._snapshot = message["snap"]
+        else:
+            _apply_delta(self._snapshot, message)
+        self._version = message["v"]
+
+        payload = json.dumps(message, separators=(",", ":"))
+        snapshot_payload = None
+        for client in self._clients:
+            try:
+                client.queue.put_nowait(client.frame(payload))
+            except asyncio.QueueFull:
+                # Fell behind: the current snapshot replaces the whole backlog
+                if snapshot_payload is None:
+                    snapshot_payload = self._snapshot_payload()
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                client.queue.put_nowait(client.frame(snapshot_payload))
+                self._resyncs += 1
+
+    def _snapshot_payload(self) -> str:
+        return json.dumps({"v": self._version, "snap": self._snapshot}, separators=(",", ":"))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            await self._serve_request(reader, writer)
+        except asyncio.CancelledError:
+            pass # Server shutting down
+        finally:
+            self._handlers.discard(task)
+
+    async def _serve_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        parts = request.split(b"\r\n", 1)[0].split()
+        path = parts[1].decode("latin-1").split("?", 1)[0] if len(parts) >= 2 else ""
+
+        try:
+            if path == "/snapshot":
+                self._respond(writer, "200 OK", "application/json", self._snapshot_payload().encode("utf-8"))
+            elif path in ("/events", "/stream"):
+                await self._stream(writer, sse=(path == "/events"))
+            else:
+                self._respond(writer, "404 Not Found", "text/plain", b"not found\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes):
+        writer.write(self._headers(status, content_type, len(body)) + body)
+
+    def _headers(self, status: str, content_type: str, length: Optional[int] = None) -> bytes:
+        lines = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", "Cache-Control: no-cache",
+                 "Access-Control-Allow-Origin: *", "Connection: close"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _stream(self, writer: asyncio.StreamWriter, sse: bool):
+        client = _Client(self.queue_size, sse)
+        content_type = "text/event-stream" if sse else "application/x-ndjson"
+        writer.write(self._headers("200 OK", content_type) + client.frame(self._snapshot_payload()))
+        self._clients.append(client)
+        try:
+            # Also checks the flag: wait_for() can swallow a cancel that races a get()
+            while not self._stopped.is_set():
+                try:
+                    frame = await asyncio.wait_for(client.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keepalive, also notices clients that went away
+                    frame = b": ping\n\n" if sse else b"\n"
+                writer.write(frame)
+                await writer.drain()
+        finally:
+            self._clients.remove(client)
+
+    async def serve(self):
+        """
+        Serves on the running loop until stop(). Call it on the thread that
+        changes the state (headless tools); the GUI uses start().
+        """
+        self._resync()
+        await self._serve()
+
+    def _resync(self):
+        """Catches up with changes made while no loop was running (state's thread)."""
+        self._snapshot = spectator_snapshot(self.state)
+        self._version = self.state.version
+
+    async def _serve(self, ready: Optional[Callable[[], None]] = None):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logging.info(f"Broadcast server listening on http://{self.host}:{self.port}/events")
+        if ready is not None:
+            ready()
+        try:
+            await self._stopped.wait()
+        finally:
+            self._server.close()
+            await self._server.wait_closed()
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            self._server = None
+            self._loop = None
+
+    # --- Background thread ---
+
+    def start(self):
+        """
+        Serves on a daemon thread with its own event loop. Call it on the
+        thread that changes the state; returns once listening.
+        """
+        if self._thread is not None:
+            return
+        self._resync()
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self._serve(ready.set))
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="broadcast", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop(self):
+        """Stops the server (from any thread) and unsubscribes from the state."""
+        loop, stopped = self._loop, self._stopped
+        if loop is not None and stopped is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(stopped.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        for event, callback in self._callbacks.items():
+            self.state.unsubscribe(event, callback)
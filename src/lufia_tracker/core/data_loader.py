@@ -1,7 +1,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from lufia_tracker.utils.constants import DATA_DIR, IMAGES_DIR
 
 class DataLoader:
@@ -12,6 +12,7 @@ class DataLoader:
     
     def __init__(self):
         self._cache: Dict[str, Any] = {}
+        self._spoiler_location_index: Optional[Dict[str, str]] = None
         
     def load_json(self, filename: str) -> Dict[str, Any]:
         """Loads a JSON file from the data directory."""
@@ -46,6 +47,26 @@ class DataLoader:
     def get_tool_items(self) -> Dict[str, Any]:
         return self.load_json("tool_items.json")
 
+    def get_scenario_items(self) -> Dict[str, Any]:
+        return self.load_json("scenario_items.json")
+
+    def get_location_name_mapping(self) -> Dict[str, str]:
+        """Internal location name -> spoiler log name."""
+        return self.load_json("location_name_mapping.json")
+
+    def get_spoiler_location_index(self) -> Dict[str, str]:
+        """
+        Reverse of the location name mapping: spoiler log name -> internal name.
+        Built once. If several internal names share a spoiler name, the first
+        one in the mapping file wins (same as the v1.3 linear search).
+        """
+        if self._spoiler_location_index is None:
+            index: Dict[str, str] = {}
+            for internal_name, spoiler_name in self.get_location_name_mapping().items():
+                index.setdefault(spoiler_name, internal_name)
+            self._spoiler_location_index = index
+        return self._spoiler_location_index
+
     def resolve_image_path(self, relative_path: str) -> str:
         """Resolves a relative image path to an absolute system path."""
         full_path = IMAGES_DIR / relative_path
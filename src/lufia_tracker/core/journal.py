@@ -0,0 +1,353 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# A change is [kind, key, old, new]; old/new of None mean "absent".
+#   "i"  inventory override       key = item name
+#   "l"  location override        key = location name
+#   "c"  character obtained       key = character name
+#   "a"  character assignment     key = location, values = character names
+#   "s"  shop entry               key = [location, item], values = present (bool)
+#   "h"  hints text               key = None
+Change = List[Any]
+
+# One worker fsyncs every file journal in the process (see Journal._request_sync)
+_sync_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_sync_executor() -> ThreadPoolExecutor:
+    global _sync_executor
+    if _sync_executor is None:
+        _sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal-sync")
+    return _sync_executor
+
+
+class JournalEntry:
+    """One recorded manual action and the state writes it made."""
+    __slots__ = ("seq", "action", "changes")
+
+    def __init__(self, seq: int, action: str, changes: List[Change]):
+        self.seq = seq
+        self.action = action
+        self.changes = changes
+
+
+class JournalReplay:
+    """
+    Result of Journal.read: the last snapshot (None if the file has none) and
+    every state transition after it, as (changes, forward) pairs in order.
+    forward=True applies the new values (action / redo), False the old ones
+    (undo). done/undone are the undo/redo stacks at the end of the file.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.transitions: List[Tuple[List[Change], bool]] = []
+        self.done: List[JournalEntry] = []
+        self.undone: List[JournalEntry] = []
+        self.seq = 0
+        self.lines = 0
+
+    def _pop(self, stack: List[JournalEntry], record: Dict[str, Any]) -> JournalEntry:
+        # The named action is normally on top of the stack; if it predates
+        # the snapshot, rebuild it from the changes stored in the record.
+        target = record.get("u", record.get("r"))
+        if stack and stack[-1].seq == target:
+            return stack.pop()
+        return JournalEntry(target, "restored", record.get("c", []))
+
+
+class Journal:
+    """
+    Append-only event journal of manual actions with undo/redo.
+
+    Every action is one JSON line with a sequence number and time, e.g.
+        {"a": "toggle", "c": [["i", "Bomb", null, true]], "s": 12, "t": 1760700000.5}
+    Undo and redo are appended too ({"s": 13, "u": 12, "c": [...]}, "r" for redo),
+    naming the action and repeating its changes so they replay even when the
+    action itself lies before the last snapshot. Lines are never rewritten.
+
+    The file is compacted by starting a new one with a snapshot line: on
+    every reset snapshot (load / reset), and at the first snapshot once it
+    holds `compact_lines` lines. The undo/redo stacks (their last
+    `snapshot_interval` entries) travel in that first snapshot line
+    ("done" / "undone"). The previous file is kept as <name>.1, replacing
+    any older one, so disk use and the startup replay stay bounded.
+
+    Each line is flushed to the OS as it is written, so an app crash loses
+    at most the line being written. The fsync (durability against power
+    loss) runs on a background worker: lines written while one is queued
+    share it (group commit), so the GUI thread never waits for storage.
+    close() syncs before returning. With background_sync=False every write
+    is fsynced inline.
+    A failed write (disk full, directory gone) is logged, never raised:
+    the journal keeps working in memory and retries the file after
+    `retry_s`, doubling per consecutive failure up to `max_retry_s`. Lines
+    lost meanwhile make the file stale, so until a snapshot line has been
+    written again only snapshots are written (needs_snapshot turns true).
+    Every `snapshot_interval` events a full state snapshot line
+    ({"s": 15, "snap": {...}}) bounds how much has to be replayed; the undo
+    history carries across it. Only a reset snapshot (load / reset,
+    "reset": true) ends the history.
+
+    Undo/redo are stack operations (O(1) per action). The journal only stores
+    changes; StateManager applies them (see StateManager.undo / redo).
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, snapshot_interval: int = 200,
+                 background_sync: bool = True, retry_s: float = 1.0, max_retry_s: float = 60.0,
+                 compact_lines: int = 2000):
+        self.path = Path(path) if path is not None else None
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.compact_lines = max(1, compact_lines)
+        self._lines = 0 # In the current file
+        self.background_sync = background_sync
+        self.retry_s = retry_s
+        self.max_retry_s = max_retry_s
+        self._seq = 0
+        self._since_snapshot = 0
+        self._done: List[JournalEntry] = []
+        self._undone: List[JournalEntry] = []
+        self._file = None
+        self._file_lock = threading.Lock() # Held while the worker syncs, and to close
+        self._sync_queued = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stale = False # Lines were lost: the file needs a snapshot
+
+    # --- Persistence ---
+
+    @property
+    def write_failed(self) -> bool:
+        """True while the file is not being written (last write failed)."""
+        return self._failures > 0
+
+    def _write(self, record: Dict[str, Any]):
+        self._seq += 1
+        record["s"] = self._seq
+        record["t"] = round(time.time(), 3)
+        if self.path is None:
+            return
+        if self._stale and "snap" not in record or time.monotonic() < self._retry_at:
+            self._stale = True
+            return
+        try:
+            if self._file is None:
+                if self._failures and self.path.exists():
+                    self._drop_partial_line(self.path)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+            if not self.background_sync:
+                os.fsync(self._file.fileno())
+        except OSError as e:
+            self._write_failed(e)
+            return
+        self._lines += 1
+        self._failures = 0
+        self._retry_at = 0.0
+        self._stale = False
+        if self.background_sync:
+            self._request_sync()
+
+    def _write_failed(self, error: OSError):
+        delay_s = min(self.retry_s * 2 ** min(self._failures, 16), self.max_retry_s)
+        self._failures += 1
+        self._retry_at = time.monotonic() + delay_s
+        self._stale = True
+        logging.error(f"Journal: writing {self.path} failed: {error} (retrying in {delay_s:g}s)")
+        with self._file_lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass # The unwritten buffer is lost either way
+                self._file = None
+
+    def _request_sync(self):
+        # Queue at most one sync; lines written before it starts are included
+        if not self._sync_queued:
+            self._sync_queued = True
+            _get_sync_executor().submit(self._sync)
+
+    def _sync(self):
+        self._sync_queued = False
+        with self._file_lock:
+            if self._file is not None:
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError as e:
+                    logging.error(f"Journal: fsync of {self.path} failed: {e}")
+
+    @staticmethod
+    def _drop_partial_line(path: Path):
+        """Truncates an unterminated last line so new records start on a line of their own."""
+        with open(path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+    def close(self):
+        with self._file_lock:
+            if self._file is not None:
+                try:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._file.close()
+                except OSError as e:
+                    logging.error(f"Journal: closing {self.path} failed: {e}")
+                self._file = None
+
+    @staticmethod
+    def read(path: Union[str, Path]) -> "JournalReplay":
+        """
+        Reads a journal file: the state from its last snapshot on, and the
+        undo/redo stacks since the last reset snapshot. A truncated last line
+        (crash mid-write) is ignored. See JournalReplay.
+        """
+        replay = JournalReplay()
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                replay.lines = line_no
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Journal: skipping unreadable line {line_no} in {path}")
+                    continue
+                replay.seq = record.get("s", replay.seq)
+                if "snap" in record:
+                    replay.snapshot = record["snap"]
+                    replay.transitions = []
+                    if record.get("reset"):
+                        # Load / reset: earlier actions are no longer undoable
+                        replay.done, replay.undone = [], []
+                    elif "done" in record:
+                        # First line of a compacted file
+                        replay.done = [JournalEntry(*entry) for entry in record["done"]]
+                        replay.undone = [JournalEntry(*entry) for entry in record.get("undone", [])]
+                elif "a" in record:
+                    entry = JournalEntry(replay.seq, record["a"], record.get("c", []))
+                    replay.transitions.append((entry.changes, True))
+                    replay.done.append(entry)
+                    replay.undone = []
+                elif "u" in record:
+                    entry = replay._pop(replay.done, record)
+                    replay.transitions.append((entry.changes, False))
+                    replay.undone.append(entry)
+                elif "r" in record:
+                    entry = replay._pop(replay.undone, record)
+                    replay.transitions.append((entry.changes, True))
+                    replay.done.append(entry)
+        return replay
+
+    def resume(self, path: Union[str, Path]) -> "JournalReplay":
+        """
+        Continues an existing journal file: restores the undo/redo stacks and
+        sequence number. The caller applies the returned replay to its state.
+        """
+        replay = self.read(path)
+        self._drop_partial_line(Path(path)) # Raises (journal unchanged) if the file is not writable
+        self.close()
+        self.path = Path(path)
+        self._seq = replay.seq
+        self._done = list(replay.done)
+        self._undone = list(replay.undone)
+        self._since_snapshot = len(replay.transitions)
+        self._lines = replay.lines
+        return replay
+
+    # --- Recording ---
+
+    def record(self, action: str, changes: List[Change]) -> JournalEntry:
+        """Appends a new action. Clears the redo stack."""
+        self._write({"a": action, "c": changes})
+        entry = JournalEntry(self._seq, action, changes)
+        self._done.append(entry)
+        self._undone.clear()
+        self._since_snapshot += 1
+        return entry
+
+    def snapshot(self, state: Dict[str, Any], reset_history: bool = False):
+        """
+        Appends a full state snapshot. With reset_history (after a load or a
+        reset) earlier actions can no longer be undone. Either may start a
+        new file (see compaction above).
+        """
+        if reset_history:
+            self._done.clear()
+            self._undone.clear()
+        record = {"snap": state, "reset": True} if reset_history else {"snap": state}
+        if self.path is not None and (reset_history or self.needs_compaction):
+            self._rotate()
+            if not reset_history:
+                record["done"] = self._history(self._done)
+                record["undone"] = self._history(self._undone)
+        self._write(record)
+        self._since_snapshot = 0
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._lines >= self.compact_lines
+
+    def _history(self, stack: List[JournalEntry]) -> List[list]:
+        return [[entry.seq, entry.action, entry.changes] for entry in stack[-self.snapshot_interval:]]
+
+    def _rotate(self):
+        """Moves the current file to <name>.1; the next line starts a new file."""
+        self.close()
+        if self._lines == 0:
+            return # Nothing written yet (new or empty file)
+        try:
+            os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.error(f"Journal: could not rotate {self.path}: {e}")
+            return # Keep appending to it
+        self._lines = 0
+
+    @property
+    def needs_snapshot(self) -> bool:
+        if self._stale:
+            return time.monotonic() >= self._retry_at
+        return self._since_snapshot >= self.snapshot_interval
+
+    # --- Undo / Redo ---
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._done)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._undone)
+
+    def undo(self) -> Optional[JournalEntry]:
+        """Moves the last action to the redo stack and returns it (apply its old values)."""
+        if not self._done:
+            return None
+        entry = self._done.pop()
+        self._undone.append(entry)
+        self._write({"u": entry.seq, "c": entry.changes})
+        self._since_snapshot += 1
+        return entry
+
+    def redo(self) -> Optional[JournalEntry]:
+        """Moves the last undone action back and returns it (apply its new values)."""
+        if not self._undone:
+            return None
+        entry = self._undone.pop()
+        self._done.append(entry)
+        self._write({"r": entry.seq, "c": entry.changes})
+        self._since_snapshot += 1
+        return entry
@@ -1,15 +1,13 @@
 import json
 import os
 import logging
-from PyQt6.QtCore import QObject, QPoint
 from lufia_tracker.utils.constants import DATA_DIR
 
-class LayoutManager(QObject):
+class LayoutManager:
     """
     Manages the saving and loading of widget positions within their containers.
     """
     def __init__(self):
-        super().__init__()
         self.config_path = DATA_DIR / "layout_config.json"
         self._layouts = {}
         self.load_layout()
@@ -0,0 +1,246 @@
+import math
+from typing import Dict, List, Set, Tuple, Iterable
+
+# Node kinds
+MASK = 0   # (MASK, item_mask)           -> all items of the mask obtained
+AND = 1    # (AND, children)             -> all children true
+OR = 2     # (OR, children)              -> any child true
+COUNT = 3  # (COUNT, n, children)        -> at least n children true
+
+
+class LogicDAG:
+    """
+    Hash-consed DAG of compiled access expressions.
+    Identical sub-expressions map to the same node id, so their result is
+    computed once per evaluation and shared by every location using them.
+    Nodes are appended children-first, which makes list order a topological order.
+
+    dnf() refuses (ValueError) to flatten a node into more than
+    `max_clauses` clauses instead of expanding exponentially; such nodes
+    are still evaluated directly (evaluate_node, leaf_mask).
+    """
+
+    def __init__(self, max_clauses: int = 4096):
+        self.max_clauses = max_clauses
+        self._nodes: List[Tuple] = []
+        self._index: Dict[Tuple, int] = {}
+        self._dnf_cache: Dict[int, Tuple[int, ...]] = {}
+        self._oversized: Set[int] = set() # Nodes whose dnf() exceeds max_clauses
+        self._subgraphs: Dict[int, Tuple[int, ...]] = {}
+        self.TRUE = self.mask(0)
+        self.FALSE = self._intern((OR, ()))
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def node(self, node_id: int) -> Tuple:
+        return self._nodes[node_id]
+
+    def _intern(self, key: Tuple) -> int:
+        node_id = self._index.get(key)
+        if node_id is None:
+            node_id = len(self._nodes)
+            self._nodes.append(key)
+            self._index[key] = node_id
+        return node_id
+
+    # --- Constructors (simplify while building) ---
+
+    def mask(self, item_mask: int) -> int:
+        return self._intern((MASK, item_mask))
+
+    def all_of(self, children: Iterable[int]) -> int:
+        item_mask = 0
+        others = set()
+        for child in children:
+            kind = self._nodes[child][0]
+            if child == self.FALSE:
+                return self.FALSE
+            if kind == MASK:
+                item_mask |= self._nodes[child][1]
+            elif kind == AND:
+                for grandchild in self._nodes[child][1]:
+                    if self._nodes[grandchild][0] == MASK:
+                        item_mask |= self._nodes[grandchild][1]
+                    else:
+                        others.add(grandchild)
+            else:
+                others.add(child)
+
+        if not others:
+            return self.mask(item_mask)
+        if item_mask:
+            others.add(self.mask(item_mask))
+        if len(others) == 1:
+            return others.pop()
+        return self._intern((AND, tuple(sorted(others))))
+
+    def any_of(self, children: Iterable[int]) -> int:
+        flat = set()
+        for child in children:
+            if child == self.TRUE:
+                return self.TRUE
+            if self._nodes[child][0] == OR:
+                flat.update(self._nodes[child][1])
+            else:
+                flat.add(child)
+
+        # Absorption: an item conjunction that is a superset of another
+        # alternative can never change the result.
+        masks = [self._nodes[c][1] for c in flat if self._nodes[c][0] == MASK]
+        for child in list(flat):
+            node = self._nodes[child]
+            if node[0] == MASK and any(m != node[1] and (m & node[1]) == m for m in masks):
+                flat.discard(child)
+
+        if len(flat) == 1:
+            return flat.pop()
+        return self._intern((OR, tuple(sorted(flat))))
+
+    def at_least(self, n: int, children: Iterable[int]) -> int:
+        children = sorted(children) # Multiset: duplicates count twice
+        if n <= 0:
+            return self.TRUE
+        if n > len(children):
+            return self.FALSE
+        if n == 1:
+            return self.any_of(children)
+        if n == len(children) and len(set(children)) == len(children):
+            return self.all_of(children)
+        return self._intern((COUNT, n, tuple(children)))
+
+    # --- Evaluation ---
+
+    def evaluate(self, inv_mask: int) -> List[bool]:
+        """Evaluates every node once, in topological order. Returns values indexed by node id."""
+        values = [False] * len(self._nodes)
+        for node_id, node in enumerate(self._nodes):
+            kind = node[0]
+            if kind == MASK:
+                values[node_id] = (inv_mask & node[1]) == node[1]
+            elif kind == AND:
+                values[node_id] = all(values[c] for c in node[1])
+            elif kind == OR:
+                values[node_id] = any(values[c] for c in node[1])
+            else:
+                values[node_id] = sum(values[c] for c in node[2]) >= node[1]
+        return values
+
+    def _subgraph(self, node_id: int) -> Tuple[int, ...]:
+        """The node and everything below it, in topological (id) order."""
+        nodes = self._subgraphs.get(node_id)
+        if nodes is None:
+            reached = {node_id}
+            stack = [node_id]
+            while stack:
+                node = self._nodes[stack.pop()]
+                if node[0] != MASK:
+                    for child in node[-1]:
+                        if child not in reached:
+                            reached.add(child)
+                            stack.append(child)
+            nodes = self._subgraphs[node_id] = tuple(sorted(reached))
+        return nodes
+
+    def evaluate_node(self, node_id: int, inv_mask: int) -> bool:
+        """Evaluates a single node, visiting only the nodes below it."""
+        values: Dict[int, bool] = {}
+        for n in self._subgraph(node_id):
+            node = self._nodes[n]
+            kind = node[0]
+            if kind == MASK:
+                values[n] = (inv_mask & node[1]) == node[1]
+            elif kind == AND:
+                values[n] = all(values[c] for c in node[1])
+            elif kind == OR:
+                values[n] = any(values[c] for c in node[1])
+            else:
+                values[n] = sum(values[c] for c in node[2]) >= node[1]
+        return values[node_id]
+
+    def leaf_mask(self, node_id: int) -> int:
+        """Every item bit a node depends on (union of the MASK leaves below it)."""
+        mask = 0
+        for n in self._subgraph(node_id):
+            if self._nodes[n][0] == MASK:
+                mask |= self._nodes[n][1]
+        return mask
+
+    def dnf(self, node_id: int) -> Tuple[int, ...]:
+        """
+        Flattens a node into disjunctive normal form: a tuple of clause masks,
+        any one of which (all its items obtained) satisfies the node.
+        Used by the mask based paths (index, batch, spheres, ranking).
+        OR keeps its children's clauses as written; AND and COUNT combine
+        them with redundant clauses dropped as they go.
+        Raises ValueError if the result would exceed max_clauses.
+        """
+        cached = self._dnf_cache.get(node_id)
+        if cached is not None:
+            return cached
+        if node_id in self._oversized:
+            self._check_size(self.max_clauses + 1)
+
+        node = self._nodes[node_id]
+        kind = node[0]
+        try:
+            if kind == MASK:
+                clauses = [node[1]]
+            elif kind == OR:
+                clauses = [m for child in node[1] for m in self.dnf(child)]
+            elif kind == AND:
+                clauses = (0,)
+                for child in node[1]:
+                    clauses = self._dnf_and(clauses, self.dnf(child))
+            else:
+                clauses = self._dnf_at_least(node[1], node[2])
+            result = tuple(dict.fromkeys(clauses)) # Dedupe, keep order
+            self._check_size(len(result))
+        except ValueError:
+            self._oversized.add(node_id) # Fail fast next time (e.g. for every parent)
+            raise
+        self._dnf_cache[node_id] = result
+        return result
+
+    def _check_size(self, size: int):
+        if size > self.max_clauses:
+            raise ValueError(f"expression expands to more than {self.max_clauses} clauses")
+
+    def _dnf_and(self, left: Tuple[int, ...], right: Tuple[int, ...]) -> Tuple[int, ...]:
+        self._check_size(len(left) * len(right))
+        return normalize_clauses(a | b for a in left for b in right)
+
+    def _dnf_at_least(self, n: int, children: Tuple[int, ...]) -> Tuple[int, ...]:
+        # Single-clause children over disjoint items give exactly
+        # C(children, n) clauses; reject those before normalizing them all.
+        child_masks = [self.dnf(child) for child in children]
+        if all(len(masks) == 1 and masks[0] for masks in child_masks):
+            union = 0
+            for (mask,) in child_masks:
+                if union & mask:
+                    break
+                union |= mask
+            else:
+                self._check_size(math.comb(len(children), n))
+
+        # table[k]: clauses for "at least k of the children seen so far".
+        # O(n * children) combines instead of enumerating every n-subset.
+        table = [(0,)] + [()] * n
+        for child in children:
+            child_clauses = self.dnf(child)
+            for k in range(n, 0, -1):
+                if table[k - 1]:
+                    table[k] = normalize_clauses(table[k] + self._dnf_and(table[k - 1], child_clauses))
+        return table[n]
+
+
+def normalize_clauses(clauses: Iterable[int]) -> Tuple[int, ...]:
+    """
+    Dedupes clause masks and drops every clause that is a superset of another.
+    Output is sorted by clause size, then mask value (canonical form).
+    """
+    kept: List[int] = []
+    for clause in sorted(set(clauses), key=lambda m: (bin(m).count("1"), m)):
+        if not any((k & clause) == k for k in kept):
+            kept.append(clause)
+    return tuple(kept)
@@ -1,104 +1,1046 @@
 import logging
-from typing import Dict, Set, Any
+import threading
+from collections import OrderedDict
+from typing import Dict, Set, Any, Tuple, Union, Iterable, FrozenSet, NamedTuple, Optional, Sequence, List
+
 from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.bdd import BDD, FALSE as BDD_FALSE
+from lufia_tracker.core.logic_dag import LogicDAG, MASK, AND, OR, normalize_clauses
 from lufia_tracker.utils.constants import ALWAYS_ACCESSIBLE_LOCATIONS
 
+# NumPy is optional and only needed for LogicEngine.evaluate_batch; it is
+# imported on first use so headless tools don't pay for it
+np = None
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("evaluate_batch requires NumPy (pip install numpy)") from None
+        np = numpy
+    return np
+
+
+class AccessibilityCacheInfo(NamedTuple):
+    """Instrumentation snapshot of the accessibility LRU cache."""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class Sphere(NamedTuple):
+    """One reachability sphere: locations that open together and the items found there."""
+    index: int
+    locations: Tuple[str, ...]
+    items: Tuple[str, ...]
+
+
+class Playthrough(NamedTuple):
+    """Result of LogicEngine.compute_spheres."""
+    spheres: Tuple[Sphere, ...]
+    unreachable: Tuple[str, ...]
+    final_mask: int
+
+
+class ItemRecommendation(NamedTuple):
+    """An unobtained item and the locations it would open right now."""
+    item: str
+    unlocks: Tuple[str, ...]
+
+
+class RuleOptimizationReport(NamedTuple):
+    """What the load-time rule optimizer removed and shared."""
+    clauses_before: int
+    clauses_after: int
+    duplicates_removed: int
+    subsumed_removed: int
+    distinct_rule_sets: int
+    shared_rule_sets: int
+    redundant: Dict[str, Tuple[str, ...]] # location -> removed clauses, e.g. ("Bomb & Hook & Cloud",)
+    dag_only: Tuple[str, ...] = () # Locations too large to flatten (evaluated through the DAG)
+
+
+class _CacheEntry:
+    """Cached results for one inventory mask. Tooltips and unlock gains are filled lazily."""
+    __slots__ = ("accessibility", "tooltips", "gains")
+
+    def __init__(self, accessibility: Dict[str, bool]):
+        self.accessibility = accessibility
+        self.tooltips: Optional[Dict[str, str]] = None
+        self.gains: Optional[Dict[int, Tuple[str, ...]]] = None
+
+
+class AccessibilityTracker:
+    """
+    Incremental accessibility for one tracked inventory. Holds only the
+    inventory mask, the current result and, per location, the items that
+    would open it on their own (for rank_next_items); all rules and caches
+    stay in the (shared) LogicEngine, so every session can have its own
+    tracker.
+    """
+    __slots__ = ("engine", "mask", "_accessibility", "_gains", "_unlocks", "_sorted_unlocks")
+
+    def __init__(self, engine: "LogicEngine"):
+        self.engine = engine
+        self.mask = 0
+        self._accessibility: Dict[str, bool] = engine.calculate_accessibility(0)
+        self._gains: Dict[str, Tuple[int, ...]] = {}
+        self._unlocks: Dict[int, Set[str]] = {} # item bit -> locations it alone would open
+        self._sorted_unlocks: Dict[int, Tuple[str, ...]] = {} # Same, sorted; dropped when a set changes
+        self._reset_gains()
+
+    def _reset_gains(self):
+        self._gains.clear()
+        self._unlocks.clear()
+        self._sorted_unlocks.clear()
+        for location in self.engine._all_locations:
+            self._set_gains(location, self.engine._location_gains(location, self.mask))
+
+    def _set_gains(self, location: str, bits: Tuple[int, ...]):
+        old_bits = self._gains.get(location, ())
+        if bits == old_bits:
+            return
+        for bit in old_bits:
+            self._unlocks[bit].discard(location)
+            self._sorted_unlocks.pop(bit, None)
+        self._gains[location] = bits
+        for bit in bits:
+            self._unlocks.setdefault(bit, set()).add(location)
+            self._sorted_unlocks.pop(bit, None)
+
+    def reset(self, inventory: Union[Dict[str, bool], int]) -> Dict[str, bool]:
+        """
+        Fully re-evaluates all locations and makes this inventory the baseline
+        for subsequent update calls.
+        Output: accessibility dict {location_name: bool}
+        """
+        self.mask = self.engine.inventory_mask(inventory)
+        self._accessibility = self.engine.calculate_accessibility(self.mask)
+        self._reset_gains()
+        return dict(self._accessibility)
+
+    def update(self, changed_items: Dict[str, bool]) -> Dict[str, bool]:
+        """
+        Applies item changes to the tracked inventory and re-evaluates only the
+        locations that depend on those items.
+        Input: changed items {item_name: bool}
+        Output: locations whose accessibility flipped {location_name: bool}
+        """
+        engine = self.engine
+        new_mask = self.mask
+        affected: Set[str] = set()
+        for item, obtained in changed_items.items():
+            bit = engine._item_bits.get(item)
+            if bit is None:
+                continue # Unknown item, no rule can depend on it
+            new_mask = (new_mask | bit) if obtained else (new_mask & ~bit)
+            affected.update(engine._item_dependents[item])
+
+        if new_mask == self.mask:
+            return {}
+        self.mask = new_mask
+
+        flipped = {}
+        for location in affected:
+            is_accessible = engine._check_location(location, new_mask)
+            if self._accessibility[location] != is_accessible:
+                self._accessibility[location] = is_accessible
+                flipped[location] = is_accessible
+            self._set_gains(location, engine._location_gains(location, new_mask))
+        return flipped
+
+    def is_accessible(self, location: str) -> bool:
+        """Accessibility of a location for the tracked inventory."""
+        return self._accessibility.get(location, False)
+
+    def rank_next_items(self, candidates: Optional[Iterable[str]] = None) -> List[ItemRecommendation]:
+        """
+        LogicEngine.rank_next_items for the tracked inventory, from the
+        incrementally kept gains (no full evaluation).
+        """
+        engine = self.engine
+        ranking = []
+        for item in (engine._candidate_items if candidates is None else candidates):
+            bit = engine._item_bits.get(item, 0)
+            if bit & self.mask:
+                continue # Already obtained
+            unlocks = self._sorted_unlocks.get(bit)
+            if unlocks is None:
+                unlocks = self._sorted_unlocks[bit] = tuple(sorted(self._unlocks.get(bit, ())))
+            ranking.append(ItemRecommendation(item, unlocks))
+        ranking.sort(key=lambda rec: (-len(rec.unlocks), rec.item))
+        return ranking
+
+
 class LogicEngine:
     """
     Pure logic component that determines location accessibility.
-    Decoupled from UI and State. 
+    Decoupled from UI and State.
     Accepts inventory/state snapshots and returns accessibility maps.
+
+    Access rules are compiled once at construction into a shared expression
+    DAG (see _compile_expression for the rule format) whose item leaves are
+    integer bitmasks over a fixed item-to-bit table. Each location is also
+    flattened to clause masks, so a single check is an AND/compare. Clause
+    sets are normalized at load (duplicates and supersets removed) and
+    identical sets are interned across locations (see optimization_report).
+    A location whose rules would flatten to more than LogicDAG.max_clauses
+    clauses (e.g. 5 of 20 items) is evaluated through the DAG instead
+    (_dag_locations): slower per check, but never rejected.
+    An inverted item -> location index lets update_accessibility re-check
+    only the locations whose rules mention a changed item; that incremental
+    state lives in an AccessibilityTracker (new_tracker() gives each session
+    its own, so one engine can serve many sessions).
+    Full results are memoized in a bounded LRU cache keyed by inventory mask.
+    The caches are guarded by a lock, so sessions on several threads can
+    share an engine. The engine's own default tracker (reset_accessibility /
+    update_accessibility) is not: use new_tracker() per thread.
+    evaluate_batch evaluates many inventories at once with NumPy (optional).
+    compute_spheres derives a playthrough from a known item placement.
+    rank_next_items scores every candidate item in one pass over the rules.
+    compile_bdd (optional, lazy) builds reduced ordered BDDs for analysis:
+    model counting, minimal item sets and rule equivalence across engines.
     """
-    
-    def __init__(self, data_loader: DataLoader):
-        self._locations_logic = data_loader.get_locations_logic()
+
+    def __init__(self, data_loader: DataLoader, cache_size: int = 128,
+                 locations_logic: Optional[Dict[str, Any]] = None):
+        # locations_logic overrides the bundled locations_logic.json (e.g. to compare versions)
+        self._locations_logic = data_loader.get_locations_logic() if locations_logic is None else locations_logic
         self._cities = data_loader.get_cities()
-        
-    def calculate_accessibility(self, inventory: Dict[str, bool]) -> Dict[str, bool]:
+
+        # Fixed item -> bit table. Tools and keys first (stable order from the
+        # item JSONs), then any other name referenced by a rule (e.g. Maidens).
+        self._item_bits: Dict[str, int] = {}
+        for item in data_loader.get_tool_items():
+            self._register_item(item)
+        for item in data_loader.get_scenario_items():
+            self._register_item(item)
+        # Items offered by the "best next item" ranking
+        self._candidate_items: Tuple[str, ...] = tuple(self._item_bits)
+        for item in sorted(self._collect_rule_items()):
+            self._register_item(item)
+
+        self._bit_names: Tuple[str, ...] = tuple(self._item_bits)
+
+        # Both Logic locations AND Cities (which might be missing from logic)
+        self._all_locations: Tuple[str, ...] = tuple(
+            sorted(set(self._locations_logic.keys()) | set(self._cities.keys()))
+        )
+
+        # Expression DAG: location -> root node, evaluated once per refresh in
+        # topological order with shared sub-expressions.
+        self._dag = LogicDAG()
+        self._location_roots: Dict[str, int] = {}
+        self._raw_clauses: Dict[str, Tuple[int, ...]] = {}
+        self._compile_locations()
+
+        # location -> tuple of clause masks (OR of ANDs), flattened from the DAG,
+        # normalized and interned. A mask of 0 is always satisfied; an empty
+        # tuple is never satisfied. Locations in _dag_locations have none.
+        self._dag_locations: FrozenSet[str] = frozenset()
+        self._compiled_rules: Dict[str, Tuple[int, ...]] = self._optimize_rules()
+
+        # Inverted index: item -> locations whose rules mention it
+        # (and per location, the mask of every item its rules mention)
+        dependents: Dict[str, Set[str]] = {item: set() for item in self._item_bits}
+        self._location_items: Dict[str, int] = {}
+        for location in self._all_locations:
+            if location in self._dag_locations:
+                rule_items = self._dag.leaf_mask(self._location_roots[location])
+            else:
+                rule_items = 0
+                for rule_mask in self._compiled_rules[location]:
+                    rule_items |= rule_mask
+            self._location_items[location] = rule_items
+            for item, bit in self._item_bits.items():
+                if rule_items & bit:
+                    dependents[item].add(location)
+        self._item_dependents: Dict[str, FrozenSet[str]] = {
+            item: frozenset(locations) for item, locations in dependents.items()
+        }
+
+        # Requirement explanations: full rule text compiled once, and the
+        # inventory-aware "still missing" answer cached per location until an
+        # item that location depends on changes.
+        self._requirements: Dict[str, Tuple[str, ...]] = {
+            location: self._format_rules(location) for location in self._locations_logic
+        }
+        self._missing_cache: Dict[str, Tuple[int, Tuple[str, ...]]] = {}
+
+        # Guards every lazily filled structure below (and _missing_cache);
+        # misses are evaluated outside it, so a slow miss never blocks hits.
+        # The DAG subgraphs of _dag_locations were all built by leaf_mask above.
+        self._cache_lock = threading.RLock()
+
+        # LRU cache: inventory mask -> _CacheEntry
+        self._cache: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._cache_size = max(1, cache_size)
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        # Built on first evaluate_batch call
+        self._incidence = None
+
+        # Built on first compile_bdd call (symbolic analysis only)
+        self._bdd: Optional[BDD] = None
+        self._bdd_roots: Dict[str, int] = {}
+
+        # Default incremental state (see reset_accessibility / update_accessibility)
+        self._tracker = AccessibilityTracker(self)
+
+    # --- Compilation ---
+
+    def _register_item(self, item: str) -> int:
+        if item not in self._item_bits:
+            self._item_bits[item] = 1 << len(self._item_bits)
+        return self._item_bits[item]
+
+    def _split_rule(self, rule) -> list:
+        """Splits a single AND rule ("Bomb,Hook") into item names."""
+        return [item.strip() for item in str(rule).split(',')]
+
+    def _collect_rule_items(self) -> Set[str]:
+        items = set()
+        for logic in self._locations_logic.values():
+            for rule in (logic or {}).get("access_rules", []):
+                self._collect_expression_items(rule, items)
+        return items
+
+    def _collect_expression_items(self, expr, items: Set[str]):
+        if isinstance(expr, str):
+            items.update(self._split_rule(expr))
+        elif isinstance(expr, list):
+            for sub in expr:
+                if sub:
+                    self._collect_expression_items(sub, items)
+        elif isinstance(expr, dict):
+            if "item" in expr:
+                items.add(str(expr["item"]).strip())
+            for key in ("all", "any", "of"):
+                for sub in expr.get(key, []):
+                    self._collect_expression_items(sub, items)
+
+    def _collect_location_refs(self, expr, refs: Set[str]):
+        if isinstance(expr, list):
+            for sub in expr:
+                if sub:
+                    self._collect_location_refs(sub, refs)
+        elif isinstance(expr, dict):
+            if "location" in expr:
+                refs.add(expr["location"])
+            for key in ("all", "any", "of"):
+                for sub in expr.get(key, []):
+                    self._collect_location_refs(sub, refs)
+
+    def _location_refs(self, location: str) -> Set[str]:
+        """Locations named by {"location": ...} in a location's rules."""
+        refs: Set[str] = set()
+        if location not in ALWAYS_ACCESSIBLE_LOCATIONS:
+            for rule in (self._locations_logic.get(location) or {}).get("access_rules", []):
+                self._collect_location_refs(rule, refs)
+        return refs
+
+    def _compile_locations(self):
+        """
+        Compiles every location's root. Referenced locations are compiled
+        first (strongly connected components in dependency order, Tarjan).
+        Locations that reference each other are solved as a least fixed
+        point: all start inaccessible and the group is recompiled until no
+        clause set changes. E.g. A: Bomb OR B, B: Hook OR A gives B with
+        Bomb alone, whichever of the two is compiled first.
+        """
+        refs: Dict[str, Set[str]] = {}
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+
+        def visit(location: str):
+            index[location] = low[location] = len(index)
+            stack.append(location)
+            on_stack.add(location)
+            refs[location] = self._location_refs(location)
+            for ref in refs[location]:
+                if ref not in index:
+                    visit(ref)
+                    low[location] = min(low[location], low[ref])
+                elif ref in on_stack:
+                    low[location] = min(low[location], index[ref])
+            if low[location] == index[location]:
+                group = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    group.append(member)
+                    if member == location:
+                        break
+                # Emitted after every group it references
+                if len(group) == 1 and location not in refs[location]:
+                    self._location_roots[location] = self._compile_location(location)
+                else:
+                    self._solve_circular(sorted(group))
+
+        for location in self._all_locations:
+            if location not in index:
+                visit(location)
+
+    def _solve_circular(self, group: List[str]):
+        logging.info(f"Logic: resolving circular location requirements between {', '.join(group)}")
+        for location in group:
+            self._location_roots[location] = self._dag.FALSE
+        # Per inventory, every round can only add accessible locations, so
+        # the fixed point is reached after at most len(group) rounds. Equal
+        # clause sets stop earlier (not comparable for DAG-only rules).
+        def settled(location: str) -> bool:
+            new, old = roots[location], self._location_roots[location]
+            if new == old:
+                return True
+            clauses = self._clauses_of(new)
+            return clauses is not None and clauses == self._clauses_of(old)
+
+        for _ in group:
+            roots = {location: self._compile_location(location) for location in group}
+            if all(settled(location) for location in group):
+                break
+            self._location_roots.update(roots)
+
+    def _clauses_of(self, root: int) -> Optional[Tuple[int, ...]]:
+        """Normalized clause masks of a node, or None if it is too large to flatten."""
+        try:
+            return normalize_clauses(self._dag.dnf(root))
+        except ValueError:
+            return None
+
+    def _compile_location(self, location: str) -> int:
+        """
+        Compiles a location's rules into a DAG root node. Every location it
+        references must already have a root (see _compile_locations).
+        Logic ported directly from v1.3 LocationLogic.is_location_accessible
+        """
+        # 1. Always Accessible Check
+        if location in ALWAYS_ACCESSIBLE_LOCATIONS:
+            return self._dag.TRUE
+        logic = self._locations_logic.get(location)
+        if logic is None:
+            # If it's a City with no logic defined, it's considered accessible (Yellow) by default in v1.3
+            # Not in logic file and not a city? Default to inaccessible.
+            return self._dag.TRUE if location in self._cities else self._dag.FALSE
+        access_rules = logic.get("access_rules", [])
+        if not access_rules:
+            # 2. Empty rules = Accessible
+            return self._dag.TRUE
+        # 3. OR Logic between list items
+        rule_nodes = [self._compile_expression(rule) for rule in access_rules]
+        # Clauses as written, before normalization (for the report)
+        try:
+            self._raw_clauses[location] = tuple(m for node in rule_nodes for m in self._dag.dnf(node))
+        except ValueError:
+            self._raw_clauses.pop(location, None) # Too large, see _optimize_rules
+        return self._dag.any_of(rule_nodes)
+
+    def _optimize_rules(self) -> Dict[str, Tuple[int, ...]]:
+        """
+        Normalizes every location's clause set (dedupe, drop supersets) and
+        interns identical sets so locations share one tuple.
+        Builds self.optimization_report.
+        """
+        interned: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        users: Dict[Tuple[int, ...], int] = {}
+        compiled = {}
+        before = after = duplicates = 0
+        redundant = {}
+        dag_only = []
+        for location in self._all_locations:
+            normalized = self._clauses_of(self._location_roots[location])
+            if normalized is None:
+                dag_only.append(location)
+                continue
+            raw = self._raw_clauses.get(location) or normalized
+            normalized = interned.setdefault(normalized, normalized)
+            users[normalized] = users.get(normalized, 0) + 1
+            compiled[location] = normalized
+
+            before += len(raw)
+            after += len(normalized)
+            duplicates += len(raw) - len(set(raw))
+            removed = [m for m in dict.fromkeys(raw) if m not in normalized]
+            if removed:
+                redundant[location] = tuple(" & ".join(self._mask_names(m)) for m in removed)
+
+        self.optimization_report = RuleOptimizationReport(
+            clauses_before=before,
+            clauses_after=after,
+            duplicates_removed=duplicates,
+            subsumed_removed=before - after - duplicates,
+            distinct_rule_sets=len(interned),
+            shared_rule_sets=sum(1 for count in users.values() if count > 1),
+            redundant=redundant,
+            dag_only=tuple(dag_only),
+        )
+        self._dag_locations = frozenset(dag_only)
+        logging.info(
+            f"Logic: {before} -> {after} clauses ({duplicates} duplicate, "
+            f"{before - after - duplicates} subsumed), {len(compiled)} locations "
+            f"use {len(interned)} distinct rule sets"
+        )
+        for location, clauses in redundant.items():
+            logging.info(f"Logic: redundant clauses in '{location}': {', '.join(clauses)}")
+        for location in dag_only:
+            logging.info(f"Logic: rules of '{location}' exceed {self._dag.max_clauses} clauses, "
+                         f"evaluated through the DAG")
+        return compiled
+
+    def _compile_expression(self, expr) -> int:
+        """
+        Compiles one access expression into a DAG node. Supported forms:
+            "Bomb,Hook"                          all listed items (legacy rule)
+            ["Bomb", "Hook"]                     all elements (each may be an expression)
+            {"item": "Hook"}                     a single item
+            {"all": [expr, ...]}                 every sub-expression
+            {"any": [expr, ...]}                 at least one sub-expression
+            {"count": 2, "of": [expr, ...]}      at least N sub-expressions
+            {"location": "Ancient Tower"}        that location is accessible
+        """
+        dag = self._dag
+        if isinstance(expr, str):
+            return dag.mask(self.item_mask(self._split_rule(expr)))
+        if isinstance(expr, list):
+            return dag.all_of(self._compile_expression(sub) for sub in expr if sub)
+        if isinstance(expr, dict):
+            if "item" in expr:
+                return dag.mask(self.item_mask([str(expr["item"]).strip()]))
+            if "all" in expr:
+                return dag.all_of(self._compile_expression(sub) for sub in expr["all"])
+            if "any" in expr:
+                return dag.any_of(self._compile_expression(sub) for sub in expr["any"])
+            if "count" in expr:
+                return dag.at_least(int(expr["count"]), [self._compile_expression(sub) for sub in expr.get("of", [])])
+            if "location" in expr:
+                return self._location_roots[expr["location"]]
+        logging.error(f"Logic: unsupported access expression {expr!r}")
+        return dag.FALSE
+
+    # --- Evaluation ---
+
+    @property
+    def locations(self) -> Tuple[str, ...]:
+        """All locations the engine evaluates (logic locations and cities)."""
+        return self._all_locations
+
+    @property
+    def items(self) -> Tuple[str, ...]:
+        """All item names known to the engine, in bit order (bit i = items[i])."""
+        return tuple(self._item_bits)
+
+    def item_mask(self, items: Iterable[str]) -> int:
+        """Returns the bitmask for a collection of item names. Unknown items are ignored."""
+        mask = 0
+        for item in items:
+            mask |= self._item_bits.get(item, 0)
+        return mask
+
+    def inventory_mask(self, inventory: Union[Dict[str, bool], int]) -> int:
+        """Converts an inventory dict {item_name: bool} into a bitmask (masks pass through)."""
+        if isinstance(inventory, int):
+            return inventory
+        return self.item_mask(item for item, obtained in inventory.items() if obtained)
+
+    def calculate_accessibility(self, inventory: Union[Dict[str, bool], int]) -> Dict[str, bool]:
         """
         Calculates accessibility for ALL locations based on current inventory.
-        Input: inventory dict {item_name: bool}
+        Input: inventory dict {item_name: bool} or a precomputed inventory mask
         Output: accessibility dict {location_name: bool}
         """
-        # Convert inventory dict to a set of obtained items for faster lookup
-        obtained_items_set = {item for item, obtained in inventory.items() if obtained}
-        
-        accessibility_map = {}
-        # Iterate over both Logic locations AND Cities (which might be missing from logic)
-        all_relevant_locations = set(self._locations_logic.keys()) | set(self._cities.keys())
-        
-        for location in all_relevant_locations:
-            is_accessible = self._check_location(location, obtained_items_set)
-            accessibility_map[location] = is_accessible
-            
-        return accessibility_map
+        return dict(self._cached_entry(self.inventory_mask(inventory)).accessibility)
+
+    def get_requirement_tooltips(self, inventory: Union[Dict[str, bool], int]) -> Dict[str, str]:
+        """
+        Returns tooltip strings of what is still missing for every inaccessible
+        location, e.g. {"Ancient Tower": "Bomb & Cloud OR Hammer & Cloud"}.
+        """
+        inv_mask = self.inventory_mask(inventory)
+        entry = self._cached_entry(inv_mask)
+        tooltips = entry.tooltips
+        if tooltips is None:
+            tooltips = {}
+            for location, is_accessible in entry.accessibility.items():
+                if is_accessible:
+                    continue
+                reqs = self.get_missing_requirements(location, inv_mask)
+                if reqs:
+                    tooltips[location] = " OR ".join(reqs)
+            entry.tooltips = tooltips # Complete before it is published
+        return dict(tooltips)
+
+    def rank_next_items(self, inventory: Union[Dict[str, bool], int],
+                        candidates: Optional[Iterable[str]] = None) -> List[ItemRecommendation]:
+        """
+        Ranks unobtained items (default: all tools and scenario keys) by how many
+        currently inaccessible locations each would open on its own.
+        Output: recommendations sorted by unlock count (desc), then name.
+        """
+        inv_mask = self.inventory_mask(inventory)
+        entry = self._cached_entry(inv_mask)
+        gains = entry.gains
+        if gains is None:
+            gains = entry.gains = self._single_item_gains(inv_mask)
+
+        ranking = []
+        for item in (self._candidate_items if candidates is None else candidates):
+            bit = self._item_bits.get(item, 0)
+            if bit & inv_mask:
+                continue # Already obtained
+            ranking.append(ItemRecommendation(item, gains.get(bit, ())))
+        ranking.sort(key=lambda rec: (-len(rec.unlocks), rec.item))
+        return ranking
+
+    def _single_item_gains(self, inv_mask: int) -> Dict[int, Tuple[str, ...]]:
+        """
+        Single pass over the compiled rules: an inaccessible location opens with
+        item X alone iff one of its clauses is missing exactly X's bit.
+        Output: {item_bit: locations it would open}
+        """
+        gains: Dict[int, List[str]] = {}
+        for location in self._all_locations:
+            for bit in self._location_gains(location, inv_mask):
+                gains.setdefault(bit, []).append(location)
+        return {bit: tuple(locations) for bit, locations in gains.items()}
+
+    def _location_gains(self, location: str, inv_mask: int) -> Tuple[int, ...]:
+        """Item bits that would each open a location on their own (() if it is accessible)."""
+        if location in self._dag_locations:
+            # No clauses: try each missing item the rule depends on
+            root = self._location_roots[location]
+            if self._dag.evaluate_node(root, inv_mask):
+                return ()
+            bits = []
+            missing = self._location_items[location] & ~inv_mask
+            while missing:
+                bit = missing & -missing
+                if self._dag.evaluate_node(root, inv_mask | bit):
+                    bits.append(bit)
+                missing ^= bit
+            return tuple(bits)
+        single_bits = set()
+        for rule_mask in self._compiled_rules[location]:
+            missing = rule_mask & ~inv_mask
+            if not missing:
+                return () # Already accessible
+            if missing & (missing - 1) == 0:
+                single_bits.add(missing)
+        return tuple(sorted(single_bits))
+
+    def cache_info(self) -> AccessibilityCacheInfo:
+        """Returns hit/miss counters and size of the accessibility cache."""
+        with self._cache_lock:
+            return AccessibilityCacheInfo(self._cache_hits, self._cache_misses, self._cache_size, len(self._cache))
+
+    def cache_clear(self):
+        """Empties the accessibility cache and resets its counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def _cached_entry(self, inv_mask: int) -> _CacheEntry:
+        with self._cache_lock:
+            entry = self._cache.get(inv_mask)
+            if entry is not None:
+                self._cache_hits += 1
+                self._cache.move_to_end(inv_mask)
+                return entry
+            self._cache_misses += 1
+
+        values = self._dag.evaluate(inv_mask)
+        entry = _CacheEntry({
+            location: values[self._location_roots[location]]
+            for location in self._all_locations
+        })
+        with self._cache_lock:
+            # Another thread may have stored the same mask meanwhile: keep its entry
+            entry = self._cache.setdefault(inv_mask, entry)
+            self._cache.move_to_end(inv_mask)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def evaluate_batch(self, inventories) -> "np.ndarray":
+        """
+        Evaluates many inventories at once.
+        Input: a sequence of inventory dicts / inventory masks, or an (N x items)
+               0/1 array whose columns follow self.items
+        Output: boolean array (N x locations), columns follow self.locations.
+        Results match calculate_accessibility exactly.
+        """
+        _require_numpy()
+
+        inv_matrix = self._inventory_matrix(inventories)
+        incidence, clause_sizes, clause_valid = self._get_incidence()
+        n_locations, n_clauses, n_items = incidence.shape
+
+        # have[n, l, k] = number of clause k's items present in inventory n.
+        # Values are tiny integers, so float32 BLAS matmul is exact.
+        have = inv_matrix @ incidence.reshape(n_locations * n_clauses, n_items).T
+        have = have.reshape(len(inv_matrix), n_locations, n_clauses)
+
+        satisfied = (have == clause_sizes) & clause_valid
+        result = satisfied.any(axis=2)
+        if self._dag_locations:
+            # Rules too large for clauses: evaluated per inventory through the DAG
+            masks = [sum(1 << int(i) for i in np.flatnonzero(row)) for row in inv_matrix]
+            for l, location in enumerate(self._all_locations):
+                if location in self._dag_locations:
+                    root = self._location_roots[location]
+                    result[:, l] = [self._dag.evaluate_node(root, mask) for mask in masks]
+        return result
+
+    def _get_incidence(self):
+        """
+        Builds (once) the locations x rules x items incidence tensor.
+        Locations with fewer rules are padded with invalid clauses.
+        """
+        with self._cache_lock:
+            return self._build_incidence()
+
+    def _build_incidence(self):
+        if self._incidence is None:
+            n_items = len(self._item_bits)
+            bits = list(self._item_bits.values())
+            max_clauses = max([len(c) for c in self._compiled_rules.values()] + [1])
+            incidence = np.zeros((len(self._all_locations), max_clauses, n_items), dtype=np.float32)
+            clause_valid = np.zeros((len(self._all_locations), max_clauses), dtype=bool)
+            for l, location in enumerate(self._all_locations):
+                for k, rule_mask in enumerate(self._compiled_rules.get(location, ())):
+                    clause_valid[l, k] = True
+                    for i, bit in enumerate(bits):
+                        if rule_mask & bit:
+                            incidence[l, k, i] = 1.0
+            clause_sizes = incidence.sum(axis=2)
+            self._incidence = (incidence, clause_sizes, clause_valid)
+        return self._incidence
+
+    def _inventory_matrix(self, inventories) -> "np.ndarray":
+        """Converts inventories into an (N x items) float32 0/1 matrix."""
+        n_items = len(self._item_bits)
+        if isinstance(inventories, np.ndarray):
+            matrix = np.asarray(inventories, dtype=np.float32)
+            if matrix.ndim != 2 or matrix.shape[1] != n_items:
+                raise ValueError(f"Expected an (N x {n_items}) inventory array, got {matrix.shape}")
+            return matrix
+
+        masks = [self.inventory_mask(inv) for inv in inventories]
+        matrix = np.zeros((len(masks), n_items), dtype=np.float32)
+        if not masks:
+            return matrix
+        if n_items < 63:
+            packed = np.array(masks, dtype=np.int64)
+            matrix[:] = (packed[:, None] >> np.arange(n_items, dtype=np.int64)) & 1
+        else:
+            for i in range(n_items):
+                matrix[:, i] = [(mask >> i) & 1 for mask in masks]
+        return matrix
+
+    def get_dependent_locations(self, item: str) -> FrozenSet[str]:
+        """Returns the locations whose access rules mention the given item."""
+        return self._item_dependents.get(item, frozenset())
+
+    def location_items(self, location: str) -> Tuple[str, ...]:
+        """Returns every item a location's rules depend on, in bit order."""
+        return tuple(self._mask_names(self._location_items.get(location, 0)))
+
+    def new_tracker(self) -> AccessibilityTracker:
+        """Separate incremental accessibility state over this engine (e.g. per session)."""
+        return AccessibilityTracker(self)
+
+    def reset_accessibility(self, inventory: Union[Dict[str, bool], int]) -> Dict[str, bool]:
+        """AccessibilityTracker.reset on the engine's default tracker."""
+        return self._tracker.reset(inventory)
+
+    def update_accessibility(self, changed_items: Dict[str, bool]) -> Dict[str, bool]:
+        """AccessibilityTracker.update on the engine's default tracker."""
+        return self._tracker.update(changed_items)
+
+    @property
+    def tracked_mask(self) -> int:
+        """Inventory mask of the incremental state (see reset_accessibility)."""
+        return self._tracker.mask
+
+    def is_accessible(self, location: str) -> bool:
+        """Accessibility of a location for the tracked inventory."""
+        return self._tracker.is_accessible(location)
+
+    # --- Playthrough / Spheres ---
+
+    def compute_spheres(self, placement: Dict[str, Any], start_inventory: Union[Dict[str, bool], int] = 0) -> Playthrough:
+        """
+        Computes reachability spheres for a known placement.
+        Input: placement {location_name: item_name or [item_names]}
+        Sphere 0 is reachable with the start inventory, sphere N opens with the
+        items found in spheres < N, until the fixed point.
+
+        Semi-naive evaluation: after each sphere only the not-yet-reached
+        locations that depend on newly gained items are re-checked.
+        """
+        inv_mask = self.inventory_mask(start_inventory)
+        pending = set(self._all_locations)
+        frontier = {loc for loc in pending if self._check_location(loc, inv_mask)}
+        spheres: List[Sphere] = []
+
+        while frontier:
+            pending -= frontier
+            found_items = []
+            for location in sorted(frontier):
+                found_items.extend(self._placed_items(placement, location))
+            spheres.append(Sphere(len(spheres), tuple(sorted(frontier)), tuple(found_items)))
+
+            new_bits = self.item_mask(found_items) & ~inv_mask
+            if not new_bits:
+                break
+            inv_mask |= new_bits
+
+            candidates = set()
+            for item in found_items:
+                if self._item_bits.get(item, 0) & new_bits:
+                    candidates.update(self._item_dependents[item])
+            frontier = {loc for loc in candidates & pending if self._check_location(loc, inv_mask)}
+
+        return Playthrough(tuple(spheres), tuple(sorted(pending)), inv_mask)
+
+    def required_locations(self, placement: Dict[str, Any], goal: Optional[Iterable[str]] = None,
+                           start_inventory: Union[Dict[str, bool], int] = 0) -> Set[str]:
+        """
+        Returns the placement locations whose items are required to reach the goal
+        (default: every location reachable with the full placement).
+        All other checks in the placement are optional.
+        """
+        baseline = self.compute_spheres(placement, start_inventory)
+        if goal is None:
+            goal_set = {loc for sphere in baseline.spheres for loc in sphere.locations}
+        else:
+            goal_set = set(goal)
+
+        required = set()
+        for location in placement:
+            # Items that open nothing cannot be required
+            if not self.item_mask(self._placed_items(placement, location)):
+                continue
+            reduced = {loc: items for loc, items in placement.items() if loc != location}
+            if goal_set & set(self.compute_spheres(reduced, start_inventory).unreachable):
+                required.add(location)
+        return required
+
+    def _placed_items(self, placement: Dict[str, Any], location: str) -> List[str]:
+        items = placement.get(location)
+        if not items:
+            return []
+        if isinstance(items, str):
+            return [items]
+        return list(items)
+
+    # --- Symbolic analysis (BDD) ---
+
+    def compile_bdd(self, manager: Optional[BDD] = None) -> BDD:
+        """
+        Compiles every location's rule into a reduced ordered BDD (once; later
+        calls return the same manager). Variables follow the item bit order.
+        Pass a shared manager to compare engines: functions in one manager are
+        canonical, so equal rules get equal node ids.
+        """
+        with self._cache_lock:
+            return self._compile_bdd(manager)
+
+    def _compile_bdd(self, manager: Optional[BDD]) -> BDD:
+        if self._bdd is not None:
+            if manager is not None and manager is not self._bdd:
+                raise ValueError("LogicEngine rules are already compiled into another BDD manager")
+            return self._bdd
+
+        bdd = manager if manager is not None else BDD()
+        for item in self._bit_names:
+            bdd.var(item)
+
+        converted: Dict[int, int] = {}
+        def convert(node_id: int) -> int:
+            result = converted.get(node_id)
+            if result is not None:
+                return result
+            node = self._dag.node(node_id)
+            kind = node[0]
+            if kind == MASK:
+                result = bdd.conjoin(bdd.var(name) for name in self._mask_names(node[1]))
+            elif kind == AND:
+                result = bdd.conjoin(convert(child) for child in node[1])
+            elif kind == OR:
+                result = bdd.disjoin(convert(child) for child in node[1])
+            else:
+                result = bdd.at_least(node[1], [convert(child) for child in node[2]])
+            converted[node_id] = result
+            return result
+
+        self._bdd_roots = {location: convert(root) for location, root in self._location_roots.items()}
+        self._bdd = bdd
+        return bdd
+
+    def location_bdd(self, location: str) -> int:
+        """BDD node of a location's rule (compiles on first use). Unknown locations are FALSE."""
+        self.compile_bdd()
+        return self._bdd_roots.get(location, BDD_FALSE)
+
+    def count_opening_subsets(self, location: str, items: Optional[Iterable[str]] = None) -> int:
+        """
+        Counts the subsets of `items` (default: all tools and key items) that
+        open a location; every other item is treated as not obtained.
+        E.g. how many of the 2^N key item combinations open Ancient Tower.
+        """
+        chosen = set(self._candidate_items if items is None else items)
+        unknown = chosen - set(self._bit_names)
+        excluded = {item: False for item in self._bit_names if item not in chosen}
+        with self._cache_lock: # BDD operations add nodes to the manager
+            bdd = self.compile_bdd()
+            node = bdd.restrict(self.location_bdd(location), excluded)
+            # Counted over every manager variable; the excluded ones no longer
+            # occur in node, so each contributes a factor of 2.
+            count = bdd.sat_count(node) >> (len(bdd.var_names) - len(chosen - unknown))
+        # Names the rules never mention cannot change the result
+        return count << len(unknown)
+
+    def minimal_item_sets(self, location: str) -> List[FrozenSet[str]]:
+        """All minimal item sets that open a location, smallest first."""
+        with self._cache_lock:
+            return self.compile_bdd().minimal_models(self.location_bdd(location))
+
+    def minimum_item_set(self, location: str) -> Optional[FrozenSet[str]]:
+        """One smallest item set that opens a location (None if nothing does)."""
+        with self._cache_lock:
+            return self.compile_bdd().min_model(self.location_bdd(location))
+
+    def blocking_item_sets(self, location: str) -> List[FrozenSet[str]]:
+        """
+        Minimal hitting sets of the location's rule: minimal item sets that,
+        if all missing, keep the location closed whatever else is obtained.
+        """
+        with self._cache_lock:
+            bdd = self.compile_bdd()
+            return bdd.minimal_models(bdd.dual(self.location_bdd(location)))
+
+    def rules_equivalent(self, location: str, other: "LogicEngine", other_location: Optional[str] = None) -> bool:
+        """
+        True if a location's rule here is logically equivalent to one in another
+        engine (default: same location name). Compiles both into a shared manager.
+        """
+        with self._cache_lock:
+            bdd = self.compile_bdd()
+            other.compile_bdd(bdd)
+            return self.location_bdd(location) == other.location_bdd(other_location or location)
+
+    def get_requirements(self, location) -> list:
+        """
+        Returns the full (inventory independent) rule list for a location,
+        e.g. ["Bomb,Hook,Cloud", "Hammer,Hook,Cloud"]. Compiled at load time.
+        """
+        return list(self._requirements.get(location, ()))
 
     def get_missing_requirements(self, location, inventory):
         """
-        Returns a list of missing items/conditions for a specific location.
+        Returns what is still missing for a specific location, one entry per
+        alternative, e.g. ["Hook"] or ["Cloud & Hook", "Bomb & Cloud"].
+        Alternatives that are supersets of another are dropped.
+        Returns [] if the location is accessible (or cannot be opened by items).
+        Rules too large to flatten (see _dag_locations) list their full rule.
         """
+        if location in self._dag_locations:
+            if self._check_location(location, self.inventory_mask(inventory)):
+                return []
+            return self.get_requirements(location)
+        clauses = self._compiled_rules.get(location)
+        if not clauses:
+            return []
+
+        # Only items this location depends on can change the answer
+        key = self.inventory_mask(inventory) & self._location_items[location]
+        with self._cache_lock:
+            cached = self._missing_cache.get(location)
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+
+        missing_sets = set()
+        for rule_mask in clauses:
+            missing = rule_mask & ~key
+            if not missing:
+                missing_sets = set() # Accessible
+                break
+            missing_sets.add(missing)
+
+        minimal = sorted(
+            (m for m in missing_sets if not any(o != m and (o & m) == o for o in missing_sets)),
+            key=lambda m: (bin(m).count("1"), m),
+        )
+        result = tuple(" & ".join(self._mask_names(m)) for m in minimal)
+        with self._cache_lock:
+            self._missing_cache[location] = (key, result)
+        return list(result)
+
+    def _mask_names(self, mask: int) -> List[str]:
+        """Item names for the set bits of a mask, in item table order."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self._bit_names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def _format_rules(self, location) -> Tuple[str, ...]:
         logic = self._locations_logic.get(location)
         if not logic:
-            return []
-            
+            return ()
+
         access_rules = logic.get("access_rules", [])
         if not access_rules:
-            return []
-            
-        # Helper to format a single rule
-        formatted_rules = []
-        for rule in access_rules:
-            # Rule is typically a list of requirements (AND) or a single string
-            if isinstance(rule, list):
-                 # e.g. ["Bomb", "Hook"] -> "Bomb & Hook"
-                 # Filter out empty strings or None
-                 reqs = [str(r) for r in rule if r]
-                 formatted_rules.append(" & ".join(reqs))
-            elif isinstance(rule, str):
-                 formatted_rules.append(rule)
-            else:
-                 formatted_rules.append(str(rule))
-                 
+            return ()
+
+        formatted_rules = [self._format_expression(rule, top_level=True) for rule in access_rules]
+
         # Deduplicate
-        formatted_rules = sorted(list(set(formatted_rules)))
-        
-        # If no rules, return empty
-        if not formatted_rules:
-            return []
-            
-        return formatted_rules
+        return tuple(sorted(set(formatted_rules)))
+
+    def _format_expression(self, expr, top_level=False) -> str:
+        """Human readable form of an access expression (see _compile_expression)."""
+        if isinstance(expr, str):
+            return expr
+        if isinstance(expr, list):
+            # e.g. ["Bomb", "Hook"] -> "Bomb & Hook"
+            # Filter out empty strings or None
+            text = " & ".join(self._format_expression(sub) for sub in expr if sub)
+        elif isinstance(expr, dict) and "item" in expr:
+            return str(expr["item"])
+        elif isinstance(expr, dict) and "location" in expr:
+            return f"access to {expr['location']}"
+        elif isinstance(expr, dict) and "all" in expr:
+            text = " & ".join(self._format_expression(sub) for sub in expr["all"])
+        elif isinstance(expr, dict) and "any" in expr:
+            text = " OR ".join(self._format_expression(sub) for sub in expr["any"])
+        elif isinstance(expr, dict) and "count" in expr:
+            options = ", ".join(self._format_expression(sub) for sub in expr.get("of", []))
+            return f"{expr['count']} of ({options})"
+        else:
+            return str(expr)
+        return text if top_level else f"({text})"
 
-    def _check_location(self, location: str, obtained_items: Set[str]) -> bool:
+    def _check_location(self, location: str, inv_mask: int) -> bool:
         """
         Determines if a single location is accessible.
-        Logic ported directly from v1.3 LocationLogic.is_location_accessible
+        A clause is satisfied when every item bit it requires is set in the inventory mask.
         """
-        # 1. Always Accessible Check
-        if location in ALWAYS_ACCESSIBLE_LOCATIONS:
-            return True
-            
-        logic = self._locations_logic.get(location)
-        if logic is None:
-            # If it's a City with no logic defined, it's considered accessible (Yellow) by default in v1.3
-            if location in self._cities:
+        if location in self._dag_locations:
+            return self._dag.evaluate_node(self._location_roots[location], inv_mask)
+        for rule_mask in self._compiled_rules.get(location, ()):
+            if (inv_mask & rule_mask) == rule_mask:
                 return True
-            return False # Not in logic file and not a city? Default to inaccessible.
 
-        access_rules = logic.get("access_rules", [])
-        
-        # 2. Empty rules = Accessible
-        if not access_rules:
-            return True 
-            
-        # 3. Rule Evaluation (OR Logic between list items)
-        for rule in access_rules:
-            # Rule is a string like "Bomb,Hook" (AND Logic)
-            required_items = [item.strip() for item in rule.split(',')]
-            
-            # Check if ALL required items for this rule are present
-            if all(req in obtained_items for req in required_items):
-                return True
-                
         # If no rule is satisfied
         return False
 
@@ -109,13 +1051,13 @@ class LogicEngine:
         """
         if is_cleared:
             return "cleared"
-            
+
         if location in ALWAYS_ACCESSIBLE_LOCATIONS:
             return "accessible"
-            
+
         if location in self._cities:
             # Cities are Yellow ('city') if accessible, Red ('not_accessible') if not.
             # Some users prefer cities always Yellow? v1.3 says Red if requirements missing.
             return "city" if is_accessible else "not_accessible"
-            
+
         return "fully_accessible" if is_accessible else "not_accessible"
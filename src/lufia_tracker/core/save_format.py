@@ -0,0 +1,333 @@
+import os
+import struct
+import tempfile
+import weakref
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.utils.constants import STATE_ORDER
+
+MAGIC = b"L2TS"
+FORMAT_VERSION = 2
+BINARY_SAVE_SUFFIX = ".l2s"
+SAVE_IDS_FILE = "save_ids.json"
+
+# Header: magic, format version (u8), fingerprint of the ID tables used (u32)
+_HEADER = struct.Struct("<4sBI")
+
+# ID tables, in the order a version 2 file stores their sizes
+_TABLES = ("items", "locations", "characters", "states")
+
+# Location states seen in saves; anything else is stored as a string
+_STATES = list(STATE_ORDER) + ["accessible"]
+
+
+def _fingerprint(tables: List[List[str]]) -> int:
+    return zlib.crc32("\x1f".join("\x1e".join(table) for table in tables).encode("utf-8"))
+
+
+def is_binary_save(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def atomic_write(path: Union[str, Path], data: bytes):
+    """
+    Writes data to path via a temp file in the same directory and os.replace,
+    so readers (and a crash) only ever see the old or the complete new file.
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SaveCodec:
+    """
+    Compact binary encoding of StateManager.snapshot() dicts.
+
+    Names are replaced by small integer IDs from save_ids.json, an
+    append-only ID map: a name keeps its ID forever, new names are only ever
+    appended, removed ones stay. A file stores how many IDs of each table it
+    was written with (and a CRC32 of those names), so a save from an older
+    tracker decodes by name with the current map. A file is only rejected
+    when the IDs cannot be mapped: written by a newer tracker (more IDs than
+    known) or against a map that was reordered. Names outside the map (shop
+    items, data not yet added to it) go into a per-file string table and
+    get IDs after the file's table range, so every snapshot round-trips
+    exactly.
+
+    Layout after the header (integers are LEB128 varints):
+        table sizes        items, locations, characters, states
+        strings            count, then (length, utf-8) each
+        inventory_overrides, inventory, characters
+                           bool maps: presence + value bitsets over the
+                           table, then count + (id, value) for extra keys
+        location_overrides, locations
+                           count + (location id, state id)
+        character_locations
+                           count + (location id, character id)
+        active_party, obtained_capsules
+                           count + character ids
+        shop_items         count + (location id, item id)
+        hints              string id
+    A whole inventory is two bitsets of one bit per item; typical saves are
+    well under a few hundred bytes. Version 1 files (no table sizes, IDs
+    taken from the data files) still load while that data is unchanged.
+
+    Instances are immutable after construction and safe to share between
+    threads (AutoSaver encodes on a worker thread) and sessions; see
+    for_data_loader().
+    """
+
+    def __init__(self, data_loader: DataLoader):
+        ids = data_loader.load_json(SAVE_IDS_FILE)
+        self.tables: Dict[str, List[str]] = {
+            table: self._unique(ids.get(table, _STATES if table == "states" else [])) for table in _TABLES
+        }
+        self.fingerprint = _fingerprint([self.tables[table] for table in _TABLES])
+        self._ids = {table: {name: i for i, name in enumerate(names)} for table, names in self.tables.items()}
+
+        # Version 1 derived its tables from the data files
+        self._v1_tables = {
+            "items": self._unique(list(data_loader.get_tool_items()) + list(data_loader.get_scenario_items())),
+            "locations": self._unique(list(data_loader.get_locations()) + list(data_loader.get_locations_logic())),
+            "characters": self._unique(list(data_loader.load_json("characters.json"))),
+            "states": list(_STATES),
+        }
+        self._v1_fingerprint = _fingerprint([self._v1_tables[table] for table in _TABLES])
+
+    @classmethod
+    def for_data_loader(cls, data_loader: DataLoader) -> "SaveCodec":
+        """The codec for a DataLoader, built once and shared by every state using it."""
+        codec = _shared_codecs.get(data_loader)
+        if codec is None:
+            codec = _shared_codecs[data_loader] = cls(data_loader)
+        return codec
+
+    @staticmethod
+    def _unique(names: List[str]) -> List[str]:
+        return list(dict.fromkeys(names))
+
+    # --- Encoding ---
+
+    def encode(self, snapshot: Dict[str, Any]) -> bytes:
+        writer = _Writer(self)
+        writer.bool_map("items", snapshot.get("inventory_overrides", {}))
+        writer.bool_map("items", snapshot.get("inventory", {}))
+        writer.bool_map("characters", snapshot.get("characters", {}))
+        writer.pair_map("locations", "states", snapshot.get("location_overrides", {}))
+        writer.pair_map("locations", "states", snapshot.get("locations", {}))
+        writer.pair_map("locations", "characters", snapshot.get("character_locations", {}))
+        writer.names("characters", snapshot.get("active_party", []))
+        writer.names("characters", snapshot.get("obtained_capsules", []))
+        writer.pairs("locations", "items", [(e["location"], e["name"]) for e in snapshot.get("shop_items", [])])
+        writer.uint(writer.string(snapshot.get("hints", "")))
+
+        head = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, self.fingerprint))
+        for table in _TABLES:
+            _put_uint(head, len(self.tables[table]))
+        _put_uint(head, len(writer.strings))
+        for s in writer.strings:
+            raw = s.encode("utf-8")
+            _put_uint(head, len(raw))
+            head += raw
+        return bytes(head) + bytes(writer.body)
+
+    # --- Decoding ---
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        if not is_binary_save(data):
+            raise ValueError("Not a binary tracker save")
+        if len(data) < _HEADER.size:
+            raise ValueError("truncated save")
+        _, version, fingerprint = _HEADER.unpack_from(data)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Save format version {version} is newer than supported ({FORMAT_VERSION})")
+
+        reader = _Reader(data, _HEADER.size)
+        if version == 1:
+            if fingerprint != self._v1_fingerprint:
+                raise ValueError("Version 1 save was written against different item/location data; load it in the "
+                                 "matching tracker version and save it again to migrate")
+            reader.tables = self._v1_tables
+        else:
+            reader.tables = self._file_tables([reader.uint() for _ in _TABLES], fingerprint)
+        reader.strings = [reader.raw_string() for _ in range(reader.uint())]
+        snapshot = {
+            "inventory_overrides": reader.bool_map("items"),
+            "inventory": reader.bool_map("items"),
+            "characters": reader.bool_map("characters"),
+            "location_overrides": reader.pair_map("locations", "states"),
+            "locations": reader.pair_map("locations", "states"),
+            "character_locations": reader.pair_map("locations", "characters"),
+            "active_party": reader.names("characters"),
+            "obtained_capsules": reader.names("characters"),
+            "shop_items": [{"location": loc, "name": name} for loc, name in reader.pairs("locations", "items")],
+        }
+        snapshot["hints"] = reader.string(reader.uint())
+        if reader.pos != len(data):
+            raise ValueError("Trailing data in binary save")
+        # Same key order as StateManager.snapshot()
+        order = ("inventory_overrides", "location_overrides", "character_locations", "inventory", "locations",
+                 "characters", "active_party", "obtained_capsules", "shop_items", "hints")
+        return {key: snapshot[key] for key in order}
+
+
+    def _file_tables(self, sizes: List[int], fingerprint: int) -> Dict[str, List[str]]:
+        """The ID tables a file was written with: a prefix of the current ones."""
+        tables = {}
+        for table, size in zip(_TABLES, sizes):
+            if size > len(self.tables[table]):
+                raise ValueError(f"Save uses {table} unknown to this tracker version (written by a newer version)")
+            tables[table] = self.tables[table][:size]
+        if _fingerprint([tables[table] for table in _TABLES]) != fingerprint:
+            raise ValueError(f"Save IDs do not match {SAVE_IDS_FILE} (the ID map was reordered, not appended to)")
+        return tables
+
+
+_shared_codecs: "weakref.WeakKeyDictionary[DataLoader, SaveCodec]" = weakref.WeakKeyDictionary()
+
+
+def _put_uint(buf: bytearray, value: int):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+class _Writer:
+    def __init__(self, codec: SaveCodec):
+        self.codec = codec
+        self.body = bytearray()
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+
+    def uint(self, value: int):
+        _put_uint(self.body, value)
+
+    def string(self, s: str) -> int:
+        index = self._string_ids.get(s)
+        if index is None:
+            index = self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+    def name_id(self, table: str, name: str) -> int:
+        ids = self.codec._ids[table]
+        index = ids.get(name)
+        return index if index is not None else len(ids) + self.string(name)
+
+    def bool_map(self, table: str, mapping: Dict[str, bool]):
+        ids = self.codec._ids[table]
+        size = (len(ids) + 7) // 8
+        present = bytearray(size)
+        values = bytearray(size)
+        extras: List[Tuple[int, bool]] = []
+        for name, value in mapping.items():
+            index = ids.get(name)
+            if index is None:
+                extras.append((self.string(name), bool(value)))
+                continue
+            present[index >> 3] |= 1 << (index & 7)
+            if value:
+                values[index >> 3] |= 1 << (index & 7)
+        self.body += present
+        self.body += values
+        self.uint(len(extras))
+        for string_id, value in extras:
+            self.uint(string_id)
+            self.body.append(value)
+
+    def pairs(self, key_table: str, value_table: str, pairs: List[Tuple[str, str]]):
+        self.uint(len(pairs))
+        for key, value in pairs:
+            self.uint(self.name_id(key_table, key))
+            self.uint(self.name_id(value_table, value))
+
+    def pair_map(self, key_table: str, value_table: str, mapping: Dict[str, str]):
+        self.pairs(key_table, value_table, list(mapping.items()))
+
+    def names(self, table: str, names: List[str]):
+        self.uint(len(names))
+        for name in names:
+            self.uint(self.name_id(table, name))
+
+
+class _Reader:
+    """Reads the body of a binary save. Malformed data raises ValueError, never IndexError."""
+
+    def __init__(self, data: bytes, pos: int):
+        self.data = data
+        self.pos = pos
+        self.tables: Dict[str, List[str]] = {}
+        self.strings: List[str] = []
+
+    def take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError("truncated save")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def uint(self) -> int:
+        result = shift = 0
+        while True:
+            if self.pos >= len(self.data):
+                raise ValueError("truncated save")
+            byte = self.data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+            if shift > 63:
+                raise ValueError("corrupt save (integer too long)")
+
+    def raw_string(self) -> str:
+        return self.take(self.uint()).decode("utf-8")
+
+    def string(self, index: int) -> str:
+        if index >= len(self.strings):
+            raise ValueError("corrupt save (string index out of range)")
+        return self.strings[index]
+
+    def name(self, table: str) -> str:
+        names = self.tables[table]
+        index = self.uint()
+        return names[index] if index < len(names) else self.string(index - len(names))
+
+    def bool_map(self, table: str) -> Dict[str, bool]:
+        names = self.tables[table]
+        size = (len(names) + 7) // 8
+        present = self.take(size)
+        values = self.take(size)
+        mapping = {
+            name: bool(values[i >> 3] & (1 << (i & 7)))
+            for i, name in enumerate(names) if present[i >> 3] & (1 << (i & 7))
+        }
+        for _ in range(self.uint()):
+            name = self.string(self.uint())
+            mapping[name] = bool(self.take(1)[0])
+        return mapping
+
+    def pairs(self, key_table: str, value_table: str) -> List[Tuple[str, str]]:
+        return [(self.name(key_table), self.name(value_table)) for _ in range(self.uint())]
+
+    def pair_map(self, key_table: str, value_table: str) -> Dict[str, str]:
+        return dict(self.pairs(key_table, value_table))
+
+    def names(self, table: str) -> List[str]:
+        return [self.name(table) for _ in range(self.uint())]
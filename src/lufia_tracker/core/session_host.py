@@ -0,0 +1,93 @@
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Type, Union
+
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.logic_engine import LogicEngine
+from lufia_tracker.core.save_format import BINARY_SAVE_SUFFIX
+from lufia_tracker.core.tracker_state import TrackerState
+
+# Session ids double as file names (save_all / load_all): letters, digits,
+# "_", "-" and "." (not first), at most 64 characters
+_SESSION_ID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,63}")
+
+
+class SessionHost:
+    """
+    Runs many tracker sessions in one process, e.g. one per runner on a
+    restream of the same seed.
+
+    All sessions share one DataLoader (parsed JSON), one LogicEngine
+    (compiled rules, expression DAG, accessibility cache) and one SaveCodec.
+    The loader and codec are never modified after loading; the engine's
+    caches fill as sessions query it, under the engine's lock, so sessions
+    may run on different threads. A session holds only its own state: the
+    TrackerState dicts, its journal and timeline, and an
+    AccessibilityTracker (an int and one bool per location), so each
+    additional runner costs kilobytes.
+
+    session_class is TrackerState for headless use (servers, tools) or
+    StateManager when sessions drive Qt widgets.
+    """
+
+    def __init__(self, data_loader: Optional[DataLoader] = None, logic_engine: Optional[LogicEngine] = None,
+                 session_class: Type[TrackerState] = TrackerState):
+        self.data_loader = data_loader if data_loader is not None else DataLoader()
+        self.logic_engine = logic_engine if logic_engine is not None else LogicEngine(self.data_loader)
+        self.session_class = session_class
+        self._sessions: Dict[str, TrackerState] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __getitem__(self, session_id: str) -> TrackerState:
+        return self._sessions[session_id]
+
+    def get(self, session_id: str) -> Optional[TrackerState]:
+        return self._sessions.get(session_id)
+
+    @staticmethod
+    def is_valid_session_id(session_id: str) -> bool:
+        return isinstance(session_id, str) and _SESSION_ID.fullmatch(session_id) is not None
+
+    def create_session(self, session_id: str) -> TrackerState:
+        """Starts an empty session. Raises ValueError if the id is invalid or taken."""
+        if not self.is_valid_session_id(session_id):
+            raise ValueError(f"Invalid session id {session_id!r} (letters, digits, '_', '-', '.'; max. 64)")
+        if session_id in self._sessions:
+            raise ValueError(f"Session '{session_id}' already exists")
+        session = self.session_class(self.logic_engine, self.data_loader)
+        self._sessions[session_id] = session
+        logging.info(f"SessionHost: started session '{session_id}' ({len(self._sessions)} running)")
+        return session
+
+    def remove_session(self, session_id: str) -> TrackerState:
+        """Ends a session (closing its journal file) and returns it."""
+        session = self._sessions.pop(session_id)
+        session.journal.close()
+        return session
+
+    # --- Persistence ---
+
+    def save_all(self, directory: Union[str, Path], suffix: str = BINARY_SAVE_SUFFIX):
+        """Saves every session to <directory>/<session id><suffix>."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for session_id, session in self._sessions.items():
+            session.save_state(directory / f"{session_id}{suffix}")
+
+    def load_all(self, directory: Union[str, Path], suffix: str = BINARY_SAVE_SUFFIX):
+        """Loads every <session id><suffix> save in a directory, creating missing sessions."""
+        for path in sorted(Path(directory).glob(f"*{suffix}")):
+            if not self.is_valid_session_id(path.stem):
+                logging.warning(f"SessionHost: skipping {path.name}, not a valid session id")
+                continue
+            session = self._sessions.get(path.stem) or self.create_session(path.stem)
+            session.load_state(path)
@@ -0,0 +1,70 @@
+from typing import Dict, List, Tuple, Iterator, Iterable, Any
+
+class ShopItemStore:
+    """
+    Insertion-ordered set of shop entries keyed by (location, item name).
+    Per-location and per-item secondary indexes keep lookups, duplicate
+    checks and removals O(1). Entries are the legacy {location, name} dicts.
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self._entries: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._by_location: Dict[str, Dict[str, None]] = {}
+        self._by_item: Dict[str, Dict[str, None]] = {}
+        self.load(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._entries.values())
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def add(self, location: str, item_name: str) -> bool:
+        """Adds an entry. Returns False if it already existed."""
+        key = (location, item_name)
+        if key in self._entries:
+            return False
+        self._entries[key] = {'location': location, 'name': item_name}
+        self._by_location.setdefault(location, {})[item_name] = None
+        self._by_item.setdefault(item_name, {})[location] = None
+        return True
+
+    def remove(self, location: str, item_name: str) -> bool:
+        """Removes an entry. Returns False if it did not exist."""
+        if self._entries.pop((location, item_name), None) is None:
+            return False
+        self._unindex(self._by_location, location, item_name)
+        self._unindex(self._by_item, item_name, location)
+        return True
+
+    def _unindex(self, index: Dict[str, Dict[str, None]], key: str, value: str):
+        values = index[key]
+        del values[value]
+        if not values:
+            del index[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_location.clear()
+        self._by_item.clear()
+
+    def load(self, entries: Iterable[Dict[str, Any]]):
+        """Replaces the contents with saved {location, name} dicts (duplicates dropped)."""
+        self.clear()
+        for entry in entries:
+            self.add(entry['location'], entry['name'])
+
+    def items_at(self, location: str) -> List[str]:
+        """Item names registered at a location, in insertion order."""
+        return list(self._by_location.get(location, ()))
+
+    def locations_of(self, item_name: str) -> List[str]:
+        """Locations an item was registered at, in insertion order."""
+        return list(self._by_item.get(item_name, ()))
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """Entries as a new list of {location, name} dicts (save format)."""
+        return [dict(entry) for entry in self._entries.values()]
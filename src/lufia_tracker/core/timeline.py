@@ -0,0 +1,207 @@
+import bisect
+import copy
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from lufia_tracker.core.journal import Change
+from lufia_tracker.core.shop_items import ShopItemStore
+
+# Change kind -> snapshot() key holding that kind's values
+_SNAPSHOT_KEYS = {"i": "inventory_overrides", "l": "location_overrides", "c": "characters",
+                  "a": "character_locations"}
+
+
+def invert_changes(changes: List[Change]) -> List[Change]:
+    """The changes that undo `changes` (old and new swapped, reverse order)."""
+    return [[kind, key, new, old] for kind, key, old, new in reversed(changes)]
+
+
+def apply_changes(snapshot: Dict[str, Any], changes: List[Change]):
+    """Applies journal changes (new values) to a snapshot() dict in place."""
+    shop = None
+    for kind, key, old, new in changes:
+        if kind in _SNAPSHOT_KEYS:
+            mapping = snapshot.setdefault(_SNAPSHOT_KEYS[kind], {})
+            if new is None:
+                mapping.pop(key, None)
+            else:
+                mapping[key] = new
+        elif kind == "s":
+            if shop is None:
+                shop = ShopItemStore(snapshot.get("shop_items", []))
+            if new:
+                shop.add(*key)
+            else:
+                shop.remove(*key)
+        elif kind == "h":
+            snapshot["hints"] = new or ""
+    if shop is not None:
+        snapshot["shop_items"] = shop.to_list()
+
+
+class Timeline:
+    """
+    Timestamped history of every state change in a session.
+
+    Deltas are journal change lists, stored in forward form (an undo is
+    recorded as the inverted changes), so the state can be stepped forwards
+    and backwards. Full snapshots are kept as keyframes: at the start,
+    every `keyframe_interval` deltas and for bulk changes (load / reset),
+    which take a delta slot of their own (None) that can only be crossed by
+    restoring a keyframe. The state at any time is then the nearest keyframe
+    plus at most `keyframe_interval` deltas; see seek() and path().
+
+    Times are wall-clock seconds (time.time), forced non-decreasing.
+    """
+
+    def __init__(self, keyframe_interval: int = 100, clock: Callable[[], float] = time.time):
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.clock = clock
+        self._times: List[float] = []
+        self._deltas: List[Optional[List[Change]]] = []
+        # Keyframe k holds the state after the first _key_positions[k] deltas
+        self._key_positions: List[int] = []
+        self._key_times: List[float] = []
+        self._key_snapshots: List[Dict[str, Any]] = []
+        self._bulk_positions: List[int] = [] # Delta slots of bulk keyframes, ascending
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return self._key_times[0] if self._key_times else None
+
+    @property
+    def end_time(self) -> Optional[float]:
+        if self._times:
+            return self._times[-1]
+        return self.start_time
+
+    def _now(self, t: Optional[float]) -> float:
+        t = self.clock() if t is None else t
+        end = self.end_time
+        return t if end is None or t >= end else end
+
+    # --- Recording ---
+
+    def record(self, changes: List[Change], t: Optional[float] = None, snapshot: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Appends a delta. `snapshot` (returning the state after it) is called
+        when a periodic keyframe is due.
+        """
+        if not changes:
+            return
+        if not self._key_snapshots:
+            raise RuntimeError("Timeline needs a starting keyframe")
+        t = self._now(t)
+        self._times.append(t)
+        self._deltas.append(changes)
+        if snapshot is not None and len(self._deltas) - self._key_positions[-1] >= self.keyframe_interval:
+            self._add_keyframe(t, snapshot())
+
+    def keyframe(self, snapshot: Dict[str, Any], t: Optional[float] = None, bulk: bool = True):
+        """
+        Records a full state. bulk (a load or reset): the state jumped there,
+        this takes a delta slot. Otherwise it is a checkpoint of the current state.
+        """
+        t = self._now(t)
+        if bulk and self._key_snapshots:
+            self._times.append(t)
+            self._deltas.append(None)
+            self._bulk_positions.append(len(self._deltas))
+        self._add_keyframe(t, snapshot)
+
+    def _add_keyframe(self, t: float, snapshot: Dict[str, Any]):
+        position = len(self._deltas)
+        snapshot = copy.deepcopy(snapshot)
+        if self._key_positions and self._key_positions[-1] == position:
+            self._key_times[-1] = t
+            self._key_snapshots[-1] = snapshot
+        else:
+            self._key_positions.append(position)
+            self._key_times.append(t)
+            self._key_snapshots.append(snapshot)
+
+    # --- Seeking ---
+
+    def position_at(self, t: float) -> int:
+        """Number of deltas applied at time t."""
+        return bisect.bisect_right(self._times, t)
+
+    def time_at(self, position: int) -> Optional[float]:
+        """Time of the state after `position` deltas."""
+        if position == 0:
+            return self.start_time
+        return self._times[position - 1]
+
+    def _keyframe_for(self, position: int) -> int:
+        return bisect.bisect_right(self._key_positions, position) - 1
+
+    def seek(self, t: float) -> Dict[str, Any]:
+        """State at time t as a new snapshot() dict (the first state before the start)."""
+        position = self.position_at(t)
+        k = max(0, self._keyframe_for(position))
+        state = copy.deepcopy(self._key_snapshots[k])
+        for changes in self._deltas[self._key_positions[k]:position]:
+            apply_changes(state, changes)
+        return state
+
+    def path(self, position: Optional[int], target: int) -> Tuple[Optional[Dict[str, Any]], List[List[Change]]]:
+        """
+        How to move a state from `position` deltas to `target` deltas:
+        (snapshot to restore first or None, change lists to apply in order).
+        Steps incrementally (inverted deltas backwards) when that is no longer
+        than replaying from the target's keyframe and no bulk keyframe lies
+        in between; otherwise restores the keyframe.
+        """
+        k = max(0, self._keyframe_for(target))
+        key_position = self._key_positions[k]
+        from_key = target - key_position
+        if position is not None and abs(target - position) <= from_key + 1:
+            low, high = min(position, target), max(position, target)
+            i = bisect.bisect_right(self._bulk_positions, low)
+            if i == len(self._bulk_positions) or self._bulk_positions[i] > high:
+                if target >= position:
+                    return None, self._deltas[position:target]
+                return None, [invert_changes(c) for c in reversed(self._deltas[target:position])]
+        return copy.deepcopy(self._key_snapshots[k]), self._deltas[key_position:target]
+
+    # --- Persistence ---
+
+    @classmethod
+    def from_journal(cls, path: Union[str, Path], keyframe_interval: int = 100) -> "Timeline":
+        """
+        Rebuilds the timeline of a whole session from a journal file (all of
+        it, not just the part after the last snapshot; a compacted journal
+        starts at its rotation). Lines without a time get the time of the
+        line before.
+        """
+        timeline = cls(keyframe_interval)
+        state: Optional[Dict[str, Any]] = None
+        t = 0.0
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Timeline: skipping unreadable line {line_no} in {path}")
+                    continue
+                t = record.get("t", t)
+                if "snap" in record:
+                    state = record["snap"]
+                    timeline.keyframe(state, t, bulk=record.get("reset", False))
+                    continue
+                if state is None:
+                    continue # Actions before the first snapshot have no base state
+                changes = record.get("c", [])
+                if "u" in record:
+                    changes = invert_changes(changes)
+                elif "a" not in record and "r" not in record:
+                    continue
+                apply_changes(state, changes)
+                timeline.record(changes, t, snapshot=lambda: state)
+        return timeline
@@ -0,0 +1,834 @@
+import json
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping, List, Callable, Tuple
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.journal import Journal, Change
+from lufia_tracker.core.save_format import SaveCodec, BINARY_SAVE_SUFFIX, is_binary_save, atomic_write
+from lufia_tracker.core.shop_items import ShopItemStore
+from lufia_tracker.core.timeline import Timeline, invert_changes
+
+# Events passed to observers, with their arguments
+EVENTS = (
+    "inventory_changed",        # full inventory dict (only built if observed)
+    "inventory_delta",          # changed items only {name: obtained}, state version
+    "location_changed",         # location_name, new_state
+    "player_position_changed",  # x, y (canvas coordinates)
+    "character_changed",        # name, is_obtained
+    "character_assigned",       # location, character_name
+    "character_unassigned",     # location, character_name
+    "reset_occurred",           # global reset
+    "shop_items_changed",       # list of {location, name} dicts (bulk: clear / load)
+    "shop_item_added",          # location, item_name
+    "shop_item_removed",        # location, item_name
+    "hints_changed",            # text
+    "batch_committed",          # change set, once per outermost batch() instead of the above
+)
+
+
+class TrackerState:
+    """
+    Central repository for the application state.
+    Handles manual overrides and toroidal world logic.
+
+    Pure Python: changes are reported to observers registered with
+    subscribe(event, callback) (see EVENTS). StateManager adapts this to Qt
+    signals for the GUI; headless tools use TrackerState directly.
+    """
+    
+    def __init__(self, logic_engine, data_loader: Optional[DataLoader] = None):
+        self._observers: Dict[str, List[Callable]] = {}
+        self.logic_engine = logic_engine
+        # This session's incremental accessibility, kept in sync with the
+        # effective inventory before observers hear of a change; the engine
+        # itself is shared
+        self.accessibility = logic_engine.new_tracker()
+        self.data_loader = data_loader if data_loader is not None else DataLoader()
+        # ID tables for the binary save format (immutable, shared by all states and AutoSaver's thread)
+        self.save_codec = SaveCodec.for_data_loader(self.data_loader)
+        
+        # --- Internal State ---
+        self._inventory: Dict[str, bool] = {}
+        self._locations: Dict[str, str] = {}  # name -> state
+        self._characters: Dict[str, bool] = {}
+        # Two-way character index: location -> character, and character ->
+        # its locations (in assignment order; the last one is "its" location)
+        self._character_locations: Dict[str, str] = {}
+        self._locations_by_character: Dict[str, Dict[str, None]] = {}
+        self._character_locations_view = MappingProxyType(self._character_locations)
+        self._active_party = set()
+        self._active_party_list = [] # Ordered list for Sprite Display
+        self._obtained_capsules = set()
+        self._player_pos = (0.0, 0.0)
+        self._game_world_size = (4096, 4096)  # Standard SNES Map Size
+        self._canvas_size = (400, 400)        # Fixed Canvas Size
+        self._shop_items = ShopItemStore() # (location, name) -> {location, name}
+        self.hints_text = ""
+        
+        # Monotonically increasing, bumped on every state mutation
+        self._version = 0
+        
+        # Open batch() transaction: deferred changes, None when not batching,
+        # and the version its changes were given (None until the first one)
+        self._pending: Optional[Dict[str, Any]] = None
+        self._batch_version: Optional[int] = None
+        
+        # Event journal of manual actions (undo/redo). In memory until
+        # open_journal() gives it a file.
+        self.journal = Journal()
+        self._recording: Optional[List[Change]] = None
+        
+        # Timestamped history of all changes (see seek()); started below
+        self.timeline = Timeline()
+        self._replay_timeline: Optional[Timeline] = None
+        self._replay_position: Optional[int] = None
+        
+        # --- Overrides ---
+        # If a user manually clicks something, it gets locked here.
+        self._manual_inventory_overrides: Dict[str, bool] = {}
+        self._manual_location_overrides: Dict[str, str] = {}
+        self._manual_character_overrides: Dict[str, bool] = {}
+        
+        # --- Effective State ---
+        # Raw state merged with overrides (overrides win), maintained on every
+        # write and exposed read-only, so reads never copy.
+        self._effective_inventory: Dict[str, bool] = {}
+        self._effective_locations: Dict[str, str] = {}
+        self._inventory_view = MappingProxyType(self._effective_inventory)
+        self._locations_view = MappingProxyType(self._effective_locations)
+        
+        # --- Spoiler Location Names ---
+        # spoiler name -> internal name, precomputed by the DataLoader
+        self._spoiler_location_index = self.data_loader.get_spoiler_location_index()
+        logging.info(f"Loaded {len(self._spoiler_location_index)} location mappings.")
+        
+        self.timeline.keyframe(self.snapshot())
+
+    def _normalize_location_name(self, raw_loc):
+        """
+        Normalize location name from spoiler log using loaded mapping.
+        Replicates v1.3 Logic: the FIRST matching internal name wins
+        (resolved once when the index is built, so this is a dict lookup).
+        """
+        if not raw_loc:
+            return "Unknown"
+        return self._spoiler_location_index.get(raw_loc, raw_loc)
+        
+    # --- Public Accessors ---
+    
+    def get_inventory(self) -> Dict[str, bool]:
+        """Explicit getter for inventory (a mutable copy)."""
+        return dict(self._effective_inventory)
+
+    @property
+    def inventory(self) -> Mapping[str, bool]:
+        """Returns effective inventory (actual + overrides) as a read-only live view."""
+        return self._inventory_view
+
+    @property
+    def locations(self) -> Mapping[str, str]:
+        """Returns effective location states as a read-only live view."""
+        return self._locations_view
+
+    def _rebuild_effective_state(self):
+        """Re-merges raw state and overrides after bulk writes (load / reset)."""
+        self._effective_inventory.clear()
+        self._effective_inventory.update(self._inventory)
+        self._effective_inventory.update(self._manual_inventory_overrides)
+        self._effective_locations.clear()
+        self._effective_locations.update(self._locations)
+        self._effective_locations.update(self._manual_location_overrides)
+        
+    @property
+    def version(self) -> int:
+        """State version, incremented on every change (once per batch)."""
+        return self._version
+
+    def _bump_version(self) -> int:
+        """Advances the version once per logical change: writes inside one batch share it."""
+        if self._pending is not None and self._batch_version is not None:
+            return self._batch_version
+        self._version += 1
+        if self._pending is not None:
+            self._batch_version = self._version
+        return self._version
+
+    # --- Signal Emission / Transactions ---
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups changes into one transaction:
+
+            with state_manager.batch():
+                ...
+
+        Signals raised inside are deferred and coalesced; on exit a single
+        batch_committed(changes) is emitted instead. Nested batches join the
+        outermost one. The change set holds the final value per key:
+            version          state version after the batch (one bump per batch)
+            reset            True if reset_state ran (reset_occurred)
+            inventory        {item: obtained} effective items that changed
+            locations        {location: state} from location_changed
+            characters       {name: obtained} from character_changed
+            assignments      {location: character or None (unassigned)}
+            shop_items       current list, or None if untouched
+            hints            current text, or None if untouched
+            player_position  (x, y), or None if untouched
+        """
+        if self._pending is not None:
+            yield self
+            return
+
+        self._pending = {
+            "inventory_before": self.get_inventory(),
+            "reset": False,
+            "locations": {},
+            "characters": {},
+            "assignments": {},
+            "shop_items": None,
+            "hints": None,
+            "player_position": None,
+        }
+        self._batch_version = None
+        try:
+            yield self
+        finally:
+            pending, self._pending = self._pending, None
+            self._commit_batch(pending)
+
+    def _commit_batch(self, pending: Dict[str, Any]):
+        previous = pending.pop("inventory_before")
+        current = self._effective_inventory
+        pending["inventory"] = {
+            item: current.get(item, False)
+            for item in previous.keys() | current.keys()
+            if current.get(item, False) != previous.get(item, False)
+        }
+        touched = ("shop_items", "hints", "player_position")
+        if not any(pending[key] for key in pending if key not in touched) \
+                and all(pending[key] is None for key in touched):
+            return # Nothing happened
+        if pending["inventory"]:
+            self.accessibility.update(pending["inventory"])
+        pending["version"] = self._version
+        if pending["shop_items"] is not None:
+            pending["shop_items"] = self.shop_items
+        self._notify("batch_committed", pending)
+        if pending["inventory"] and self._has_observers("inventory_changed"):
+            self._notify("inventory_changed", self.get_inventory())
+
+    def _emit(self, event: str, *args):
+        """Notifies observers of an event, or records it in the open batch."""
+        pending = self._pending
+        if pending is None:
+            self._notify(event, *args)
+        elif event == "location_changed":
+            pending["locations"][args[0]] = args[1]
+        elif event == "character_changed":
+            pending["characters"][args[0]] = args[1]
+        elif event == "character_assigned":
+            pending["assignments"][args[0]] = args[1]
+        elif event == "character_unassigned":
+            if pending["assignments"].get(args[0], args[1]) == args[1]:
+                pending["assignments"][args[0]] = None
+        elif event in ("shop_items_changed", "shop_item_added", "shop_item_removed"):
+            pending["shop_items"] = True # Replaced by the final list on commit
+        elif event == "hints_changed":
+            pending["hints"] = args[0]
+        elif event == "player_position_changed":
+            pending["player_position"] = args
+        elif event == "reset_occurred":
+            pending["reset"] = True
+
+    # --- Observers ---
+
+    def subscribe(self, event: str, callback: Callable):
+        """Calls callback(*args) on every `event` (see EVENTS)."""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+        self._observers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable):
+        callbacks = self._observers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _notify(self, event: str, *args):
+        for callback in tuple(self._observers.get(event, ())):
+            callback(*args)
+
+    def _has_observers(self, event: str) -> bool:
+        return bool(self._observers.get(event))
+
+    def get_player_position(self) -> Tuple[float, float]:
+        """Returns current player position (canvas coordinates)."""
+        return self._player_pos
+
+    # --- Manual Interactions (High Priority) ---
+    
+    def set_manual_location_state(self, name: str, state: str):
+        """User manually clicked a location dot."""
+        with self._action("location"):
+            self._record("l", name, self._manual_location_overrides.get(name), state)
+            self._manual_location_overrides[name] = state
+            self._effective_locations[name] = state
+            self._bump_version()
+            self._emit("location_changed", name, state)
+        logging.info(f"Manual override: Location {name} -> {state}")
+
+    def toggle_manual_inventory(self, item_name: str):
+        """User clicked an item icon."""
+        new_state = not self._effective_inventory.get(item_name, False)
+        with self._action("toggle"):
+            self._record("i", item_name, self._manual_inventory_overrides.get(item_name), new_state)
+            self._manual_inventory_overrides[item_name] = new_state
+            self._effective_inventory[item_name] = new_state
+            version = self._bump_version()
+            if self._pending is None: # Otherwise reported (and tracked) by the batch commit
+                self.accessibility.update({item_name: new_state})
+                self._notify("inventory_delta", {item_name: new_state}, version)
+                if self._has_observers("inventory_changed"):
+                    self._notify("inventory_changed", self.get_inventory())
+        logging.info(f"Manual override: Item {item_name} -> {new_state}")
+
+    # --- Journal / Undo ---
+
+    @contextmanager
+    def _action(self, name: str):
+        """
+        Records the state writes made inside as one journal action. Nested
+        actions (assign -> set_character_obtained ...) join the outermost one.
+        """
+        if self._recording is not None:
+            yield
+            return
+        self._recording = []
+        try:
+            yield
+        finally:
+            changes, self._recording = self._recording, None
+            if changes:
+                self.journal.record(name, changes)
+                if self.journal.needs_snapshot:
+                    self.journal.snapshot(self.snapshot())
+                self.timeline.record(changes, snapshot=self.snapshot)
+
+    def _record(self, kind: str, key, old, new):
+        if self._recording is not None and old != new:
+            self._recording.append([kind, key, old, new])
+
+    def _checkpoint(self):
+        """After bulk changes (load / reset): snapshot, earlier actions are no longer undoable."""
+        if self._pending is None:
+            snapshot = self.snapshot()
+            self.journal.snapshot(snapshot, reset_history=True)
+            self.timeline.keyframe(snapshot)
+
+    def open_journal(self, path: str):
+        """
+        Journals to a file from now on. An existing journal is resumed: its
+        last snapshot and the actions after it are replayed (crash recovery)
+        and its undo history continues. Otherwise it starts with a snapshot
+        of the current state.
+        Raises OSError if the file cannot be read or written; the current
+        (in-memory) journal then stays in use.
+        """
+        import os
+        if os.path.exists(path):
+            replay = self.journal.resume(path)
+            with self.batch():
+                if replay.snapshot is not None:
+                    self._restore_state(replay.snapshot)
+                for changes, forward in replay.transitions:
+                    self._apply_changes(changes, forward)
+            self.timeline.keyframe(self.snapshot())
+            if self.journal.needs_compaction:
+                self.journal.snapshot(self.snapshot())
+            logging.info(f"Journal resumed from {path} ({len(replay.transitions)} events replayed)")
+        else:
+            journal = Journal(path, self.journal.snapshot_interval)
+            journal.snapshot(self.snapshot())
+            if journal.write_failed:
+                raise OSError(f"Could not write journal {path}")
+            self.journal.close()
+            self.journal = journal
+
+    @property
+    def can_undo(self) -> bool:
+        return self.journal.can_undo
+
+    @property
+    def can_redo(self) -> bool:
+        return self.journal.can_redo
+
+    def undo(self) -> bool:
+        """Reverts the last manual action. Returns False if there is nothing to undo."""
+        entry = self.journal.undo()
+        if entry is None:
+            return False
+        self._apply_changes(entry.changes, forward=False)
+        self.timeline.record(invert_changes(entry.changes), snapshot=self.snapshot)
+        logging.info(f"Undo: {entry.action}")
+        return True
+
+    def redo(self) -> bool:
+        """Re-applies the last undone action. Returns False if there is nothing to redo."""
+        entry = self.journal.redo()
+        if entry is None:
+            return False
+        self._apply_changes(entry.changes, forward=True)
+        self.timeline.record(entry.changes, snapshot=self.snapshot)
+        logging.info(f"Redo: {entry.action}")
+        return True
+
+    # --- Timeline Replay ---
+
+    def replay_view(self, timeline: Optional[Timeline] = None) -> "TrackerState":
+        """
+        A separate state of the same type that replays `timeline` (default:
+        this session's) through seek(). It has no journal file or autosaver,
+        so scrubbing it never touches the live session.
+        """
+        if timeline is None:
+            timeline = self._replay_timeline or self.timeline
+        view = type(self)(self.logic_engine, self.data_loader)
+        view.load_timeline(timeline)
+        return view
+
+    def load_timeline(self, timeline: Timeline):
+        """
+        Makes this state a replay view of a recorded session (another
+        state's timeline, or Timeline.from_journal); widgets bound to it
+        follow seek(). seek() overwrites the whole state, so a live session
+        (journaling to a file, or replaying its own timeline) is refused:
+        use replay_view() instead.
+        """
+        if timeline is self.timeline or self.journal.path is not None:
+            raise RuntimeError("load_timeline() would overwrite the live session, use replay_view()")
+        self._replay_timeline = timeline
+        self._replay_position = None
+
+    @property
+    def replay_timeline(self) -> Optional[Timeline]:
+        """The timeline seek() replays (see load_timeline), or None."""
+        return self._replay_timeline
+
+    def seek(self, t: float):
+        """
+        Shows the replayed session's state at wall-clock time t. Nearby seeks
+        (scrubbing) step through the deltas in between, in either direction;
+        far ones restore the nearest keyframe. Widgets get one batch_committed.
+        """
+        if self._replay_timeline is None:
+            raise RuntimeError("seek() needs a timeline, see load_timeline()")
+        target = self._replay_timeline.position_at(t)
+        if target == self._replay_position:
+            return
+        snapshot, steps = self._replay_timeline.path(self._replay_position, target)
+        with self.batch():
+            if snapshot is not None:
+                self._restore_state(snapshot)
+            for changes in steps:
+                self._apply_changes(changes, forward=True)
+        self._replay_position = target
+
+    def _apply_changes(self, changes: List[Change], forward: bool):
+        """Applies journal changes (new values if forward, else old values in reverse) as one batch."""
+        with self.batch():
+            for kind, key, old, new in (changes if forward else reversed(changes)):
+                value = new if forward else old
+                if kind == "i":
+                    self._set_override(self._manual_inventory_overrides, self._inventory,
+                                       self._effective_inventory, key, value)
+                elif kind == "l":
+                    self._set_override(self._manual_location_overrides, self._locations,
+                                       self._effective_locations, key, value)
+                    self._emit("location_changed", key, self._effective_locations.get(key, ""))
+                elif kind == "c":
+                    if value is None:
+                        self._characters.pop(key, None)
+                    else:
+                        self._characters[key] = value
+                    self._emit("character_changed", key, bool(value))
+                elif kind == "a":
+                    current = self._character_locations.get(key)
+                    if current is not None and current != value:
+                        self._unlink_location(key)
+                        self._emit("character_unassigned", key, current)
+                    if value is not None and current != value:
+                        self._link_character(key, value)
+                        self._emit("character_assigned", key, value)
+                elif kind == "s":
+                    location, item_name = key
+                    if value:
+                        self._shop_items.add(location, item_name)
+                        self._emit("shop_item_added", location, item_name)
+                    else:
+                        self._shop_items.remove(location, item_name)
+                        self._emit("shop_item_removed", location, item_name)
+                elif kind == "h":
+                    self.hints_text = value or ""
+                    self._emit("hints_changed", self.hints_text)
+            self._bump_version()
+
+    def _set_override(self, overrides: Dict, raw: Dict, effective: Dict, key: str, value):
+        """Sets (or with None removes) an override and updates the effective map."""
+        if value is None:
+            overrides.pop(key, None)
+            if key in raw:
+                effective[key] = raw[key]
+            else:
+                effective.pop(key, None)
+        else:
+            overrides[key] = value
+            effective[key] = value
+
+    def reset_overrides(self):
+        """Clears all manual overrides, reverting to raw external data."""
+        with self.batch():
+            self._manual_inventory_overrides.clear()
+            self._manual_location_overrides.clear()
+            self._manual_character_overrides.clear()
+            self._rebuild_effective_state()
+            self._bump_version()
+        
+            # Re-emit everything to sync UI (inventory is diffed by the batch)
+            for loc, state in self._locations.items():
+                self._emit("location_changed", loc, state)
+            # TODO: emit characters
+        self._checkpoint()
+        
+        logging.info("Manual overrides reset.")
+
+    # --- External Data Updates (Low Priority) ---
+    
+    # [Removed Auto-Tracking External Updates]
+
+    def _update_player_position(self, game_x: int, game_y: int):
+        """
+        Calculates canvas position from game coordinates.
+        Handles toroidal wrapping visuals if necessary (though straight mapping is usually fine for a 1:1 map).
+        """
+        # 1. Scale to Canvas
+        scale_x = self._canvas_size[0] / self._game_world_size[0]
+        scale_y = self._canvas_size[1] / self._game_world_size[1]
+        
+        canvas_x = game_x * scale_x
+        canvas_y = game_y * scale_y
+        
+        self._player_pos = (canvas_x, canvas_y)
+
+
+    @property
+    def obtained_characters(self) -> Dict[str, bool]:
+        """Returns all obtained characters (whether in party or not)."""
+        return self._characters.copy()
+
+    @property
+    def active_party(self) -> set:
+        """Returns the set of characters currently in the player's party."""
+        return getattr(self, '_active_party', set())
+
+    def get_active_party_leader(self) -> Optional[str]:
+        """Returns the name of the first character in the active party (Slot 1)."""
+        if hasattr(self, '_active_party_list') and self._active_party_list:
+             return self._active_party_list[0]
+        return None
+        
+    @property
+    def character_locations(self) -> Mapping[str, str]:
+        """Read-only live view of location -> assigned character."""
+        return self._character_locations_view
+
+    def get_character_at_location(self, location_name: str) -> Optional[str]:
+        return self._character_locations.get(location_name)
+
+    def get_character_location(self, character_name: str) -> Optional[str]:
+        """Returns the location a character is assigned to (most recent if several), or None."""
+        locations = self._locations_by_character.get(character_name)
+        return next(reversed(locations)) if locations else None
+
+    def is_character_assigned(self, character_name: str) -> bool:
+        return character_name in self._locations_by_character
+
+    def _link_character(self, location: str, character_name: str):
+        """Assigns in both directions, replacing whoever was at the location."""
+        if self._character_locations.get(location) == character_name:
+            return # Already there: keeps its place in the assignment order
+        self._unlink_location(location)
+        self._record("a", location, None, character_name)
+        self._character_locations[location] = character_name
+        self._locations_by_character.setdefault(character_name, {})[location] = None
+
+    def _unlink_location(self, location: str) -> Optional[str]:
+        """Removes a location's assignment in both directions. Returns the character."""
+        character_name = self._character_locations.pop(location, None)
+        if character_name is not None:
+            self._record("a", location, character_name, None)
+            locations = self._locations_by_character[character_name]
+            del locations[location]
+            if not locations:
+                del self._locations_by_character[character_name]
+        return character_name
+
+    def _set_character_locations(self, assignments: Dict[str, str]):
+        """Replaces every assignment (load / reset), rebuilding the reverse index."""
+        self._character_locations.clear()
+        self._locations_by_character.clear()
+        for location, character_name in assignments.items():
+            self._link_character(location, character_name)
+
+    def set_character_obtained(self, name: str, obtained: bool):
+        with self._action("character"):
+            self._record("c", name, self._characters.get(name), obtained)
+            self._characters[name] = obtained
+            self._bump_version()
+            self._emit("character_changed", name, obtained)
+        
+    def assign_character_to_location(self, location: str, character_name: str):
+        # 0. Prevent Redundant Updates
+        if self._character_locations.get(location) == character_name:
+            return
+        with self._action("assign"):
+            self._assign_character_to_location(location, character_name)
+
+    def _assign_character_to_location(self, location: str, character_name: str):
+
+        # 1. Check if character is already assigned elsewhere (Move)
+        prev_loc = self.get_character_location(character_name)
+        
+        if prev_loc:
+             # Remove from old location, but keep obtained status (moving)
+             # Just emit unassign so map sprite is removed
+             self._unlink_location(prev_loc)
+             self._emit("character_unassigned", prev_loc, character_name)
+
+        # 2. Check if location already has someone (Overwrite)
+        old_char = self._character_locations.get(location)
+        if old_char and old_char != character_name:
+             # User says: "Previous character needs to be dimmed" (Reset)
+             self.set_character_obtained(old_char, False)
+             self._emit("character_unassigned", location, old_char)
+             
+        # 3. Assign
+        self._link_character(location, character_name)
+        self._bump_version()
+        self.set_character_obtained(character_name, True)
+        
+        # 4. Mark Location as "Cleared"
+        self.set_manual_location_state(location, "cleared")
+        
+        # Emit signal for MapWidget
+        self._emit("character_assigned", location, character_name)
+        
+    def remove_character_assignment(self, location: str):
+        with self._action("unassign"):
+            self._remove_character_assignment(location)
+
+    def _remove_character_assignment(self, location: str):
+        char = self._unlink_location(location)
+        if char:
+            self._bump_version()
+            # Logic Parity v1.3: "Removes from inactive but obtained roster"
+            # Since inactive roster = obtained=True but not in Active Party,
+            # we set obtained=False.
+            self.set_character_obtained(char, False)
+            self._emit("character_unassigned", location, char)
+            logging.info(f"StateManager: Removed {char} from {location} and set to Not Obtained.")
+
+    @property
+    def shop_items(self) -> List[Dict[str, str]]:
+        """All shop entries in insertion order, as a new list of {location, name} dicts."""
+        return self._shop_items.to_list()
+
+    def get_shop_items_at(self, location: str) -> List[str]:
+        return self._shop_items.items_at(location)
+
+    def get_shop_item_locations(self, item_name: str) -> List[str]:
+        return self._shop_items.locations_of(item_name)
+
+    def has_shop_item(self, location: str, item_name: str) -> bool:
+        return (location, item_name) in self._shop_items
+
+    def register_shop_item(self, location, item_name):
+        if not self._shop_items.add(location, item_name):
+            return # Duplicate
+        with self._action("shop_add"):
+            self._record("s", [location, item_name], False, True)
+            self._bump_version()
+            self._emit("shop_item_added", location, item_name)
+        
+    def unregister_shop_item(self, location, item_name):
+        if not self._shop_items.remove(location, item_name):
+            return
+        with self._action("shop_remove"):
+            self._record("s", [location, item_name], True, False)
+            self._bump_version()
+            self._emit("shop_item_removed", location, item_name)
+        
+    def clear_shop_items(self):
+        with self._action("shop_clear"):
+            if self._recording is not None:
+                for entry in self._shop_items:
+                    self._record("s", [entry['location'], entry['name']], True, False)
+            self._shop_items.clear()
+            self._bump_version()
+            self._emit("shop_items_changed", [])
+
+    def update_hints(self, text):
+        if self.hints_text != text:
+            with self._action("hints"):
+                self._record("h", None, self.hints_text, text)
+                self.hints_text = text
+                self._bump_version()
+                self._emit("hints_changed", text)
+
+    # [Removed toggle_auto_tracking, on_helper_data, process_auto_update]
+
+    def reset_state(self):
+        """Reset all tracker state to defaults (but keep options)."""
+        logging.info("Resetting tracker state to defaults.")
+        with self.batch():
+            self._inventory = {}
+            self._characters = {}
+            self._active_party = set()
+            self._obtained_capsules = set()
+        
+            self.reset_overrides()
+        
+            # Unassign all map sprites explicitly
+            for loc, char in list(self._character_locations.items()):
+                self._emit("character_unassigned", loc, char)
+            self._set_character_locations({})
+        
+            # Locations reset
+            self._locations = {}
+            self._rebuild_effective_state()
+            self._emit("location_changed", "Reset", "reset") 
+        
+            # Emit all signals to clear UI (inventory is diffed by the batch)
+            self._shop_items.clear()
+            self._emit("shop_items_changed", [])
+        
+            self.hints_text = ""
+            # hints UI cleared by MainWindow._on_reset_occurred
+        
+            # Characters:
+            for name in ["Maxim", "Selan", "Guy", "Artea", "Tia", "Dekar", "Lexis", "Jelze", "Flash", "Gusto", "Zeppy", "Darbi", "Sully", "Blaze"]:
+                self._emit("character_changed", name, False)
+        
+            self._player_pos = (0.0, 0.0)
+            self._emit("player_position_changed", 0, 0)
+        
+            self._emit("reset_occurred")
+        self._checkpoint()
+
+
+
+    def register_spoiler_location(self, location: str, character_name: str):
+        """
+        Registers a potential character location from the spoiler log.
+        Does NOT mark as obtained or cleared.
+        """
+        # Update internal map
+        with self._action("spoiler"):
+            self._link_character(location, character_name)
+        self._bump_version()
+        # Emit signal so MapWidget can place the sprite (if location not cleared)
+        self._emit("character_assigned", location, character_name)
+
+    def register_spoiler_locations(self, placements: Dict[str, str]):
+        """
+        Registers a whole spoiler log {location: character_name} as one
+        action: widgets get one batch_committed and a single undo reverts it.
+        """
+        with self._action("spoiler"), self.batch():
+            for location, character_name in placements.items():
+                self.register_spoiler_location(location, character_name)
+
+    # [Removed process_spoiler_log, update_capsule_sprites]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full tracker state as a JSON-ready dict (copies, safe to hand to another thread)."""
+        return {
+            "inventory_overrides": dict(self._manual_inventory_overrides),
+            "location_overrides": dict(self._manual_location_overrides),
+            "character_locations": dict(self._character_locations),
+            # Full State
+            "inventory": dict(self._inventory),
+            "locations": dict(self._locations),
+            "characters": dict(self._characters),
+            "active_party": list(self._active_party),
+            "obtained_capsules": list(self._obtained_capsules),
+            "shop_items": self.shop_items,
+            "hints": self.hints_text
+        }
+
+    def encode_snapshot(self, snapshot: Dict[str, Any], filepath=None) -> bytes:
+        """
+        File contents for a snapshot() dict: the compact binary format for
+        *.l2s paths, JSON otherwise. Thread-safe (used by AutoSaver).
+        """
+        if filepath is not None and Path(filepath).suffix.lower() == BINARY_SAVE_SUFFIX:
+            return self.save_codec.encode(snapshot)
+        return json.dumps(snapshot, indent=4).encode('utf-8')
+
+    def decode_snapshot(self, data: bytes) -> Dict[str, Any]:
+        """Parses either save format (detected by content, not extension)."""
+        if is_binary_save(data):
+            return self.save_codec.decode(data)
+        return json.loads(data.decode('utf-8'))
+
+    def save_state(self, filepath: str):
+        """Serialize current overrides AND progress (JSON, or binary for *.l2s; atomically replaces the file)."""
+        atomic_write(filepath, self.encode_snapshot(self.snapshot(), filepath))
+        logging.info(f"State saved to {filepath}")
+
+    def load_state(self, filepath: str):
+        """Load state from a JSON or binary save and apply."""
+        with open(filepath, 'rb') as f:
+            data = self.decode_snapshot(f.read())
+        self.restore(data)
+        logging.info(f"State loaded from {filepath}")
+
+    def restore(self, data: Dict[str, Any]):
+        """Replaces the whole state with a snapshot() dict (one batch)."""
+        with self.batch():
+            self._restore_state(data)
+        self._checkpoint()
+
+    def _restore_state(self, data: Dict[str, Any]):
+        self._bump_version()
+        self._manual_inventory_overrides = dict(data.get("inventory_overrides", {}))
+        self._manual_location_overrides = dict(data.get("location_overrides", {}))
+    
+        # Restore State
+        self._inventory = dict(data.get("inventory", {}))
+        self._locations = dict(data.get("locations", {}))
+        self._characters = dict(data.get("characters", {}))
+        self._set_character_locations(data.get("character_locations", {}))
+        self._rebuild_effective_state()
+    
+        self._shop_items.load(data.get("shop_items", []))
+        self._emit("shop_items_changed", self.shop_items)
+    
+        self.hints_text = data.get("hints", "")
+        self._emit("hints_changed", self.hints_text)
+    
+        self._active_party = set(data.get("active_party", []))
+        self._obtained_capsules = set(data.get("obtained_capsules", []))
+    
+        # Re-emit changes (inventory is diffed by the batch)
+        for loc, state in self._locations.items():
+            self._emit("location_changed", loc, state)
+    
+        # We need to re-emit character assignments essentially to place sprites
+        for loc, char in self._character_locations.items():
+             self._emit("character_assigned", loc, char)
+        
+        # Also emit character toggles
+        for char, obtained in self._characters.items():
+            self._emit("character_changed", char, obtained)
@@ -25,13 +25,18 @@ class ToolsWidget(QWidget):
     # ... connect_signals ...
     def connect_signals(self, state_manager):
         self.grid.item_clicked.connect(state_manager.toggle_manual_inventory)
-        state_manager.inventory_changed.connect(self._on_inventory_changed)
+        state_manager.inventory_delta.connect(self._on_inventory_delta)
+        state_manager.batch_committed.connect(self._on_batch_committed)
 
-    def _on_inventory_changed(self, inventory):
-        if hasattr(self.grid, 'icons'):
-            for name in self.grid.icons.keys():
-                is_obtained = inventory.get(name, False)
+    def _on_inventory_delta(self, changed, version):
+        # Only touch the icons this grid displays
+        icons = getattr(self.grid, 'icons', {})
+        for name, is_obtained in changed.items():
+            if name in icons:
                 self.grid.set_item_state(name, is_obtained)
+
+    def _on_batch_committed(self, changes):
+        self._on_inventory_delta(changes["inventory"], changes["version"])
             
     def set_content_font_size(self, size):
         self.grid.set_content_font_size(size)
@@ -68,14 +73,19 @@ class ScenarioWidget(QWidget):
 
     def connect_signals(self, state_manager):
         self.grid.item_clicked.connect(state_manager.toggle_manual_inventory)
-        state_manager.inventory_changed.connect(self._on_inventory_changed)
+        state_manager.inventory_delta.connect(self._on_inventory_delta)
+        state_manager.batch_committed.connect(self._on_batch_committed)
 
-    def _on_inventory_changed(self, inventory):
-        if hasattr(self.grid, 'icons'):
-            for name in self.grid.icons.keys():
-                is_obtained = inventory.get(name, False)
+    def _on_inventory_delta(self, changed, version):
+        # Only touch the icons this grid displays
+        icons = getattr(self.grid, 'icons', {})
+        for name, is_obtained in changed.items():
+            if name in icons:
                 self.grid.set_item_state(name, is_obtained)
 
+    def _on_batch_committed(self, changes):
+        self._on_inventory_delta(changes["inventory"], changes["version"])
+
     def set_content_font_size(self, size):
         self.grid.set_content_font_size(size)
 
@@ -1,5 +1,6 @@
-from PyQt6.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QLabel, QScrollArea, QFrame, QMenu, QToolBar, QMessageBox, QFileDialog, QInputDialog
+from PyQt6.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QLabel, QScrollArea, QFrame, QMenu, QToolBar, QMessageBox, QFileDialog, QInputDialog, QSlider
 from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize, QSettings
+from PyQt6.QtGui import QAction, QKeySequence
 import logging
 
 from lufia_tracker.core.state_manager import StateManager
@@ -15,6 +16,7 @@ from .widgets.items_widget import ItemsWidget
 from .widgets.characters_widget import CharactersWidget
 from .widgets.maiden_widget import MaidenWidget
 from .widgets.hint_widget import HintWidget
+from .widgets.next_item_widget import NextItemWidget
 from .dialogs.item_search_dialog import ItemSearchDialog
 from PyQt6.QtWidgets import QMenu
 
@@ -61,6 +63,18 @@ class MainWindow(QMainWindow):
         self.menu_ribbon.reset_requested.connect(self._handle_reset)
         self.menu_ribbon.save_requested.connect(self._handle_save)
         self.menu_ribbon.load_requested.connect(self._handle_load)
+        self.menu_ribbon.replay_requested.connect(self._handle_replay)
+
+        # Undo/Redo (window-wide shortcuts)
+        self.act_undo = QAction("Undo", self)
+        self.act_undo.setShortcut(QKeySequence.StandardKey.Undo)
+        self.act_undo.triggered.connect(self.state_manager.undo)
+        self.addAction(self.act_undo)
+
+        self.act_redo = QAction("Redo", self)
+        self.act_redo.setShortcut(QKeySequence.StandardKey.Redo)
+        self.act_redo.triggered.connect(self.state_manager.redo)
+        self.addAction(self.act_redo)
 
     def _toggle_font_controls(self, visible):
         # Iterate over all dock widgets
@@ -96,7 +110,7 @@ class MainWindow(QMainWindow):
 
     def _handle_save(self):
         from PyQt6.QtWidgets import QFileDialog
-        path, _ = QFileDialog.getSaveFileName(self, "Save Tracker State", "", "JSON Files (*.json)")
+        path, _ = QFileDialog.getSaveFileName(self, "Save Tracker State", "", "JSON Files (*.json);;Compact Save (*.l2s)")
         if path:
             try:
                 self.state_manager.save_state(path)
@@ -105,14 +119,18 @@ class MainWindow(QMainWindow):
 
     def _handle_load(self):
         from PyQt6.QtWidgets import QFileDialog
-        path, _ = QFileDialog.getOpenFileName(self, "Load Tracker State", "", "JSON Files (*.json)")
+        path, _ = QFileDialog.getOpenFileName(self, "Load Tracker State", "", "Tracker Saves (*.json *.l2s)")
         if path:
             try:
                 self.state_manager.load_state(path)
-                self._refresh_all()
             except Exception as e:
                 logging.error(f"Load Failed: {e}")
 
+    def _handle_replay(self):
+        """Opens a replay window over this session's history (the live state is untouched)."""
+        self._replay_window = ReplayWindow(self.state_manager.replay_view(), self.data_loader, self.logic_engine)
+        self._replay_window.show()
+
     def _on_player_shape_requested(self, shape):
         if shape == "sprite":
              self._update_player_sprite_if_active()
@@ -150,6 +168,15 @@ class MainWindow(QMainWindow):
         self.hints_dock.setMaximumWidth(350) # Prevent taking too much horizontal space
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.hints_dock)
         
+        # --- Next Item Dock (Left, below Hints) ---
+        self.next_item_dock = PersistentDockWidget("Next Item", self)
+        self.next_item_dock.setObjectName("next_item_dock")
+        self.next_item_widget = NextItemWidget()
+        self.next_item_dock.setWidget(self.next_item_widget)
+        self.next_item_dock.setMinimumSize(100, 80)
+        self.next_item_dock.setMaximumWidth(350)
+        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.next_item_dock)
+        
         # --- Characters Dock (Top Right for T-Shape) ---
         self.chars_dock = PersistentDockWidget("Characters", self)
         self.chars_dock.setObjectName("chars_dock")
@@ -194,6 +221,7 @@ class MainWindow(QMainWindow):
         
         # 1. Left Area: Items / Hints
         self.splitDockWidget(self.items_dock, self.hints_dock, Qt.Orientation.Vertical)
+        self.splitDockWidget(self.hints_dock, self.next_item_dock, Qt.Orientation.Vertical)
         
         # 2. Right Area T-Shape:
         # Chars occupies the Top sector.
@@ -227,7 +255,7 @@ class MainWindow(QMainWindow):
         
         # --- Fluidity Policies ---
         from PyQt6.QtWidgets import QSizePolicy
-        for dock in [self.items_dock, self.hints_dock, self.chars_dock, self.tools_dock, 
+        for dock in [self.items_dock, self.hints_dock, self.next_item_dock, self.chars_dock, self.tools_dock, 
                      self.maidens_dock, self.scenario_dock, self.map_dock]:
              policy = QSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
              policy.setVerticalStretch(1)
@@ -248,8 +276,8 @@ class MainWindow(QMainWindow):
         self.tools_widget.connect_signals(self.state_manager)
         self.scenario_widget.connect_signals(self.state_manager)
         
-        # Logic Loop Trigger (Inventory Change -> Refresh All)
-        self.state_manager.inventory_changed.connect(lambda _: self._refresh_all())
+        # Logic Loop Trigger (Inventory Change -> Refresh affected dots)
+        self.state_manager.inventory_delta.connect(self._on_inventory_delta)
         
         # UI Signals -> State Manager Overrides
         self.map_widget.location_clicked.connect(self._handle_location_click)
@@ -266,6 +294,9 @@ class MainWindow(QMainWindow):
         # Reset Signal
         self.state_manager.reset_occurred.connect(self._on_reset_occurred)
         
+        # Transactions (load / reset) arrive as one coalesced change set
+        self.state_manager.batch_committed.connect(self._on_batch_committed)
+        
         # New Signals (v1.4 Refinements)
         self.menu_ribbon.sprite_visibility_toggled.connect(self.map_widget.set_sprites_visibility)
         self.state_manager.shop_items_changed.connect(lambda _: self.items_widget.refresh_from_state())
@@ -285,17 +316,40 @@ class MainWindow(QMainWindow):
         if self.map_widget:
             self.map_widget.reset()
             
-        # Clear Items/Spells
+        # Clear Items/Spells (state already cleared)
         if self.items_widget:
-            self.items_widget.clear_all()
+            self.items_widget.refresh_from_state()
             
         # Refresh Logic (Just in case)
         self._refresh_all()
         
+    def _on_batch_committed(self, changes):
+        """Applies a coalesced StateManager.batch() change set in one UI pass."""
+        # Same order as the individual signals: position first, reset hides the marker
+        if changes["player_position"] is not None:
+            self.map_widget.update_player_position(*changes["player_position"])
+        if changes["reset"]:
+            if self.hint_widget: self.hint_widget.set_hints("")
+            self.map_widget.reset()
+        for location, name in changes["assignments"].items():
+            if name:
+                self._on_character_assigned(location, name)
+            else:
+                self.map_widget.remove_character_sprite(location)
+        if changes["shop_items"] is not None:
+            self.items_widget.refresh_from_state()
+        if changes["hints"] is not None and self.hint_widget:
+            self.hint_widget.set_hints(changes["hints"])
+        # Location states and inventory: one full logic/dot refresh
+        self._refresh_all()
+
     def _refresh_all(self):
         """Re-runs logic engine and pushes updates."""
-        # Get Accessibility Map
-        accessibility = self.logic_engine.calculate_accessibility(self.state_manager.inventory)
+        # Get Accessibility Map (also resets the engine's incremental baseline)
+        inventory = self.state_manager.inventory
+        accessibility = self.state_manager.accessibility.reset(inventory)
+        tooltips = self.logic_engine.get_requirement_tooltips(inventory)
+        self.next_item_widget.set_recommendations(self.state_manager.accessibility.rank_next_items())
         
         # Current Location States (Overrides + Cleared)
         current_loc_states = self.state_manager.locations
@@ -303,30 +357,55 @@ class MainWindow(QMainWindow):
         # Update every dot on the map
         locations_data = self.data_loader.get_locations() # {name: coords}
         for name in locations_data.keys():
-            is_accessible = accessibility.get(name, False)
-            
-            # Check if this location is "cleared" in the state
-            is_cleared = (current_loc_states.get(name) == "cleared")
-            
-            # Determine color
-            final_color = self.logic_engine.determine_color(name, is_accessible, is_cleared)
-            
-            # Use StateManager's effective state if present
-            effective_state = current_loc_states.get(name)
-            if effective_state:
-                final_color = effective_state
-            
-            # Tooltip Info
-            tooltip_text = name
-            if not is_accessible and final_color == "not_accessible":
-                # Get missing info
-                reqs = self.logic_engine.get_missing_requirements(name, self.state_manager.inventory)
-                if reqs:
-                    req_str = " OR ".join(reqs)
-                    tooltip_text += f"\nRequires: {req_str}"
+            self._update_location_dot(name, accessibility.get(name, False), current_loc_states, tooltips)
+
+    def _on_inventory_delta(self, changed, version):
+        """Repaints only the locations depending on the toggled items."""
+        # The state has already updated its tracker (only the affected locations)
+        tracker = self.state_manager.accessibility
+        # Ranking can change even when no dot flips (kept incrementally by the tracker)
+        self.next_item_widget.set_recommendations(tracker.rank_next_items())
+        
+        # "Still missing" tooltips change for every dependent location, not just flipped ones
+        affected = set()
+        for item in changed:
+            affected.update(self.logic_engine.get_dependent_locations(item))
+        if not affected:
+            return
             
-            self.map_widget.update_dot_color(name, final_color)
-            self.map_widget.update_dot_tooltip(name, tooltip_text)
+        current_loc_states = self.state_manager.locations
+        locations_data = self.data_loader.get_locations()
+        affected &= locations_data.keys()
+        # Per-location answers, cached by the engine until one of its items changes
+        tooltips = {
+            name: " OR ".join(self.logic_engine.get_missing_requirements(name, tracker.mask)) for name in affected
+        }
+        for name in affected:
+            self._update_location_dot(name, tracker.is_accessible(name), current_loc_states, tooltips)
+
+    def _update_location_dot(self, name, is_accessible, current_loc_states, tooltips):
+        """Pushes color and tooltip for a single location dot."""
+        # Check if this location is "cleared" in the state
+        is_cleared = (current_loc_states.get(name) == "cleared")
+        
+        # Determine color
+        final_color = self.logic_engine.determine_color(name, is_accessible, is_cleared)
+        
+        # Use StateManager's effective state if present
+        effective_state = current_loc_states.get(name)
+        if effective_state:
+            final_color = effective_state
+        
+        # Tooltip Info
+        tooltip_text = name
+        if not is_accessible and final_color == "not_accessible":
+            # Missing info (cached per inventory by the logic engine)
+            req_str = tooltips.get(name)
+            if req_str:
+                tooltip_text += f"\nMissing: {req_str}"
+        
+        self.map_widget.update_dot_color(name, final_color)
+        self.map_widget.update_dot_tooltip(name, tooltip_text)
 
     def _handle_location_click(self, name):
         """User clicked a dot: Cycle the state (Manual Override)."""
@@ -370,9 +449,6 @@ class MainWindow(QMainWindow):
         
         # Also exclude characters that are already obtained/assigned?
         # obtained_map = self.state_manager.obtained_characters 
-        
-        # Get assigned chars
-        assigned_chars = set(self.state_manager._character_locations.values())
 
         for char in sorted_names:
             if char in ["Claire", "Lisa", "Marie"]: continue
@@ -381,7 +457,7 @@ class MainWindow(QMainWindow):
             # (Matches v1.3 "User can assign them map locations")
                 
             # If already assigned to ANY location, skip (must remove first to re-assign)
-            if char in assigned_chars:
+            if self.state_manager.is_character_assigned(char):
                 continue
                 
             action = menu.addAction(char)
@@ -479,6 +555,47 @@ class MainWindow(QMainWindow):
             self.map_widget.set_player_scale(p_scale)
 
 
+class ReplayWindow(MainWindow):
+    """
+    A MainWindow bound to a replay view (TrackerState.replay_view) with a
+    scrub slider over the recorded events. Window settings are not saved.
+    """
+    def __init__(self, replay_view, data_loader, logic_engine):
+        super().__init__(replay_view, data_loader, logic_engine)
+        self.setWindowTitle("Lufia 2 Manual Tracker - Replay")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.timeline = replay_view.replay_timeline
+
+        self.scrub_toolbar = QToolBar("Replay")
+        self.scrub_toolbar.setMovable(False)
+        self.scrub_slider = QSlider(Qt.Orientation.Horizontal)
+        self.scrub_label = QLabel()
+        self.scrub_toolbar.addWidget(self.scrub_slider)
+        self.scrub_toolbar.addWidget(self.scrub_label)
+        self.addToolBar(Qt.ToolBarArea.BottomToolBarArea, self.scrub_toolbar)
+
+        # The live session keeps recording: extend the range on every grab
+        self.scrub_slider.sliderPressed.connect(self._update_scrub_range)
+        self.scrub_slider.valueChanged.connect(self._on_scrub)
+        self._update_scrub_range()
+        self.scrub_slider.setValue(self.scrub_slider.maximum())
+        self._on_scrub(self.scrub_slider.value())
+
+    def _update_scrub_range(self):
+        self.scrub_slider.setMaximum(len(self.timeline))
+
+    def _on_scrub(self, position):
+        t = self.timeline.time_at(position)
+        if t is None:
+            return
+        self.state_manager.seek(t)
+        elapsed = int(t - self.timeline.start_time)
+        self.scrub_label.setText(f" {elapsed // 60:02d}:{elapsed % 60:02d} ({position}/{len(self.timeline)})")
+
+    def closeEvent(self, event):
+        QMainWindow.closeEvent(self, event)
+
+
 class PersistentDockWidget(QDockWidget):
     """
     A DockWidget that doesn't delete itself on close, 
@@ -12,6 +12,7 @@ class MenuRibbon(QWidget):
     reset_requested = pyqtSignal()
     save_requested = pyqtSignal()
     load_requested = pyqtSignal()
+    replay_requested = pyqtSignal()
     
     # Customization Signals
     player_color_requested = pyqtSignal()
@@ -65,6 +66,7 @@ class MenuRibbon(QWidget):
         options_menu.addAction("Reset", self.reset_requested.emit)
         options_menu.addAction("Save", self.save_requested.emit)
         options_menu.addAction("Load", self.load_requested.emit)
+        options_menu.addAction("Replay", self.replay_requested.emit)
         
         # --- Custom (Middle) ---
         custom_menu = self.menu_bar.addMenu("Edit")
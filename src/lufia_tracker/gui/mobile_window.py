@@ -3,7 +3,7 @@ from PyQt6.QtWidgets import (
     QToolBar, QMessageBox, QFrame, QLabel, QSizePolicy
 )
 from PyQt6.QtCore import Qt, QSize, QSettings
-from PyQt6.QtGui import QAction, QIcon, QFont
+from PyQt6.QtGui import QAction, QIcon, QFont, QKeySequence
 
 import logging
 from lufia_tracker.core.layout_manager import LayoutManager
@@ -15,6 +15,7 @@ from .widgets.maiden_widget import MaidenWidget
 from .widgets.hint_widget import HintWidget
 from .widgets.hint_widget import HintWidget
 from .widgets.item_search_widget import ItemSearchWidget
+from .widgets.next_item_widget import NextItemWidget
 from .dialogs.item_search_dialog import ItemSearchDialog
 from lufia_tracker.utils.constants import STATE_ORDER
 
@@ -68,6 +69,16 @@ class MobileMainWindow(QMainWindow):
         self.act_load = QAction("Load", self)
         self.act_load.triggered.connect(self._handle_load)
         self.toolbar.addAction(self.act_load)
+
+        self.act_undo = QAction("Undo", self)
+        self.act_undo.setShortcut(QKeySequence.StandardKey.Undo)
+        self.act_undo.triggered.connect(self.state_manager.undo)
+        self.toolbar.addAction(self.act_undo)
+
+        self.act_redo = QAction("Redo", self)
+        self.act_redo.setShortcut(QKeySequence.StandardKey.Redo)
+        self.act_redo.triggered.connect(self.state_manager.redo)
+        self.toolbar.addAction(self.act_redo)
         
         # 3. Tab Widget (The Core Navigation)
         self.tabs = QTabWidget()
@@ -120,6 +131,12 @@ class MobileMainWindow(QMainWindow):
         self.scenario_widget = ScenarioWidget(self.data_loader, self.layout_manager)
         inv_layout.addWidget(self.scenario_widget)
         
+        self._add_section_header(inv_layout, "Best Next Item")
+        self.next_item_widget = NextItemWidget(max_entries=5)
+        self.next_item_widget.label.hide() # Section header already says it
+        self.next_item_widget.setMinimumHeight(120)
+        inv_layout.addWidget(self.next_item_widget)
+        
         self._add_section_header(inv_layout, "Items / Spells")
         self.items_widget = ItemsWidget(self.state_manager)
         self.items_widget.setMinimumHeight(200) 
@@ -176,7 +193,7 @@ class MobileMainWindow(QMainWindow):
         self.tools_widget.connect_signals(self.state_manager)
         self.scenario_widget.connect_signals(self.state_manager)
         
-        self.state_manager.inventory_changed.connect(lambda _: self._refresh_all())
+        self.state_manager.inventory_delta.connect(self._on_inventory_delta)
         
         # UI -> State
         self.map_widget.location_clicked.connect(self._handle_location_click)
@@ -190,6 +207,7 @@ class MobileMainWindow(QMainWindow):
         self.map_widget.sprite_removed.connect(self.state_manager.remove_character_assignment)
         
         self.state_manager.reset_occurred.connect(self._on_reset_occurred)
+        self.state_manager.batch_committed.connect(self._on_batch_committed)
         self.state_manager.shop_items_changed.connect(lambda _: self.items_widget.refresh_from_state())
         
         # Items Widget -> Switch to Search Tab
@@ -223,37 +241,73 @@ class MobileMainWindow(QMainWindow):
         self.characters_widget.set_edit_mode(enabled)
         self.maiden_widget.set_edit_mode(enabled)
     
+    def _on_batch_committed(self, changes):
+        """Applies a coalesced StateManager.batch() change set in one UI pass."""
+        # Same order as the individual signals: position first, reset hides the marker
+        if changes["player_position"] is not None:
+            self.map_widget.update_player_position(*changes["player_position"])
+        if changes["reset"]:
+            if self.hint_widget: self.hint_widget.set_hints("")
+            self.map_widget.reset()
+        for location, name in changes["assignments"].items():
+            if name:
+                self._on_character_assigned(location, name)
+            else:
+                self.map_widget.remove_character_sprite(location)
+        if changes["shop_items"] is not None:
+            self.items_widget.refresh_from_state()
+        if changes["hints"] is not None and self.hint_widget:
+            self.hint_widget.set_hints(changes["hints"])
+        # Location states and inventory: one full logic/dot refresh
+        self._refresh_all()
+
     def _refresh_all(self):
         # Copied logic to update map colors
-        accessibility = self.logic_engine.calculate_accessibility(self.state_manager.inventory)
+        inventory = self.state_manager.inventory
+        accessibility = self.state_manager.accessibility.reset(inventory)
+        self.next_item_widget.set_recommendations(self.state_manager.accessibility.rank_next_items())
         current_loc_states = self.state_manager.locations
         locations_data = self.data_loader.get_locations()
         
         for name in locations_data.keys():
-            is_accessible = accessibility.get(name, False)
-            is_cleared = (current_loc_states.get(name) == "cleared")
-            
-            final_color = self.logic_engine.determine_color(name, is_accessible, is_cleared)
-            
-            effective_state = current_loc_states.get(name)
-            if effective_state:
-                final_color = effective_state
-            
-            # TODO: Improve Tooltip handling for Mobile (Tap to show info?)
-            # self.map_widget.update_dot_tooltip(name, ...)
-            
-            self.map_widget.update_dot_color(name, final_color)
+            self._update_location_dot(name, accessibility.get(name, False), current_loc_states)
+
+    def _on_inventory_delta(self, changed, version):
+        # Only repaint dots depending on the toggled items (the state has
+        # already updated its tracker)
+        tracker = self.state_manager.accessibility
+        self.next_item_widget.set_recommendations(tracker.rank_next_items())
+        affected = set()
+        for item in changed:
+            affected.update(self.logic_engine.get_dependent_locations(item))
+        current_loc_states = self.state_manager.locations
+        locations_data = self.data_loader.get_locations()
+        for name in affected & locations_data.keys():
+            self._update_location_dot(name, tracker.is_accessible(name), current_loc_states)
+
+    def _update_location_dot(self, name, is_accessible, current_loc_states):
+        is_cleared = (current_loc_states.get(name) == "cleared")
+        
+        final_color = self.logic_engine.determine_color(name, is_accessible, is_cleared)
+        
+        effective_state = current_loc_states.get(name)
+        if effective_state:
+            final_color = effective_state
+        
+        # TODO: Improve Tooltip handling for Mobile (Tap to show info?)
+        # self.map_widget.update_dot_tooltip(name, ...)
+        
+        self.map_widget.update_dot_color(name, final_color)
 
     def _handle_location_click(self, name):
         # Update Info Label Logic
-        accessibility = self.logic_engine.calculate_accessibility(self.state_manager.inventory)
-        is_accessible = accessibility.get(name, False)
+        is_accessible = self.state_manager.accessibility.is_accessible(name)
         
         info_text = name
         if not is_accessible:
-             reqs = self.logic_engine.get_missing_requirements(name, self.state_manager.inventory)
-             if reqs:
-                 info_text += f"\nNeed: {' OR '.join(reqs)}"
+             req_str = " OR ".join(self.logic_engine.get_missing_requirements(name, self.state_manager.accessibility.mask))
+             if req_str:
+                 info_text += f"\nNeed: {req_str}"
         
         self.lbl_info.setText(info_text)
         
@@ -293,11 +347,10 @@ class MobileMainWindow(QMainWindow):
         
         chars_data = self.data_loader.load_json("characters.json")
         sorted_names = sorted(chars_data.keys())
-        assigned_chars = set(self.state_manager._character_locations.values())
 
         for char in sorted_names:
             if char in ["Claire", "Lisa", "Marie"]: continue
-            if char in assigned_chars: continue
+            if self.state_manager.is_character_assigned(char): continue
                 
             action = menu.addAction(char)
             action.triggered.connect(lambda c, ch=char: self.state_manager.assign_character_to_location(location_name, ch))
@@ -331,20 +384,19 @@ class MobileMainWindow(QMainWindow):
     def _on_reset_occurred(self):
         if self.hint_widget: self.hint_widget.set_hints("")
         if self.map_widget: self.map_widget.reset()
-        if self.items_widget: self.items_widget.clear_all()
+        if self.items_widget: self.items_widget.refresh_from_state()
         self._refresh_all()
 
     def _handle_save(self):
         from PyQt6.QtWidgets import QFileDialog
-        path, _ = QFileDialog.getSaveFileName(self, "Save", "", "JSON (*.json)")
+        path, _ = QFileDialog.getSaveFileName(self, "Save", "", "JSON (*.json);;Compact (*.l2s)")
         if path: self.state_manager.save_state(path)
 
     def _handle_load(self):
         from PyQt6.QtWidgets import QFileDialog
-        path, _ = QFileDialog.getOpenFileName(self, "Load", "", "JSON (*.json)")
+        path, _ = QFileDialog.getOpenFileName(self, "Load", "", "Saves (*.json *.l2s)")
         if path:
             self.state_manager.load_state(path)
-            self._refresh_all()
             
     def _load_settings(self):
         # Persistence less critical for prototype, but basic load OK
@@ -249,10 +249,16 @@ class CharactersCanvas(QWidget):
         self.state_manager.character_changed.connect(self._on_character_changed)
         self.state_manager.character_assigned.connect(self._on_assignment_changed)
         self.state_manager.character_unassigned.connect(self._on_assignment_changed)
+        self.state_manager.batch_committed.connect(self._on_batch_committed)
 
     def _on_character_changed(self, name, obtained):
         self.refresh_state()
 
+    def _on_batch_committed(self, changes):
+        # One rebuild for the whole transaction
+        if changes["characters"] or changes["assignments"] or changes["reset"]:
+            self.refresh_state()
+
     def _on_assignment_changed(self, location, name):
         self.refresh_state()
         
@@ -311,11 +317,6 @@ class CharactersCanvas(QWidget):
         obtained_capsules = getattr(self.state_manager, '_obtained_capsules', set())
         obtained_chars = self.state_manager.obtained_characters
         
-        # Get reverse lookup for locations: Character -> Location
-        char_locations = {} 
-        for loc, char in self.state_manager._character_locations.items():
-            char_locations[char] = loc
-            
         chars_data = self.data_loader.load_json("characters.json")
         
         for name, cell in self.cells.items():
@@ -325,7 +326,7 @@ class CharactersCanvas(QWidget):
             is_active_human = name in active_party
             is_active_capsule = name in obtained_capsules
             is_obtained = obtained_chars.get(name, False)
-            location = char_locations.get(name)
+            location = self.state_manager.get_character_location(name)
             
             # --- Visual Logic ---
             # 1. Active Human or Capsule -> Full Opacity
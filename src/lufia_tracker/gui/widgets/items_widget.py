@@ -65,9 +65,8 @@ class ItemsWidget(QWidget):
         super().__init__(parent)
         self.state_manager = state_manager
         
-        # Data storage
-        # entry = {'location': str, 'name': str, 'category': str}
-        self.entries = [] 
+        # Displayed rows in display order: (location, name) -> AddedItemEntry
+        self._rows = {}
         
         self.init_ui()
         self.connect_signals()
@@ -199,12 +198,11 @@ class ItemsWidget(QWidget):
         """)
 
     def connect_signals(self):
-        # We need a signal from StateManager when an item is added via search
-        # Currently StateManager treats inventory as a dict {name: bool}.
-        # But this "Shop Items" list works differently?
         # In v1.3 "Item/Spells" are added to a text list.
-        # This list IS the "inventory" for shop items.
-        pass
+        # StateManager owns that list; single adds/removes update one row.
+        # Bulk changes (clear / load) arrive as shop_items_changed -> refresh_from_state.
+        self.state_manager.shop_item_added.connect(self._on_shop_item_added)
+        self.state_manager.shop_item_removed.connect(self._on_shop_item_removed)
 
     def add_item(self, location, item_name):
         """Adds a new item entry."""
@@ -213,38 +211,56 @@ class ItemsWidget(QWidget):
         # self.refresh_list() # Signal will trigger refresh
         
     def refresh_from_state(self):
-        self.entries = self.state_manager.shop_items
-        self.refresh_list()
+        self.refresh_list(self.state_manager.shop_items)
         
-    def refresh_list(self):
+    def refresh_list(self, entries):
         # Clear layout
         while self.list_layout.count():
             child = self.list_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
+        self._rows.clear()
                 
         # Rebuild
+        for entry in entries:
+            self._on_shop_item_added(entry['location'], entry['name'])
+
+    def _on_shop_item_added(self, location, item_name):
+        key = (location, item_name)
+        if key in self._rows:
+            return
         font_size = getattr(self, 'current_font_size', 11)
-        for entry in self.entries:
-            row = AddedItemEntry(entry['location'], entry['name'], font_size=font_size)
-            row.remove_requested.connect(self.remove_item)
-            self.list_layout.addWidget(row)
+        row = AddedItemEntry(location, item_name, font_size=font_size)
+        row.remove_requested.connect(self.remove_item)
+        self.list_layout.addWidget(row)
+        self._rows[key] = row
+
+    def _on_shop_item_removed(self, location, item_name):
+        row = self._rows.pop((location, item_name), None)
+        if row:
+            self.list_layout.removeWidget(row)
+            row.deleteLater()
             
     def remove_item(self, location, item_name):
-        self.entries = [e for e in self.entries if not (e['name'] == item_name and e['location'] == location)]
-        self.refresh_list()
+        self.state_manager.unregister_shop_item(location, item_name)
+        
+    def _reorder_rows(self, key):
+        # Re-adds the existing row widgets in the new order (no recreation)
+        ordered = sorted(self._rows.items(), key=lambda kv: key(kv[0]))
+        for _, row in ordered:
+            self.list_layout.removeWidget(row)
+        for _, row in ordered:
+            self.list_layout.addWidget(row)
+        self._rows = dict(ordered)
         
     def sort_by_location(self):
-        self.entries.sort(key=lambda x: x['location'])
-        self.refresh_list()
+        self._reorder_rows(lambda k: k[0])
         
     def sort_by_item(self):
-        self.entries.sort(key=lambda x: x['name'])
-        self.refresh_list()
+        self._reorder_rows(lambda k: k[1])
         
     def clear_all(self):
-        self.entries.clear()
-        self.refresh_list()
+        self.state_manager.clear_shop_items()
 
     def set_content_font_size(self, size):
         self.current_font_size = size
@@ -253,17 +269,3 @@ class ItemsWidget(QWidget):
             widget = self.list_layout.itemAt(i).widget()
             if isinstance(widget, AddedItemEntry):
                 widget.update_font_size(size)
-                
-    def refresh_list(self):
-        # Clear layout
-        while self.list_layout.count():
-            child = self.list_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-                
-        # Rebuild
-        font_size = getattr(self, 'current_font_size', 11)
-        for entry in self.entries:
-            row = AddedItemEntry(entry['location'], entry['name'], font_size=font_size)
-            row.remove_requested.connect(self.remove_item)
-            self.list_layout.addWidget(row)
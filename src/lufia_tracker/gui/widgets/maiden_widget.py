@@ -114,11 +114,19 @@ class MaidenWidget(QWidget):
     def connect_signals(self, state_manager=None):
         # Allow passing state_manager or using self.state_manager
         sm = state_manager if state_manager else self.state_manager
-        sm.inventory_changed.connect(self.refresh_state)
+        sm.inventory_delta.connect(self._on_inventory_delta)
+        sm.batch_committed.connect(lambda changes: self._on_inventory_delta(changes["inventory"], changes["version"]))
         
     def toggle_maiden(self, name):
         self.state_manager.toggle_manual_inventory(name)
         
+    def _on_inventory_delta(self, changed, version):
+        # Only maidens this widget displays
+        for name, is_active in changed.items():
+            lbl = self.labels.get(name)
+            if lbl is not None:
+                self.update_icon(lbl, name, is_active)
+
     def refresh_state(self, inventory):
         for name, lbl in self.labels.items():
             is_active = inventory.get(name, False)
@@ -0,0 +1,46 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
+from PyQt6.QtCore import Qt
+
+class NextItemWidget(QWidget):
+    """
+    Shows the "best next item" ranking:
+    unobtained tools/keys ordered by how many new locations each would open.
+    """
+    def __init__(self, max_entries=8, parent=None):
+        super().__init__(parent)
+        self.max_entries = max_entries
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+        self.label = QLabel("Best next item")
+        layout.addWidget(self.label)
+
+        self.list_widget = QListWidget()
+        self.list_widget.setSelectionMode(QListWidget.SelectionMode.NoSelection)
+        layout.addWidget(self.list_widget)
+
+    def set_content_font_size(self, size):
+        font = self.list_widget.font()
+        font.setPixelSize(size)
+        self.list_widget.setFont(font)
+
+    def set_recommendations(self, recommendations):
+        """recommendations: list of LogicEngine.ItemRecommendation, already ranked."""
+        self.list_widget.clear()
+
+        useful = [rec for rec in recommendations if rec.unlocks]
+        if not useful:
+            placeholder = QListWidgetItem("No single item opens a new location")
+            placeholder.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.list_widget.addItem(placeholder)
+            return
+
+        for rec in useful[:self.max_entries]:
+            count = len(rec.unlocks)
+            entry = QListWidgetItem(f"{rec.item}: +{count} location{'s' if count != 1 else ''}")
+            entry.setToolTip("\n".join(rec.unlocks))
+            self.list_widget.addItem(entry)
@@ -6,11 +6,16 @@ from pathlib import Path
 if getattr(sys, 'frozen', False):
     # PyInstaller creates a temp folder and stores path in _MEIPASS
     BASE_DIR = Path(sys._MEIPASS)
+    DATA_DIR = BASE_DIR / "src" / "data"
 else:
-    BASE_DIR = Path(__file__).resolve().parent.parent.parent
+    # Repository root (src/lufia_tracker/utils -> up three levels)
+    BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+    DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
-DATA_DIR = BASE_DIR / "src" / "data"
 IMAGES_DIR = BASE_DIR / "images"
+AUTOSAVE_FILENAME = "autosave.l2s" # In the per-user data dir (state_manager.user_data_dir), DATA_DIR may be read-only
+JOURNAL_FILENAME = "journal.jsonl" # Action journal, same directory
+BROADCAST_PORT = 8765 # Spectator stream (--broadcast), localhost only
 
 # Sacred Pixel Coordinates (Extracted from shared.py in v1.3)
 # DO NOT MODIFY THESE VALUES UNDER ANY CIRCUMSTANCES
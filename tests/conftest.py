@@ -0,0 +1,21 @@
+import pytest
+
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.logic_engine import LogicEngine
+from lufia_tracker.core.tracker_state import TrackerState
+
+
+@pytest.fixture(scope="session")
+def data_loader():
+    return DataLoader()
+
+
+@pytest.fixture(scope="session")
+def logic_engine(data_loader):
+    # Shared by every test; each TrackerState keeps its own AccessibilityTracker
+    return LogicEngine(data_loader)
+
+
+@pytest.fixture
+def state(logic_engine, data_loader):
+    return TrackerState(logic_engine, data_loader)
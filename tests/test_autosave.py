@@ -0,0 +1,123 @@
+import pytest
+
+from lufia_tracker.core import autosave
+from lufia_tracker.core.autosave import SaveScheduler, restore_autosave
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(autosave.time, "monotonic", clock)
+    return clock
+
+
+def events(saver):
+    log = []
+    saver.subscribe("saved", lambda version: log.append(("saved", version)))
+    saver.subscribe("save_failed", lambda error: log.append(("failed", error)))
+    return log
+
+
+def settle(saver):
+    """Waits for a started save (if any) and collects its result."""
+    saver._wait()
+
+
+def test_burst_becomes_one_save(state, tmp_path, clock):
+    path = tmp_path / "autosave.l2s"
+    saver = SaveScheduler(state, path, quiet_ms=1000, max_delay_ms=10000)
+    log = events(saver)
+    for _ in range(5):
+        state.toggle_manual_inventory("Bomb")
+        saver.poll()
+        clock.now += 0.5 # Never quiet for a full second
+    settle(saver)
+    assert log == [] and not path.exists()
+
+    clock.now += 1.0
+    saver.poll()
+    settle(saver)
+    assert log == [("saved", state.version)]
+    assert not saver.pending
+    assert state.decode_snapshot(path.read_bytes())["inventory_overrides"]["Bomb"] is True
+    saver.stop()
+
+
+def test_constant_changes_save_after_max_delay(state, tmp_path, clock):
+    saver = SaveScheduler(state, tmp_path / "autosave.l2s", quiet_ms=1000, max_delay_ms=3000)
+    log = events(saver)
+    for _ in range(14):
+        state.toggle_manual_inventory("Bomb")
+        saver.poll()
+        settle(saver)
+        clock.now += 0.5
+    assert len(log) == 2 # At 3s, then 3s after the next change (6.5s)
+    saver.stop()
+
+
+def test_failed_saves_back_off(state, tmp_path, clock):
+    directory = tmp_path / "missing"
+    saver = SaveScheduler(state, directory / "autosave.l2s", quiet_ms=0, retry_ms=1000, max_retry_ms=4000)
+    log = events(saver)
+    state.toggle_manual_inventory("Bomb")
+
+    saver.poll()
+    settle(saver)
+    retries = []
+    for _ in range(4):
+        failed_at = clock.now
+        while saver._future is None:
+            clock.now += 0.25
+            saver.poll()
+        retries.append(clock.now - failed_at)
+        settle(saver)
+    assert retries == [1.0, 2.0, 4.0, 4.0] # Doubling up to max_retry_ms
+    assert [kind for kind, _ in log] == ["failed"] * 5
+
+    directory.mkdir()
+    clock.now += 5
+    saver.poll()
+    settle(saver)
+    assert log[-1] == ("saved", state.version)
+    assert saver._failures == 0
+    saver.stop()
+
+
+def test_restore_autosave(state, tmp_path):
+    path = tmp_path / "autosave.l2s"
+    assert not restore_autosave(state, path)
+
+    state.toggle_manual_inventory("Bomb")
+    state.save_state(path)
+    state.reset_state()
+    assert restore_autosave(state, path)
+    assert state.inventory["Bomb"] is True
+
+    # An unreadable save is kept aside, not overwritten by the next autosave
+    path.write_bytes(b"garbage")
+    assert not restore_autosave(state, path)
+    assert not path.exists()
+    assert (tmp_path / "autosave.l2s.bad").read_bytes() == b"garbage"
+
+
+def test_qt_autosaver_emits_signals(state, tmp_path):
+    QtCore = pytest.importorskip("PyQt6.QtCore")
+    from lufia_tracker.core.state_manager import AutoSaver
+
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    saver = AutoSaver(state, tmp_path / "autosave.l2s", quiet_ms=0, poll_ms=10)
+    saved = []
+    saver.saved.connect(saved.append)
+    state.toggle_manual_inventory("Bomb")
+    saver.stop() # Flushes
+    assert saved == [state.version]
+    assert not saver._timer.isActive()
+    app.processEvents()
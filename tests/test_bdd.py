@@ -0,0 +1,103 @@
+import itertools
+
+import pytest
+
+from lufia_tracker.core.bdd import BDD, FALSE, TRUE
+from lufia_tracker.core.logic_engine import LogicEngine
+
+
+@pytest.fixture
+def bdd():
+    manager = BDD()
+    for name in "abcd":
+        manager.var(name)
+    return manager
+
+
+def models(bdd, f):
+    """Brute-force satisfying sets of f over all manager variables."""
+    names = bdd.var_names
+    found = set()
+    for values in itertools.product([False, True], repeat=len(names)):
+        assignment = dict(zip(names, values))
+        if bdd.restrict(f, assignment) == TRUE:
+            found.add(frozenset(name for name, value in assignment.items() if value))
+    return found
+
+
+def test_functions_are_canonical(bdd):
+    a, b, c = bdd.var("a"), bdd.var("b"), bdd.var("c")
+    left = bdd.apply_and(a, bdd.apply_or(b, c))
+    right = bdd.apply_or(bdd.apply_and(a, c), bdd.apply_and(b, a))
+    assert left == right
+    assert bdd.apply_and(a, bdd.apply_not(a)) == FALSE
+    assert bdd.apply_or(a, bdd.apply_not(a)) == TRUE
+    assert bdd.support(left) == ("a", "b", "c")
+
+
+def test_at_least_and_counting(bdd):
+    f = bdd.at_least(2, [bdd.var(name) for name in "abcd"])
+    assert models(bdd, f) == {frozenset(s) for k in (2, 3, 4) for s in itertools.combinations("abcd", k)}
+    assert bdd.sat_count(f) == 11
+    assert bdd.sat_count(bdd.var("a")) == 8
+    assert bdd.at_least(5, [bdd.var(name) for name in "abcd"]) == FALSE
+
+
+def test_minimal_models_and_dual(bdd):
+    # (a & b) | c
+    f = bdd.apply_or(bdd.apply_and(bdd.var("a"), bdd.var("b")), bdd.var("c"))
+    assert bdd.minimal_models(f) == [frozenset("c"), frozenset("ab")]
+    assert bdd.min_model(f) == frozenset("c")
+    assert bdd.min_model(FALSE) is None
+    # Minimal hitting sets: every clause loses an item
+    assert bdd.minimal_models(bdd.dual(f)) == [frozenset("ac"), frozenset("bc")]
+
+
+def test_restrict(bdd):
+    f = bdd.apply_or(bdd.apply_and(bdd.var("a"), bdd.var("b")), bdd.var("c"))
+    assert bdd.restrict(f, {"c": True}) == TRUE
+    assert bdd.restrict(f, {"c": False, "a": True}) == bdd.var("b")
+    assert bdd.restrict(f, {"unknown": True}) == f
+
+
+@pytest.fixture(scope="module")
+def rules(data_loader):
+    return LogicEngine(data_loader, locations_logic={
+        "Cave": {"access_rules": ["Bomb, Hook", "Fire"]},
+        "Tower": {"access_rules": ["Bomb,Hook,Hammer", "Bomb,Hook"]},
+        "Lake": {"access_rules": ["Hammer"]},
+        "Gate": {"access_rules": [{"count": 2, "of": ["Bomb", "Hook", "Fire"]}]},
+    })
+
+
+def test_engine_item_sets(rules):
+    assert rules.minimal_item_sets("Cave") == [frozenset({"Fire"}), frozenset({"Bomb", "Hook"})]
+    assert rules.minimum_item_set("Tower") == frozenset({"Bomb", "Hook"})
+    assert rules.minimum_item_set("Nowhere") is None
+    assert rules.blocking_item_sets("Cave") == [frozenset({"Bomb", "Fire"}), frozenset({"Fire", "Hook"})]
+    assert len(rules.minimal_item_sets("Gate")) == 3
+
+
+def test_count_opening_subsets(rules):
+    assert rules.count_opening_subsets("Lake", ["Hammer", "Bomb"]) == 2
+    assert rules.count_opening_subsets("Cave", ["Bomb", "Hook", "Fire"]) == 5
+    # Items no rule mentions double the count
+    assert rules.count_opening_subsets("Lake", ["Hammer", "Not An Item"]) == 2
+
+
+def test_rules_equivalent_across_engines(rules, data_loader):
+    other = LogicEngine(data_loader, locations_logic={
+        "Cave": {"access_rules": ["Fire", "Hook,Bomb", "Hook,Bomb,Hammer"]},
+        "Lake": {"access_rules": ["Hammer,Hook"]},
+    })
+    assert rules.rules_equivalent("Cave", other)
+    assert rules.rules_equivalent("Tower", other, "Cave") is False
+    assert not rules.rules_equivalent("Lake", other)
+    assert rules.rules_equivalent("Tower", rules, "Tower")
+
+
+def test_bundled_minimal_sets_match_clauses(logic_engine):
+    for location in logic_engine.locations:
+        expected = sorted((frozenset(logic_engine._mask_names(m)) for m in logic_engine._compiled_rules[location]),
+                          key=lambda s: (len(s), sorted(s)))
+        assert logic_engine.minimal_item_sets(location) == expected
@@ -0,0 +1,47 @@
+import json
+
+import benchmark_logic
+from benchmark_logic import compare, median_results
+
+
+def stats(ops, p95):
+    return {"ops_per_sec": ops, "p50_us": 1.0, "p95_us": p95, "p99_us": p95}
+
+
+BASELINE = {"benchmarks": {"calc": stats(1000, 10.0)}}
+
+
+def test_compare_gates_throughput():
+    assert compare({"calc": stats(800, 10.0)}, BASELINE, 0.25, 1.0) == []
+    assert compare({"calc": stats(700, 10.0)}, BASELINE, 0.25, 1.0) == \
+        ["calc: throughput 700/s < baseline 1000/s"]
+
+
+def test_compare_allows_p95_noise():
+    assert compare({"calc": stats(1000, 19.0)}, BASELINE, 0.25, 1.0) == []
+    assert len(compare({"calc": stats(1000, 21.0)}, BASELINE, 0.25, 1.0)) == 1
+    # Benchmarks missing from the baseline are not compared
+    assert compare({"other": stats(1, 1e6)}, BASELINE, 0.25, 1.0) == []
+
+
+def test_median_of_repeats():
+    runs = [{"calc": stats(ops, p95)} for ops, p95 in [(900, 50.0), (1000, 10.0), (1100, 12.0)]]
+    assert median_results(runs) == {"calc": stats(1000, 12.0)}
+
+
+def test_foreign_baseline_is_report_only(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    argv = ["--inventories", "20", "--repeats", "1", "--baseline", str(path)]
+    assert benchmark_logic.main(argv + ["--save-baseline"]) == 0
+
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    assert "platform" not in baseline["meta"]
+    for stats in baseline["benchmarks"].values():
+        stats["ops_per_sec"] *= 1000
+    path.write_text(json.dumps(baseline), encoding="utf-8")
+    assert benchmark_logic.main(argv) == 1
+
+    baseline["meta"]["python"] = "2.7.18"
+    path.write_text(json.dumps(baseline), encoding="utf-8")
+    assert benchmark_logic.main(argv) == 0
+    assert "report only" in capsys.readouterr().out
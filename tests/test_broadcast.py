@@ -0,0 +1,104 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from lufia_tracker.core.broadcast import BroadcastServer, _apply_delta, _Client, spectator_snapshot
+
+
+@pytest.fixture
+def server(state):
+    server = BroadcastServer(state, port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def port_of(server):
+    return server._server.sockets[0].getsockname()[1]
+
+
+class Spectator:
+    """Reads the NDJSON stream and folds it like a browser overlay would."""
+
+    def __init__(self, server):
+        self.sock = socket.create_connection(("127.0.0.1", port_of(server)), timeout=5)
+        self.sock.sendall(b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        self.lines = self.sock.makefile("rb")
+        while self.lines.readline() not in (b"\r\n", b""):
+            pass # Headers
+        first = self.next_message()
+        self.version, self.state = first["v"], first["snap"]
+
+    def next_message(self):
+        while True:
+            line = self.lines.readline()
+            if line.strip():
+                return json.loads(line)
+
+    def follow(self, version):
+        """Applies messages until the spectator has caught up with a state version."""
+        while self.version < version:
+            message = self.next_message()
+            if "snap" in message:
+                self.state = message["snap"]
+            else:
+                _apply_delta(self.state, message)
+            self.version = message["v"]
+
+    def close(self):
+        self.lines.close()
+        self.sock.close()
+
+
+def test_deltas_rebuild_the_state(state, server):
+    spectator = Spectator(server)
+    assert spectator.state == spectator_snapshot(state)
+    try:
+        state.toggle_manual_inventory("Bomb")
+        state.set_manual_location_state("Alunze Cave", "cleared")
+        state.assign_character_to_location("Sundletan", "Guy")
+        state.register_shop_item("Sundletan", "Potion")
+        state.update_hints("Dekar is in the cave")
+        spectator.follow(state.version)
+        assert spectator.state == spectator_snapshot(state)
+
+        state.remove_character_assignment("Sundletan")
+        state.unregister_shop_item("Sundletan", "Potion")
+        state.reset_state() # A batch: sent as a snapshot
+        state.toggle_manual_inventory("Hook")
+        spectator.follow(state.version)
+        assert spectator.state == spectator_snapshot(state)
+    finally:
+        spectator.close()
+
+
+def test_snapshot_endpoint(state, server):
+    state.toggle_manual_inventory("Bomb")
+    # Loop side catches up asynchronously: wait until a stream sees it
+    spectator = Spectator(server)
+    spectator.close()
+
+    url = f"http://127.0.0.1:{port_of(server)}"
+    with urllib.request.urlopen(url + "/snapshot", timeout=5) as response:
+        assert json.load(response) == {"v": state.version, "snap": spectator_snapshot(state)}
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url + "/missing", timeout=5)
+    assert error.value.code == 404
+
+
+def test_slow_client_is_resynced(state):
+    server = BroadcastServer(state, queue_size=2)
+    client = _Client(2, sse=False)
+    server._clients.append(client)
+    for version, item in enumerate(["Bomb", "Hook", "Hammer"], start=1):
+        server._publish({"i": {item: True}, "v": version})
+
+    assert server.resync_count == 1
+    assert client.queue.qsize() == 1
+    message = json.loads(client.queue.get_nowait())
+    assert message["v"] == 3
+    assert {"Bomb", "Hook", "Hammer"} <= {item for item, ok in message["snap"]["inventory"].items() if ok}
+    server.stop()
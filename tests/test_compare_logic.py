@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import compare_logic
+from lufia_tracker.core.logic_engine import LogicEngine
+
+OLD = {
+    "Cave": {"access_rules": ["Bomb,Hook", "Fire"]},
+    "Lake": {"access_rules": ["Hammer"]},
+    "Tower": {"access_rules": ["Bomb"]},
+    "Field": {"access_rules": []},
+}
+NEW = {
+    "Cave": {"access_rules": ["Fire", "Hook,Bomb", "Hook,Bomb,Hammer"]}, # Same function
+    "Lake": {"access_rules": ["Hammer,Hook"]},
+    "Tower": {"access_rules": ["Bomb", "Hook"]},
+    "Marsh": {"access_rules": ["Fire"]},
+}
+EXPECTED = {
+    "Lake": (1, 0, frozenset({"Hammer"}), None),
+    "Tower": (0, 1, None, frozenset({"Hook"})),
+}
+
+
+@pytest.fixture(scope="module")
+def engines(data_loader):
+    return LogicEngine(data_loader, locations_logic=OLD), LogicEngine(data_loader, locations_logic=NEW)
+
+
+def test_symbolic_diff(engines):
+    old, new = engines
+    common = sorted(set(old.locations) & set(new.locations))
+    assert compare_logic.diff_symbolic(old, new, common) == EXPECTED
+
+
+def test_exhaustive_diff_agrees(engines):
+    pytest.importorskip("numpy")
+    old, new = engines
+    common = sorted(set(old.locations) & set(new.locations))
+    assert compare_logic.diff_exhaustive(old, new, common, max_items=20) == EXPECTED
+    with pytest.raises(ValueError):
+        compare_logic.diff_exhaustive(old, new, ["Cave"], max_items=2)
+
+
+def test_main_exit_codes(tmp_path, capsys):
+    old_path, new_path, same_path = tmp_path / "old.json", tmp_path / "new.json", tmp_path / "same.json"
+    old_path.write_text(json.dumps(OLD), encoding="utf-8")
+    new_path.write_text(json.dumps(NEW), encoding="utf-8")
+    # Reordered, duplicated and subsumed alternatives are not differences
+    same_path.write_text(json.dumps({**OLD, "Cave": {"access_rules": ["Fire", "Hook,Bomb", "Bomb,Hook"]}}),
+                         encoding="utf-8")
+
+    assert compare_logic.main([str(old_path), str(same_path)]) == 0
+    assert compare_logic.main([str(old_path), str(new_path)]) == 1
+    out = capsys.readouterr().out
+    assert "+ Marsh" in out and "- Field" in out
+    assert "~ Lake" in out and "~ Cave" not in out
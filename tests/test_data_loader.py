@@ -0,0 +1,25 @@
+def linear_search(mapping, spoiler_name):
+    """The v1.3 lookup: first internal name whose spoiler name matches."""
+    for internal_name, name in mapping.items():
+        if name == spoiler_name:
+            return internal_name
+    return spoiler_name
+
+
+def test_spoiler_index_matches_linear_search(data_loader):
+    mapping = data_loader.get_location_name_mapping()
+    index = data_loader.get_spoiler_location_index()
+    assert set(index) == set(mapping.values())
+    for spoiler_name in index:
+        assert index[spoiler_name] == linear_search(mapping, spoiler_name)
+    # Shared spoiler names resolve to the first internal name
+    assert index["Flower Mountain"] == "Flower Capsule"
+    assert index["Kamirno Tower"] == "Karmirno Tower"
+    assert data_loader.get_spoiler_location_index() is index # Built once
+
+
+def test_normalize_location_name(state):
+    assert state._normalize_location_name("Alunze Castle") == "Alunze Basement"
+    assert state._normalize_location_name("Not In The Mapping") == "Not In The Mapping"
+    assert state._normalize_location_name("") == "Unknown"
+    assert state._normalize_location_name(None) == "Unknown"
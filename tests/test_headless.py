@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from lufia_tracker.core.autosave import SaveScheduler
+from lufia_tracker.core.save_format import is_binary_save
+
+
+def test_core_imports_without_qt():
+    modules = ["autosave", "broadcast", "journal", "logic_engine", "session_host", "timeline", "tracker_state"]
+    code = "; ".join(f"import lufia_tracker.core.{name}" for name in modules)
+    code += "; import sys; print(sorted(m for m in sys.modules if m.startswith('PyQt')))"
+    src = Path(__file__).resolve().parents[1] / "src"
+    result = subprocess.run([sys.executable, "-c", code], cwd=src, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_save_scheduler_without_qt(state, tmp_path):
+    path = tmp_path / "autosave.l2s"
+    saver = SaveScheduler(state, path, quiet_ms=0)
+    saved = []
+    saver.subscribe("saved", saved.append)
+
+    saver.poll()
+    assert not saver.pending and not path.exists()
+
+    state.toggle_manual_inventory("Bomb")
+    assert saver.pending
+    saver.poll() # Starts the background save
+    saver.stop()
+    assert saved == [state.version]
+    assert not saver.pending
+    assert is_binary_save(path.read_bytes())
@@ -0,0 +1,206 @@
+import errno
+import json
+
+import pytest
+
+from lufia_tracker.core.journal import Journal
+from lufia_tracker.core.tracker_state import TrackerState
+
+
+def resumed(logic_engine, data_loader, path):
+    state = TrackerState(logic_engine, data_loader)
+    state.open_journal(path)
+    return state
+
+
+def test_undo_redo_stacks():
+    journal = Journal()
+    first = journal.record("toggle", [["i", "Bomb", None, True]])
+    journal.record("toggle", [["i", "Hook", None, True]])
+    assert journal.undo().changes == [["i", "Hook", None, True]]
+    assert journal.can_redo
+    journal.record("toggle", [["i", "Hammer", None, True]])
+    assert not journal.can_redo # A new action clears the redo stack
+    journal.undo()
+    assert journal.undo() is first
+    assert journal.undo() is None
+    assert journal.redo() is first
+
+
+def test_resume_replays_state_and_history(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    for item in ("Bomb", "Hook", "Hammer"):
+        state.toggle_manual_inventory(item)
+    state.undo()
+    state.journal.close()
+
+    restored = resumed(logic_engine, data_loader, path)
+    assert restored.snapshot() == state.snapshot()
+    assert restored.can_redo
+    assert restored.redo()
+    assert restored.inventory["Hammer"]
+    restored.journal.close()
+
+
+def test_periodic_snapshots_keep_history(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.journal.snapshot_interval = 5
+    state.open_journal(path)
+    for _ in range(23):
+        state.toggle_manual_inventory("Bomb")
+    state.journal.close()
+    assert sum("snap" in json.loads(line) for line in path.read_text().splitlines()) > 1
+
+    restored = resumed(logic_engine, data_loader, path)
+    depth = 0
+    while restored.undo():
+        depth += 1
+    assert depth == 23
+    assert not restored.inventory.get("Bomb")
+    restored.journal.close()
+
+
+def test_reset_ends_history(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    state.toggle_manual_inventory("Bomb")
+    state.reset_state()
+    assert not state.can_undo
+    state.journal.close()
+
+    restored = resumed(logic_engine, data_loader, path)
+    assert not restored.can_undo and not restored.can_redo
+    restored.journal.close()
+
+
+def test_partial_last_line_is_dropped(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    state.toggle_manual_inventory("Bomb")
+    state.journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"a": "toggle", "c": [["i", "Ho') # Crash mid-write
+
+    restored = resumed(logic_engine, data_loader, path)
+    assert restored.snapshot() == state.snapshot()
+    restored.toggle_manual_inventory("Hook")
+    restored.journal.close()
+    for line in path.read_text().splitlines():
+        json.loads(line)
+
+
+@pytest.mark.parametrize("background_sync", [True, False])
+def test_lines_reach_the_file(tmp_path, background_sync):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(path, background_sync=background_sync)
+    journal.record("toggle", [["i", "Bomb", None, True]])
+    journal.close()
+    replay = Journal.read(path)
+    assert [entry.action for entry in replay.done] == ["toggle"]
+
+
+class FullDisk:
+    """Stands in for the journal's open file while the disk is full."""
+
+    def write(self, *args):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    flush = fileno = close = write
+
+
+def test_unwritable_path_keeps_the_memory_journal(state, tmp_path):
+    state.toggle_manual_inventory("Bomb")
+    with pytest.raises(OSError):
+        state.open_journal(tmp_path / "missing" / "journal.jsonl")
+    assert state.journal.path is None
+    assert state.undo()
+    state.toggle_manual_inventory("Hook")
+    assert state.inventory["Hook"]
+
+
+def test_write_errors_do_not_raise(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    state.toggle_manual_inventory("Bomb")
+    state.journal._file = FullDisk()
+
+    state.toggle_manual_inventory("Hook") # Lost, but the action itself works
+    assert state.inventory["Hook"] and state.journal.write_failed
+    assert state.undo() and state.redo()
+    state.journal._retry_at = 0 # Disk back: the next action resyncs the file with a snapshot
+    state.toggle_manual_inventory("Hammer")
+    assert not state.journal.write_failed
+    state.journal.close()
+
+    restored = resumed(logic_engine, data_loader, path)
+    assert restored.snapshot() == state.snapshot()
+    restored.journal.close()
+
+
+def test_failed_writes_back_off(tmp_path):
+    journal = Journal(tmp_path / "journal.jsonl", retry_s=60)
+    journal.snapshot({})
+    journal._file = FullDisk()
+    journal.record("toggle", [["i", "Bomb", None, True]])
+    assert journal.write_failed and not journal.needs_snapshot
+    journal.record("toggle", [["i", "Hook", None, True]]) # Skipped while backing off
+    assert journal._file is None
+    journal._retry_at = 0
+    assert journal.needs_snapshot
+    journal.snapshot({"inventory_overrides": {"Bomb": True, "Hook": True}})
+    journal.close()
+    replay = Journal.read(journal.path)
+    assert replay.snapshot == {"inventory_overrides": {"Bomb": True, "Hook": True}}
+    assert replay.transitions == []
+
+
+def test_compaction_bounds_the_file(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.journal.snapshot_interval = 10
+    state.open_journal(path)
+    state.journal.compact_lines = 25
+    for _ in range(100):
+        state.toggle_manual_inventory("Bomb")
+    state.journal.close()
+    assert len(path.read_text().splitlines()) <= 25 + 10
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["journal.jsonl", "journal.jsonl.1"]
+
+    restored = resumed(logic_engine, data_loader, path)
+    assert restored.snapshot() == state.snapshot()
+    depth = 0
+    while restored.undo():
+        depth += 1
+    assert depth >= 10 # The last snapshot_interval actions at least
+    restored.journal.close()
+
+
+def test_reset_starts_a_new_file(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    for _ in range(3):
+        state.toggle_manual_inventory("Bomb")
+        state.reset_state()
+    state.toggle_manual_inventory("Hook")
+    state.journal.close()
+    assert len(path.read_text().splitlines()) == 2 # Reset snapshot + one action
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["journal.jsonl", "journal.jsonl.1"]
+    restored = resumed(logic_engine, data_loader, path)
+    assert restored.snapshot() == state.snapshot()
+    assert restored.undo() and not restored.can_undo
+    restored.journal.close()
+
+
+def test_resume_compacts_a_long_file(state, logic_engine, data_loader, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    for _ in range(50):
+        state.toggle_manual_inventory("Bomb")
+    state.journal.close()
+
+    restored = TrackerState(logic_engine, data_loader)
+    restored.journal.compact_lines = 20 # Smaller limit on the next launch
+    restored.open_journal(path)
+    restored.journal.close()
+    assert len(path.read_text().splitlines()) == 1
+    assert Journal.read(path).snapshot == state.snapshot()
@@ -0,0 +1,140 @@
+import pytest
+
+from lufia_tracker.core.logic_dag import LogicDAG
+from lufia_tracker.core.logic_engine import LogicEngine
+
+
+def accessible(engine, *items):
+    """Accessible locations among those with rules (cities are open by default)."""
+    return {location for location, ok in engine.calculate_accessibility({item: True for item in items}).items()
+            if ok and location in engine._locations_logic}
+
+
+def test_expression_forms(data_loader):
+    engine = LogicEngine(data_loader, locations_logic={
+        "Legacy": {"access_rules": ["Bomb,Hook", "Fire"]},
+        "Nested": {"access_rules": [["Bomb", {"any": ["Hook", {"item": "Hammer"}]}]]},
+        "Count": {"access_rules": [{"count": 2, "of": ["Bomb", "Hook", "Hammer"]}]},
+        "Open": {"access_rules": []},
+    })
+    assert accessible(engine) == {"Open"}
+    assert accessible(engine, "Fire") == {"Legacy", "Open"}
+    assert accessible(engine, "Bomb", "Hook") == {"Legacy", "Nested", "Count", "Open"}
+    assert accessible(engine, "Bomb", "Hammer") == {"Nested", "Count", "Open"}
+    assert accessible(engine, "Hook", "Hammer") == {"Count", "Open"}
+
+
+@pytest.mark.parametrize("first, second", [("Loop A", "Loop B"), ("Loop B", "Loop A")])
+def test_mutual_location_references(data_loader, first, second):
+    # Same rules whichever of the two locations sorts (and compiles) first
+    engine = LogicEngine(data_loader, locations_logic={
+        first: {"access_rules": ["Bomb", {"location": second}]},
+        second: {"access_rules": ["Hook", {"location": first}]},
+    })
+    assert accessible(engine) == set()
+    assert accessible(engine, "Bomb") == {first, second}
+    assert accessible(engine, "Hook") == {first, second}
+    assert engine.get_dependent_locations("Bomb") == {first, second}
+
+
+def test_location_reference_chains(data_loader):
+    engine = LogicEngine(data_loader, locations_logic={
+        "Ring 1": {"access_rules": [{"location": "Ring 2"}]},
+        "Ring 2": {"access_rules": [{"location": "Ring 3"}]},
+        "Ring 3": {"access_rules": ["Bomb", {"location": "Ring 1"}]},
+        "Self": {"access_rules": ["Hammer", {"location": "Self"}]},
+        "Closed 1": {"access_rules": [{"location": "Closed 2"}]},
+        "Closed 2": {"access_rules": [{"location": "Closed 1"}]},
+        "After": {"access_rules": [["Hook", {"location": "Ring 1"}]]},
+    })
+    assert accessible(engine, "Bomb") == {"Ring 1", "Ring 2", "Ring 3"}
+    assert accessible(engine, "Bomb", "Hook") == {"Ring 1", "Ring 2", "Ring 3", "After"}
+    assert accessible(engine, "Hammer") == {"Self"}
+    # A cycle with no way in never opens
+    assert not accessible(engine, *engine.items) & {"Closed 1", "Closed 2"}
+
+
+def test_tracker_matches_full_evaluation(data_loader):
+    engine = LogicEngine(data_loader, locations_logic={
+        "Loop A": {"access_rules": ["Bomb", {"location": "Loop B"}]},
+        "Loop B": {"access_rules": ["Hook,Hammer", {"location": "Loop A"}]},
+    })
+    tracker = engine.new_tracker()
+    tracker.reset({})
+    inventory = {}
+    for item, obtained in [("Hook", True), ("Hammer", True), ("Hook", False), ("Bomb", True)]:
+        inventory[item] = obtained
+        tracker.update({item: obtained})
+        expected = engine.calculate_accessibility(inventory)
+        assert {location: tracker.is_accessible(location) for location in engine.locations} == expected
+
+
+def test_dnf_cap():
+    dag = LogicDAG(max_clauses=8)
+    pairs = [dag.any_of([dag.mask(1 << (2 * i)), dag.mask(1 << (2 * i + 1))]) for i in range(4)]
+    assert len(dag.dnf(dag.all_of(pairs[:3]))) == 8
+    with pytest.raises(ValueError):
+        dag.dnf(dag.all_of(pairs))
+
+
+def test_dag_evaluation_of_single_nodes():
+    dag = LogicDAG()
+    bomb, hook, hammer = dag.mask(1), dag.mask(2), dag.mask(4)
+    node = dag.at_least(2, [bomb, hook, dag.any_of([hammer, dag.all_of([bomb, hook])])])
+    for inv_mask in range(8):
+        assert dag.evaluate_node(node, inv_mask) == dag.evaluate(inv_mask)[node]
+    assert dag.leaf_mask(node) == 7
+
+
+GATE_ITEMS = [f"Gate Item {i}" for i in range(20)]
+
+
+@pytest.fixture(scope="module")
+def gate_engine(data_loader):
+    # C(20, 5) = 15504 clauses: over the DNF cap, evaluated through the DAG
+    return LogicEngine(data_loader, locations_logic={
+        "Gate": {"access_rules": [{"count": 5, "of": GATE_ITEMS}]},
+        "Beyond": {"access_rules": [["Bomb", {"location": "Gate"}]]},
+        "Loop": {"access_rules": ["Hook", {"location": "Gate"}, {"location": "Loop"}]},
+    })
+
+
+def test_oversized_rules_are_evaluated_through_the_dag(gate_engine):
+    assert set(gate_engine.optimization_report.dag_only) == {"Gate", "Beyond", "Loop"}
+    assert accessible(gate_engine, *GATE_ITEMS[:4]) == set()
+    assert accessible(gate_engine, *GATE_ITEMS[3:8]) == {"Gate", "Loop"}
+    assert accessible(gate_engine, "Bomb", *GATE_ITEMS[-5:]) == {"Gate", "Beyond", "Loop"}
+    assert accessible(gate_engine, "Hook") == {"Loop"}
+
+
+def test_oversized_rules_in_the_dependency_index(gate_engine):
+    assert gate_engine.get_dependent_locations("Gate Item 7") == {"Gate", "Beyond", "Loop"}
+    assert gate_engine.get_dependent_locations("Bomb") == {"Beyond"}
+    assert set(gate_engine.location_items("Gate")) == set(GATE_ITEMS)
+
+
+def test_oversized_rules_incrementally(gate_engine):
+    tracker = gate_engine.new_tracker()
+    tracker.reset({})
+    inventory = {}
+    for item in GATE_ITEMS[:6] + ["Bomb"]:
+        inventory[item] = True
+        tracker.update({item: True})
+        expected = gate_engine.calculate_accessibility(inventory)
+        assert {location: tracker.is_accessible(location) for location in gate_engine.locations} == expected
+        assert tracker.rank_next_items() == gate_engine.rank_next_items(inventory)
+
+    four = {item: True for item in GATE_ITEMS[:4]}
+    unlocks = {rec.item: rec.unlocks for rec in gate_engine.rank_next_items(four, candidates=GATE_ITEMS)}
+    assert unlocks["Gate Item 10"] == ("Gate", "Loop")
+    assert gate_engine.get_missing_requirements("Gate", four) == gate_engine.get_requirements("Gate")
+    assert gate_engine.get_missing_requirements("Gate", {item: True for item in GATE_ITEMS[:5]}) == []
+
+
+def test_oversized_rules_in_batches(gate_engine):
+    np = pytest.importorskip("numpy")
+    inventories = [{item: True for item in GATE_ITEMS[:n]} for n in range(8)] + [{"Hook": True}]
+    batch = gate_engine.evaluate_batch(inventories)
+    expected = [[gate_engine.calculate_accessibility(inv)[location] for location in gate_engine.locations]
+                for inv in inventories]
+    assert np.array_equal(batch, np.array(expected))
@@ -0,0 +1,287 @@
+import random
+
+import pytest
+
+from lufia_tracker.core.logic_engine import LogicEngine
+
+
+def accessible(engine, *items):
+    """Accessible locations among those with rules (cities are open by default)."""
+    return {location for location, ok in engine.calculate_accessibility({item: True for item in items}).items()
+            if ok and location in engine._locations_logic}
+
+
+@pytest.fixture(scope="module")
+def small_engine(data_loader):
+    return LogicEngine(data_loader, locations_logic={
+        "Cave": {"access_rules": ["Bomb, Hook", "Fire"]},
+        "Tower": {"access_rules": ["Bomb,Hook,Hammer", "Bomb,Hook"]},
+        "Field": {"access_rules": []},
+        "Lake": {"access_rules": ["Hammer"]},
+    })
+
+
+# --- Bitmask compilation (user-001) ---
+
+def test_bundled_rules(logic_engine):
+    empty = logic_engine.calculate_accessibility({})
+    assert empty["Foomy Woods"] is True
+    assert empty["Alunze Cave"] is False
+    assert logic_engine.calculate_accessibility({"Bomb": True, "Hammer": True})["Alunze Cave"] is True
+
+
+def test_item_masks(logic_engine):
+    items = logic_engine.items
+    assert len(set(logic_engine.item_mask([item]) for item in items)) == len(items)
+    assert logic_engine.item_mask(["Bomb", "Hook"]) == logic_engine.item_mask(["Bomb"]) | logic_engine.item_mask(["Hook"])
+    assert logic_engine.item_mask(["Not An Item"]) == 0
+    assert logic_engine.inventory_mask({"Bomb": True, "Hook": False}) == logic_engine.item_mask(["Bomb"])
+
+
+def test_dict_and_mask_inputs_agree(logic_engine):
+    inventory = {"Bomb": True, "Hammer": True, "Hook": False}
+    assert logic_engine.calculate_accessibility(inventory) == \
+        logic_engine.calculate_accessibility(logic_engine.inventory_mask(inventory))
+
+
+def test_comma_rules(small_engine):
+    assert accessible(small_engine) == {"Field"}
+    assert accessible(small_engine, "Bomb") == {"Field"}
+    assert accessible(small_engine, "Bomb", "Hook") == {"Cave", "Tower", "Field"}
+    assert accessible(small_engine, "Fire", "Hammer") == {"Cave", "Field", "Lake"}
+
+
+# --- Incremental accessibility (user-002) ---
+
+def test_updates_match_full_evaluation(logic_engine):
+    tracker = logic_engine.new_tracker()
+    current = tracker.reset({})
+    rng = random.Random(2)
+    inventory = {}
+    for _ in range(200):
+        item = rng.choice(logic_engine.items)
+        inventory[item] = not inventory.get(item, False)
+        flipped = tracker.update({item: inventory[item]})
+        expected = logic_engine.calculate_accessibility(inventory)
+        assert flipped == {location: ok for location, ok in expected.items() if current[location] != ok}
+        current = expected
+        assert tracker.mask == logic_engine.inventory_mask(inventory)
+        assert all(tracker.is_accessible(location) == ok for location, ok in expected.items())
+
+
+def test_update_only_touches_dependents(logic_engine):
+    dependents = logic_engine.get_dependent_locations("Bomb")
+    assert "Alunze Cave" in dependents
+    assert "Bomb" in logic_engine.location_items("Alunze Cave")
+    assert all("Bomb" in logic_engine.location_items(location) for location in dependents)
+
+    tracker = logic_engine.new_tracker()
+    tracker.reset({"Hammer": True})
+    assert set(tracker.update({"Bomb": True})) <= dependents
+    # No change, unknown items: nothing to re-check
+    assert tracker.update({"Bomb": True}) == {}
+    assert tracker.update({"Not An Item": True}) == {}
+
+
+def test_trackers_are_independent(logic_engine):
+    first, second = logic_engine.new_tracker(), logic_engine.new_tracker()
+    first.reset({"Bomb": True, "Hammer": True})
+    second.reset({})
+    assert first.is_accessible("Alunze Cave")
+    assert not second.is_accessible("Alunze Cave")
+
+
+# --- Accessibility cache (user-003) ---
+
+def test_cache_hits_and_lru_eviction(data_loader):
+    engine = LogicEngine(data_loader, cache_size=2)
+    engine.cache_clear()
+    bomb, hammer = {"Bomb": True}, {"Hammer": True}
+
+    engine.calculate_accessibility({})
+    engine.calculate_accessibility(bomb)
+    engine.calculate_accessibility({"Bomb": True, "Hook": False}) # Same mask
+    assert engine.cache_info() == (1, 2, 2, 2)
+
+    engine.calculate_accessibility({}) # Now most recently used
+    engine.calculate_accessibility(hammer) # Evicts bomb
+    engine.calculate_accessibility({})
+    assert engine.cache_info().hits == 3
+    engine.calculate_accessibility(bomb)
+    assert engine.cache_info() == (3, 4, 2, 2)
+
+    engine.cache_clear()
+    assert engine.cache_info() == (0, 0, 2, 0)
+
+
+def test_cached_results_are_copies(logic_engine):
+    result = logic_engine.calculate_accessibility({})
+    result["Alunze Cave"] = True
+    assert logic_engine.calculate_accessibility({})["Alunze Cave"] is False
+
+
+# --- Batch evaluation (user-004) ---
+
+def test_batch_matches_scalar_evaluation(logic_engine):
+    pytest.importorskip("numpy")
+    rng = random.Random(4)
+    inventories = [{item: rng.random() < 0.4 for item in logic_engine.items} for _ in range(50)]
+    inventories.append({})
+    result = logic_engine.evaluate_batch(inventories)
+    assert result.shape == (len(inventories), len(logic_engine.locations))
+    for row, inventory in zip(result, inventories):
+        expected = logic_engine.calculate_accessibility(inventory)
+        assert dict(zip(logic_engine.locations, row.tolist())) == expected
+
+
+def test_batch_input_forms(logic_engine):
+    np = pytest.importorskip("numpy")
+    masks = [0, logic_engine.item_mask(["Bomb", "Hammer"])]
+    matrix = np.array([[(mask & logic_engine.item_mask([item])) != 0 for item in logic_engine.items]
+                       for mask in masks], dtype=np.uint8)
+    assert (logic_engine.evaluate_batch(masks) == logic_engine.evaluate_batch(matrix)).all()
+    assert logic_engine.evaluate_batch([]).shape == (0, len(logic_engine.locations))
+    with pytest.raises(ValueError):
+        logic_engine.evaluate_batch(np.zeros((1, 3)))
+
+
+# --- Spheres (user-005) ---
+
+PLACEMENT = {"Field": "Hammer", "Lake": ["Fire"], "Cave": ["Bomb", "Hook"]}
+
+
+def ruled(sphere, engine):
+    return set(sphere.locations) & set(engine._locations_logic)
+
+
+def test_spheres_follow_the_placement(small_engine):
+    playthrough = small_engine.compute_spheres(PLACEMENT)
+    assert [ruled(sphere, small_engine) for sphere in playthrough.spheres] == \
+        [{"Field"}, {"Lake"}, {"Cave"}, {"Tower"}]
+    assert [sphere.index for sphere in playthrough.spheres] == [0, 1, 2, 3]
+    assert playthrough.spheres[0].items == ("Hammer",)
+    assert playthrough.spheres[2].items == ("Bomb", "Hook")
+    assert playthrough.unreachable == ()
+    assert playthrough.final_mask == small_engine.item_mask(["Hammer", "Fire", "Bomb", "Hook"])
+
+
+def test_spheres_stop_at_the_fixed_point(small_engine):
+    playthrough = small_engine.compute_spheres({"Field": "Hammer", "Cave": "Bomb"})
+    assert [ruled(sphere, small_engine) for sphere in playthrough.spheres] == [{"Field"}, {"Lake"}]
+    assert set(playthrough.unreachable) == {"Cave", "Tower"}
+
+    started = small_engine.compute_spheres({"Field": "Hook"}, {"Bomb": True})
+    assert [ruled(sphere, small_engine) for sphere in started.spheres] == [{"Field"}, {"Cave", "Tower"}]
+    assert started.unreachable == ("Lake",)
+
+
+def test_required_locations(small_engine):
+    assert small_engine.required_locations(PLACEMENT, goal=["Tower"]) == {"Field", "Lake", "Cave"}
+    # Cave also opens with Fire alone, so the Hammer at Field is only needed for the Lake
+    assert small_engine.required_locations(PLACEMENT, goal=["Cave"]) == {"Field", "Lake"}
+    # Placed items outside the logic never matter
+    assert small_engine.required_locations({**PLACEMENT, "Tower": "Potion"}) == {"Field", "Lake", "Cave"}
+
+
+# --- Best next item (user-006) ---
+
+def test_rank_next_items(small_engine):
+    ranking = small_engine.rank_next_items({})
+    assert ranking[:2] == [("Fire", ("Cave",)), ("Hammer", ("Lake",))]
+    assert all(not rec.unlocks for rec in ranking[2:])
+
+    with_bomb = {rec.item: rec.unlocks for rec in small_engine.rank_next_items({"Bomb": True})}
+    assert "Bomb" not in with_bomb
+    assert with_bomb["Hook"] == ("Cave", "Tower")
+    assert small_engine.rank_next_items({}, candidates=["Hook", "Fire"]) == [("Fire", ("Cave",)), ("Hook", ())]
+
+
+def test_tracker_ranking_matches_engine(logic_engine):
+    tracker = logic_engine.new_tracker()
+    tracker.reset({})
+    rng = random.Random(6)
+    inventory = {}
+    for _ in range(50):
+        item = rng.choice(logic_engine.items)
+        inventory[item] = not inventory.get(item, False)
+        tracker.update({item: inventory[item]})
+        assert tracker.rank_next_items() == logic_engine.rank_next_items(inventory)
+
+
+def test_ranking_matches_brute_force(logic_engine):
+    rng = random.Random(60)
+    for _ in range(5):
+        inventory = {item: rng.random() < 0.3 for item in logic_engine.items}
+        before = logic_engine.calculate_accessibility(inventory)
+        for rec in logic_engine.rank_next_items(inventory):
+            after = logic_engine.calculate_accessibility({**inventory, rec.item: True})
+            assert rec.unlocks == tuple(sorted(loc for loc, ok in after.items() if ok and not before[loc]))
+
+
+# --- Missing requirements (user-007) ---
+
+def test_missing_requirements(small_engine):
+    assert small_engine.get_missing_requirements("Tower", {}) == ["Bomb & Hook"] # Superset dropped
+    assert sorted(small_engine.get_missing_requirements("Cave", {"Bomb": True})) == ["Fire", "Hook"]
+    assert small_engine.get_missing_requirements("Cave", {"Fire": True}) == []
+    assert small_engine.get_missing_requirements("Field", {}) == []
+    assert small_engine.get_requirements("Lake") == ["Hammer"]
+    assert small_engine.get_requirements("Nowhere") == []
+
+
+def test_missing_requirements_follow_the_inventory(small_engine):
+    # Cached per location; only items the rule mentions change the answer
+    assert small_engine.get_missing_requirements("Lake", {"Bomb": True}) == ["Hammer"]
+    assert small_engine.get_missing_requirements("Lake", {"Hook": True}) == ["Hammer"]
+    assert small_engine.get_missing_requirements("Lake", {"Hammer": True}) == []
+    assert small_engine.get_missing_requirements("Lake", {}) == ["Hammer"]
+
+
+def test_requirement_tooltips(small_engine):
+    tooltips = small_engine.get_requirement_tooltips({"Bomb": True})
+    assert set(tooltips) == {"Cave", "Tower", "Lake"}
+    assert tooltips["Tower"] == "Hook"
+    assert tooltips["Cave"] in ("Hook OR Fire", "Fire OR Hook")
+
+
+def test_each_alternative_opens_the_location(logic_engine):
+    rng = random.Random(7)
+    inventory = {item: rng.random() < 0.3 for item in logic_engine.items}
+    accessibility = logic_engine.calculate_accessibility(inventory)
+    for location in logic_engine.locations:
+        for alternative in logic_engine.get_missing_requirements(location, inventory):
+            assert not accessibility[location]
+            added = {item: True for item in alternative.split(" & ")}
+            assert logic_engine.calculate_accessibility({**inventory, **added})[location]
+
+
+# --- Rule normalization (user-009) ---
+
+def test_optimization_report(data_loader):
+    engine = LogicEngine(data_loader, locations_logic={
+        "Cave": {"access_rules": ["Bomb, Hook", "Fire", "Hook,Bomb"]},
+        "Tower": {"access_rules": ["Bomb,Hook,Hammer", "Bomb,Hook"]},
+        "Lake": {"access_rules": ["Hammer"]},
+        "Pond": {"access_rules": ["Hammer"]},
+    })
+    report = engine.optimization_report
+    assert report.duplicates_removed == 1
+    assert report.subsumed_removed == 1
+    assert report.clauses_before - report.clauses_after == 2
+    assert report.redundant == {"Tower": ("Bomb & Hammer & Hook",)}
+    assert report.dag_only == ()
+    # Identical clause sets are one shared tuple
+    assert engine._compiled_rules["Lake"] is engine._compiled_rules["Pond"]
+
+    # Normalization never changes a result
+    assert accessible(engine, "Bomb", "Hook") == {"Cave", "Tower"}
+    assert accessible(engine, "Hammer") == {"Lake", "Pond"}
+
+
+def test_bundled_rules_normalize(logic_engine):
+    report = logic_engine.optimization_report
+    assert report.clauses_after <= report.clauses_before
+    assert report.distinct_rule_sets <= len(logic_engine.locations)
+    for location, clauses in logic_engine._compiled_rules.items():
+        assert len(set(clauses)) == len(clauses)
+        assert not any(a != b and a & b == a for a in clauses for b in clauses)
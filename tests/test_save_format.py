@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from lufia_tracker.core.data_loader import DataLoader
+from lufia_tracker.core.save_format import SAVE_IDS_FILE, SaveCodec, is_binary_save
+
+TEST_SAVE = Path(__file__).resolve().parent.parent / "src" / "TEST.json"
+
+
+class IdMapLoader(DataLoader):
+    """DataLoader with a different save ID map (an older or newer tracker)."""
+
+    def __init__(self, ids):
+        super().__init__()
+        self._cache[SAVE_IDS_FILE] = ids
+
+
+@pytest.fixture
+def snapshot(state):
+    state.load_state(TEST_SAVE)
+    state.toggle_manual_inventory("Bomb")
+    state.register_shop_item("Tia's Shop", "Not A Real Sword") # Outside the ID map
+    state.update_hints("Dekar is in the cave")
+    return state.snapshot()
+
+
+@pytest.fixture
+def codec(data_loader):
+    return SaveCodec(data_loader)
+
+
+def test_round_trip(codec, snapshot):
+    data = codec.encode(snapshot)
+    assert is_binary_save(data)
+    assert codec.decode(data) == snapshot
+
+
+def test_state_picks_format_by_suffix(state, snapshot, tmp_path):
+    for name in ("save.json", "save.l2s"):
+        path = tmp_path / name
+        state.save_state(path)
+        assert is_binary_save(path.read_bytes()) == (path.suffix == ".l2s")
+        state.reset_state()
+        state.load_state(path)
+        assert state.snapshot() == snapshot
+
+
+def test_truncated_save(codec, snapshot):
+    data = codec.encode(snapshot)
+    for size in range(len(data)):
+        with pytest.raises(ValueError):
+            codec.decode(data[:size])
+    with pytest.raises(ValueError, match="truncated save"):
+        codec.decode(data[:-1])
+    with pytest.raises(ValueError, match="Trailing data"):
+        codec.decode(data + b"\x00")
+
+
+def test_older_id_map_migrates(data_loader, codec, snapshot):
+    ids = data_loader.load_json(SAVE_IDS_FILE)
+    older = SaveCodec(IdMapLoader({table: names[:-3] for table, names in ids.items()}))
+    assert codec.decode(older.encode(snapshot)) == snapshot
+
+
+def test_newer_id_map_is_rejected(data_loader, codec, snapshot):
+    ids = data_loader.load_json(SAVE_IDS_FILE)
+    newer = SaveCodec(IdMapLoader({table: names + [f"New {table}"] for table, names in ids.items()}))
+    assert newer.decode(codec.encode(snapshot)) == snapshot
+    with pytest.raises(ValueError, match="newer"):
+        codec.decode(newer.encode(snapshot))
+
+
+def test_reordered_id_map_is_rejected(data_loader, codec, snapshot):
+    ids = dict(data_loader.load_json(SAVE_IDS_FILE))
+    ids["items"] = list(reversed(ids["items"]))
+    with pytest.raises(ValueError, match="reordered"):
+        SaveCodec(IdMapLoader(ids)).decode(codec.encode(snapshot))
@@ -0,0 +1,98 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from lufia_tracker.core.logic_engine import LogicEngine
+from lufia_tracker.core.session_host import SessionHost
+
+
+@pytest.fixture
+def host(data_loader, logic_engine):
+    return SessionHost(data_loader, logic_engine)
+
+
+def test_sessions_share_the_engine_only(host):
+    alice, bob = host.create_session("alice"), host.create_session("bob")
+    assert alice.logic_engine is bob.logic_engine is host.logic_engine
+    assert alice.accessibility is not bob.accessibility
+
+    alice.toggle_manual_inventory("Bomb")
+    assert alice.inventory["Bomb"] is True
+    assert "Bomb" not in bob.inventory
+    assert alice.accessibility.is_accessible("Alunze Cave")
+    assert not bob.accessibility.is_accessible("Alunze Cave")
+
+    assert sorted(host) == ["alice", "bob"] and len(host) == 2
+    assert host["alice"] is alice and host.get("carol") is None
+    assert host.remove_session("bob") is bob
+    assert "bob" not in host
+
+
+@pytest.mark.parametrize("session_id", ["", ".hidden", "a/b", "../x", "x" * 65, "con sole", None])
+def test_invalid_session_ids(host, session_id):
+    with pytest.raises(ValueError):
+        host.create_session(session_id)
+
+
+def test_duplicate_session_id(host):
+    host.create_session("alice")
+    with pytest.raises(ValueError):
+        host.create_session("alice")
+
+
+def test_save_and_load_all(host, data_loader, logic_engine, tmp_path):
+    host.create_session("alice").toggle_manual_inventory("Bomb")
+    host.create_session("bob").update_hints("Guy: Gruberik")
+    host.save_all(tmp_path / "saves")
+    (tmp_path / "saves" / ".bad name.l2s").write_bytes(b"") # Skipped
+
+    restored = SessionHost(data_loader, logic_engine)
+    restored.load_all(tmp_path / "saves")
+    assert sorted(restored) == ["alice", "bob"]
+    for session_id in restored:
+        assert restored[session_id].snapshot() == host[session_id].snapshot()
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_engine_shared_across_threads(data_loader, fast_switching):
+    engine = LogicEngine(data_loader, cache_size=4)
+    reference = LogicEngine(data_loader)
+    rng = random.Random(7)
+    masks = [rng.getrandbits(len(engine.items)) for _ in range(16)]
+    expected = {mask: reference.calculate_accessibility(mask) for mask in masks}
+    locations = engine.locations
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(300):
+                mask = rng.choice(masks)
+                assert engine.calculate_accessibility(mask) == expected[mask]
+                location = rng.choice(locations)
+                assert engine.get_missing_requirements(location, mask) == \
+                    reference.get_missing_requirements(location, mask)
+                engine.rank_next_items(mask)
+        except Exception as e: # Reported from the main thread
+            errors.append(e)
+
+    before = engine.cache_info()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    info = engine.cache_info()
+    assert (info.hits - before.hits) + (info.misses - before.misses) == 8 * 300 * 2
+    assert info.currsize <= info.maxsize
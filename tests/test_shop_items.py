@@ -0,0 +1,54 @@
+from lufia_tracker.core.shop_items import ShopItemStore
+
+
+def test_add_remove_and_indexes():
+    store = ShopItemStore()
+    assert store.add("Sundletan", "Potion")
+    assert store.add("Sundletan", "Hi-Potion")
+    assert store.add("Gruberik", "Potion")
+    assert not store.add("Sundletan", "Potion") # Duplicate
+    assert len(store) == 3
+    assert ("Gruberik", "Potion") in store
+
+    assert store.items_at("Sundletan") == ["Potion", "Hi-Potion"]
+    assert store.locations_of("Potion") == ["Sundletan", "Gruberik"]
+
+    assert store.remove("Sundletan", "Potion")
+    assert not store.remove("Sundletan", "Potion")
+    assert store.items_at("Sundletan") == ["Hi-Potion"]
+    assert store.locations_of("Potion") == ["Gruberik"]
+    store.remove("Gruberik", "Potion")
+    assert store.locations_of("Potion") == []
+    assert store.items_at("Nowhere") == []
+
+
+def test_order_and_save_format():
+    entries = [{"location": "B", "name": "x"}, {"location": "A", "name": "y"}, {"location": "B", "name": "x"}]
+    store = ShopItemStore(entries)
+    assert store.to_list() == entries[:2]
+    assert list(store) == entries[:2]
+
+    # to_list hands out copies
+    store.to_list()[0]["name"] = "changed"
+    assert store.items_at("B") == ["x"]
+
+    store.load([{"location": "C", "name": "z"}])
+    assert store.to_list() == [{"location": "C", "name": "z"}]
+    store.clear()
+    assert len(store) == 0 and store.locations_of("z") == []
+
+
+def test_tracker_shop_items(state):
+    added = []
+    state.subscribe("shop_item_added", lambda location, name: added.append((location, name)))
+    state.register_shop_item("Sundletan", "Potion")
+    state.register_shop_item("Sundletan", "Potion")
+    assert added == [("Sundletan", "Potion")]
+    assert state.has_shop_item("Sundletan", "Potion")
+    assert state.get_shop_items_at("Sundletan") == ["Potion"]
+    assert state.get_shop_item_locations("Potion") == ["Sundletan"]
+
+    state.unregister_shop_item("Sundletan", "Potion")
+    assert not state.has_shop_item("Sundletan", "Potion")
+    state.undo()
+    assert state.shop_items == [{"location": "Sundletan", "name": "Potion"}]
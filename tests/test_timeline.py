@@ -0,0 +1,84 @@
+import pytest
+
+from lufia_tracker.core.timeline import Timeline
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def history(state, clock):
+    """A recorded session: [(time, snapshot)] after each step."""
+    state.timeline = Timeline(keyframe_interval=4, clock=clock)
+    state.timeline.keyframe(state.snapshot())
+    steps = [lambda: state.toggle_manual_inventory(item) for item in ("Bomb", "Hook", "Hammer", "Bomb", "Fire")]
+    steps += [state.undo, state.undo, state.redo, lambda: state.update_hints("Guy: Gruberik")]
+    steps += [state.reset_state, lambda: state.toggle_manual_inventory("Jade")]
+    result = [(clock.now, state.snapshot())]
+    for step in steps:
+        clock.now += 10
+        step()
+        result.append((clock.now, state.snapshot()))
+    return result
+
+
+def test_seek_returns_recorded_states(state, history):
+    for t, snapshot in history:
+        assert state.timeline.seek(t) == snapshot
+        assert state.timeline.seek(t + 5) == snapshot
+    assert state.timeline.seek(0) == history[0][1]
+
+
+def test_replay_view_scrubs_both_ways(state, history):
+    view = state.replay_view()
+    for t, snapshot in history + history[::-1] + history[::3]:
+        view.seek(t)
+        assert view.snapshot() == snapshot
+    assert state.snapshot() == history[-1][1]
+
+
+def test_replay_view_tracks_accessibility(state, history, logic_engine):
+    view = state.replay_view()
+    for t, _ in history[::-1]:
+        view.seek(t)
+        expected = logic_engine.calculate_accessibility(view.inventory)
+        assert {location: view.accessibility.is_accessible(location) for location in logic_engine.locations} == expected
+
+
+def test_live_session_refuses_load_timeline(state, history, tmp_path):
+    with pytest.raises(RuntimeError):
+        state.load_timeline(state.timeline)
+    state.open_journal(tmp_path / "journal.jsonl")
+    with pytest.raises(RuntimeError):
+        state.load_timeline(Timeline())
+    state.journal.close()
+
+
+def test_seek_needs_a_timeline(state):
+    with pytest.raises(RuntimeError):
+        state.seek(0)
+
+
+def test_from_journal(state, tmp_path):
+    path = tmp_path / "journal.jsonl"
+    state.open_journal(path)
+    for item in ("Bomb", "Hook", "Hammer"):
+        state.toggle_manual_inventory(item)
+    state.undo()
+    state.journal.close()
+
+    timeline = Timeline.from_journal(path, keyframe_interval=2)
+    assert timeline.seek(float("inf")) == state.snapshot()
+    view = state.replay_view(timeline)
+    view.seek(timeline.time_at(len(timeline)))
+    assert view.snapshot() == state.snapshot()
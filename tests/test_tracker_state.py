@@ -0,0 +1,166 @@
+import pytest
+
+
+# --- Two-way character index (user-016) ---
+
+def test_character_index_both_directions(state):
+    state.assign_character_to_location("Sundletan", "Guy")
+    assert state.get_character_at_location("Sundletan") == "Guy"
+    assert state.get_character_location("Guy") == "Sundletan"
+    assert state.is_character_assigned("Guy")
+
+    # Moving drops the old location from both directions
+    state.assign_character_to_location("Gruberik", "Guy")
+    assert state.get_character_at_location("Sundletan") is None
+    assert state.get_character_location("Guy") == "Gruberik"
+    assert dict(state.character_locations) == {"Gruberik": "Guy"}
+
+    state.remove_character_assignment("Gruberik")
+    assert not state.is_character_assigned("Guy")
+    assert state.get_character_location("Guy") is None
+
+
+def test_most_recent_assignment_wins(state):
+    state.register_spoiler_location("Sundletan", "Guy")
+    state.register_spoiler_location("Gruberik", "Guy")
+    assert state.get_character_location("Guy") == "Gruberik"
+
+    # Registering an existing assignment again changes nothing
+    state.register_spoiler_location("Sundletan", "Guy")
+    assert state.get_character_location("Guy") == "Gruberik"
+
+    state.undo()
+    assert state.get_character_location("Guy") == "Sundletan"
+    state.redo()
+    assert state.get_character_location("Guy") == "Gruberik"
+
+
+def test_overwriting_a_location_reindexes(state):
+    state.assign_character_to_location("Sundletan", "Guy")
+    state.assign_character_to_location("Sundletan", "Dekar")
+    assert state.get_character_location("Dekar") == "Sundletan"
+    assert not state.is_character_assigned("Guy")
+    assert state.obtained_characters["Guy"] is False
+
+
+def test_index_survives_save_and_load(state, tmp_path):
+    state.register_spoiler_location("Sundletan", "Guy")
+    state.register_spoiler_location("Gruberik", "Guy")
+    path = tmp_path / "save.json"
+    state.save_state(path)
+
+    state.reset_state()
+    assert state.get_character_location("Guy") is None
+    state.load_state(path)
+    assert state.get_character_location("Guy") == "Gruberik"
+
+
+# --- Inventory deltas (user-013) ---
+
+def test_toggle_reports_only_the_changed_item(state):
+    deltas, full = [], []
+    state.subscribe("inventory_delta", lambda changed, version: deltas.append((changed, version)))
+    state.subscribe("inventory_changed", full.append)
+
+    before = state.version
+    state.toggle_manual_inventory("Bomb")
+    state.toggle_manual_inventory("Hook")
+    state.toggle_manual_inventory("Bomb")
+    assert deltas == [({"Bomb": True}, before + 1), ({"Hook": True}, before + 2), ({"Bomb": False}, before + 3)]
+    assert state.version == before + 3
+    assert full[-1] == state.get_inventory()
+    assert full[-1]["Hook"] is True and full[-1]["Bomb"] is False
+
+
+def test_deltas_keep_accessibility_in_sync(state):
+    for item in ["Bomb", "Hook", "Cloud", "Bomb", "Hammer"]:
+        state.toggle_manual_inventory(item)
+        expected = state.logic_engine.calculate_accessibility(state.get_inventory())
+        assert all(state.accessibility.is_accessible(location) == ok for location, ok in expected.items())
+    assert state.accessibility.is_accessible("Ancient Tower")
+
+
+# --- Batches (user-014) ---
+
+def record_events(state, *events):
+    log = []
+    for event in events:
+        state.subscribe(event, lambda *args, event=event: log.append((event, args)))
+    return log
+
+
+def test_batch_coalesces_into_one_commit(state):
+    log = record_events(state, "batch_committed", "inventory_delta", "location_changed", "character_assigned")
+    before = state.version
+    with state.batch():
+        state.toggle_manual_inventory("Bomb")
+        state.toggle_manual_inventory("Hook")
+        state.toggle_manual_inventory("Bomb")
+        state.set_manual_location_state("Alunze Cave", "cleared")
+        with state.batch(): # Joins the outer batch
+            state.set_manual_location_state("Alunze Cave", "red")
+        assert log == []
+
+    assert len(log) == 1
+    event, (changes,) = log[0]
+    assert event == "batch_committed"
+    assert changes["inventory"] == {"Hook": True} # Bomb toggled back
+    assert changes["locations"] == {"Alunze Cave": "red"}
+    assert changes["version"] == state.version == before + 1
+    assert changes["shop_items"] is None and changes["reset"] is False
+    assert state.accessibility.mask == state.logic_engine.inventory_mask(state.get_inventory())
+
+
+def test_assignments_in_a_batch(state):
+    log = record_events(state, "batch_committed")
+    with state.batch():
+        state.assign_character_to_location("Sundletan", "Guy")
+        state.assign_character_to_location("Gruberik", "Dekar")
+        state.remove_character_assignment("Gruberik")
+    changes = log[0][1][0]
+    assert changes["assignments"] == {"Sundletan": "Guy", "Gruberik": None}
+    assert changes["characters"] == {"Guy": True, "Dekar": False}
+
+
+def test_empty_batch_commits_nothing(state):
+    log = record_events(state, "batch_committed")
+    before = state.version
+    with state.batch():
+        state.toggle_manual_inventory("Bomb")
+        state.toggle_manual_inventory("Bomb")
+    with state.batch():
+        pass
+    assert log == [] # The effective inventory ended where it started
+    assert state.version == before + 1
+
+
+# --- Read-only views (user-015) ---
+
+@pytest.mark.parametrize("view", ["inventory", "locations", "character_locations"])
+def test_views_are_read_only(state, view):
+    with pytest.raises(TypeError):
+        getattr(state, view)["Bomb"] = True
+
+
+def test_views_are_live(state):
+    inventory, locations = state.inventory, state.locations
+    state.toggle_manual_inventory("Bomb")
+    state.set_manual_location_state("Alunze Cave", "cleared")
+    assert inventory["Bomb"] is True
+    assert locations["Alunze Cave"] == "cleared"
+    assert state.inventory is inventory # No copy per read
+
+    copy = state.get_inventory()
+    copy["Hook"] = True
+    assert "Hook" not in state.inventory
+
+
+def test_views_follow_load_and_reset(state, tmp_path):
+    inventory = state.inventory
+    state.toggle_manual_inventory("Bomb")
+    path = tmp_path / "save.json"
+    state.save_state(path)
+    state.reset_state()
+    assert not inventory.get("Bomb", False)
+    state.load_state(path)
+    assert inventory["Bomb"] is True